@@ -4,3 +4,12 @@ __all__ = ['figure', 'link_icon_tab', 'link_image',
            'image_block', 'link_image_block',
            'list_gallery', 'list_avg_gallery',
            'quote_by']
+
+
+def __getattr__(name):
+    # `amazedown.figure` and the like import the extension when first used
+    # (Python 3.7+; before that, import the module itself)
+    if name in __all__ or name == 'all':
+        import importlib
+        return importlib.import_module('%s.%s' % (__name__, name))
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
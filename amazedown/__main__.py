@@ -0,0 +1,4 @@
+import sys
+from amazedown.build import main
+
+sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+asyncio rendering on a pool of worker processes (Python 3 only)
+
+Rendering is CPU bound and would block the event loop, so
+
+    html = await render_async(text, {
+        'extensions': ['amazedown.link_icon_tab', 'amazedown.list_gallery'],
+        'extension_configs': {'amazedown.link_icon_tab': {'host': host}},
+    })
+
+sends the work to worker processes. `config` holds the keyword arguments of
+`markdown.Markdown`; it is pickled to the workers, so extensions are given
+by name. Each worker keeps one `Markdown` instance per config, built the
+first time the config is used, or up front for the `configs` given to
+`AsyncRenderer`.
+
+At most `max_pending` renders are queued or running at a time, across all
+the event loops using the renderer; further callers wait for a slot. A
+render not done after `timeout` seconds raises `PoolTimeout`, and a worker
+skips a queued render whose caller already gave up. A render that timed
+out keeps its slot until the worker is done with it, so the workers never
+have more than `max_pending` renders to go through.
+"""
+import os
+import time
+import asyncio
+import threading
+import collections
+import markdown
+from concurrent.futures import ProcessPoolExecutor
+from amazedown.cache import config_key
+from amazedown.pool import PoolTimeout
+
+_instances = {}  # in each worker: config key -> Markdown
+
+
+def _markdown(key, config):
+    md = _instances.get(key)
+    if md is None:
+        md = _instances[key] = markdown.Markdown(**config)
+    return md
+
+
+def _prepare(configs):
+    for config in configs:
+        _markdown(config_key(**config), config)
+
+
+def _render(key, config, text, deadline):
+    if deadline is not None and time.time() > deadline:
+        return None  # the caller has timed out already
+
+    md = _markdown(key, config)
+    try:
+        return md.convert(text)
+    finally:
+        md.reset()
+
+
+def _wake(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class _Slots(object):
+    """A semaphore for the coroutines of any event loop; `release` can be
+    called from any thread and wakes the first waiter in its own loop."""
+
+    def __init__(self, size):
+        self.free = size
+        self._lock = threading.Lock()
+        self._waiters = collections.deque()
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.free and not self._waiters:
+                self.free -= 1
+                return
+            waiter = loop.create_future()
+            self._waiters.append((loop, waiter))
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove((loop, waiter))
+                    handed = False
+                except ValueError:
+                    handed = True  # a release gave it the slot already
+            if handed:
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                loop, waiter = self._waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(_wake, waiter)
+                    return
+                except RuntimeError:
+                    pass  # its loop is closed
+            self.free += 1
+
+
+class AsyncRenderer(object):
+
+    def __init__(self, workers=None, max_pending=None, timeout=None,
+                 configs=()):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.timeout = timeout
+        self._executor = ProcessPoolExecutor(
+            self.workers, initializer=_prepare, initargs=(list(configs),))
+        self._slots = _Slots(self.max_pending)
+
+    async def render(self, text, config=None, timeout=None):
+        """Same as `markdown.Markdown(**config).convert(text)`."""
+        config = config or {}
+        if timeout is None:
+            timeout = self.timeout
+
+        slots = self._slots
+        await slots.acquire()
+        deadline = None if timeout is None else time.time() + timeout
+        try:
+            future = self._executor.submit(
+                _render, config_key(**config), config, text, deadline)
+        except BaseException:
+            slots.release()
+            raise
+        # the slot is freed when the worker is done, not when we give up
+        future.add_done_callback(lambda _: slots.release())
+
+        try:
+            html = await asyncio.wait_for(asyncio.wrap_future(future),
+                                          timeout)
+        except asyncio.TimeoutError:
+            html = None  # a render not started yet is cancelled
+        if html is None:
+            raise PoolTimeout('render not done after %ss' % timeout)
+        return html
+
+    def close(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_default = None
+
+
+async def render_async(text, config=None, timeout=None):
+    """Render `text` on a process pool shared by the whole program."""
+    global _default
+    if _default is None:
+        _default = AsyncRenderer()
+    return await _default.render(text, config, timeout)
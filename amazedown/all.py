@@ -0,0 +1,259 @@
+"""
+All the amazedown extensions as one
+
+    markdown.markdown(text, extensions=[all.makeExtension(host='example.com')])
+
+adds the block processors of `image_block`, `link_image_block`, one of the
+two galleries and `quote_by` as they are, and, for the inline syntax, one
+pattern instead of the ten `figure`, `link_image` and `link_icon_tab` add,
+which have to be loaded in the right order and each go through every text
+node.
+
+`AmazeInlinePattern` goes through a text once. At every `[`, `![` or `<` it
+tries the link references, links, images, image references, short
+references, autolinks and mail links, in this order, and the first one
+handled wins: a link to an image becomes a figure, an image becomes a
+figure, another link gets its icon and opens in a new tab. An image inside
+the text of a link becomes a figure as well.
+
+As the ten patterns each went through the whole text in turn, a match of
+one could take the text of a match of another starting before it: in
+`![i][r] [r]`, `reference` took `[r] [r]` and left `![i]` behind. Here the
+match starting first wins. Otherwise the output is the one of the three
+extensions, but for links inside the text of another link, which are left
+to plain Markdown.
+
+`host` and `brands` are the ones of `link_icon_tab`. `gallery` is the
+gallery to render lists of images with, `'list_avg_gallery'` (the default)
+or `'list_gallery'`: both take the same lists, so only one can be loaded.
+"""
+import re
+import threading
+from markdown import Extension
+from markdown.util import AtomicString, INLINE_PLACEHOLDER_PREFIX
+from markdown.inlinepatterns import \
+    Pattern, AutolinkPattern, LINK_RE, REFERENCE_RE, SHORT_REF_RE, \
+    IMAGE_LINK_RE, IMAGE_REFERENCE_RE, AUTOLINK_RE, AUTOMAIL_RE
+from amazedown import image_block, link_image_block, list_gallery, \
+    list_avg_gallery, quote_by
+from amazedown.figure import FigurePattern, FigureReferencePattern
+from amazedown.link_image import \
+    LinkImageLinkPattern, LinkImageReferencePattern
+from amazedown.link_icon_tab import \
+    LinkIconMixin, LinkIconLinkPattern, LinkIconReferencePattern, \
+    LinkIconAutomailPattern, BrandIndex, load_brands
+from amazedown.inline import PositionalMatch, Chain
+
+_OPENER_RE = r'!?\[|<'
+
+
+def _compile(pattern):
+    # the empty group stands for the `^(.*?)` of a `Pattern`
+    return re.compile('()%s' % pattern, re.DOTALL | re.UNICODE)
+
+
+class FusedMatch(PositionalMatch):
+    """A match of one of the patterns, with the node it was handled to."""
+
+    def __init__(self, text, m, node):
+        super(FusedMatch, self).__init__(text, m)
+        self.node = node
+
+
+class _FusedChain(Chain):
+    """A `Chain` that also knows, for each handler, the end of the last
+    match it turned down: like the treeprocessor does with a pattern, the
+    handler is not tried again before it."""
+
+    def __init__(self, text, handlers):
+        super(_FusedChain, self).__init__(text)
+        self.skip = [0] * handlers
+
+
+class FusedRegex(object):
+    """Stands for a `^(.*?)(A|B|...)(.*)$` regex of `kinds`, a list of
+    `(pattern, handlers)`, which only matches where a handler takes the
+    match. It is handled already when it is handed back."""
+
+    def __init__(self, kinds):
+        self.opener = re.compile(_OPENER_RE)
+        self.kinds = []
+        self.handlers = 0
+        for pattern, handlers in kinds:
+            indexed = []
+            for handler in handlers:
+                indexed.append((self.handlers, handler))
+                self.handlers += 1
+            self.kinds.append((_compile(pattern), indexed))
+        self._local = threading.local()
+
+    def match(self, text):
+        local = self._local
+        chain = getattr(local, 'chain', None)
+        pos = 0
+        if (chain is not None and text.startswith(chain.prefix) and
+                text.startswith(INLINE_PLACEHOLDER_PREFIX,
+                                len(chain.prefix))):
+            # the last match was replaced by its placeholder; nothing
+            # before it matched, and cannot now unless a match runs
+            # through the placeholder (see `amazedown.inline`)
+            start, end = chain.last
+            if chain.closed_at(start) and '"' not in chain.text[start:end]:
+                pos = start
+                shift = len(chain.text) - len(text)
+                chain.skip = [skip if skip <= start
+                              else max(start, skip - shift)
+                              for skip in chain.skip]
+            else:
+                chain.skip = [0] * self.handlers
+            chain.text = text
+        else:
+            chain = _FusedChain(text, self.handlers)
+
+        found = self.search(text, pos, chain.skip)
+        if found is None:
+            local.chain = None
+            return None
+
+        local.chain = chain
+        m, node = found
+        chain.last = m.start(), m.end()
+        chain.prefix = text[:m.start()]
+        return FusedMatch(text, m, node)
+
+    def search(self, text, pos, skip, kinds=None):
+        """Return `(m, node)` of the first match from `pos` a handler
+        takes, or None. `skip` is updated with the matches turned down."""
+        if kinds is None:
+            kinds = self.kinds
+        opener = self.opener.search
+        while True:
+            candidate = opener(text, pos)
+            if candidate is None:
+                return None
+
+            pos = candidate.start()
+            for regex, handlers in kinds:
+                m = None
+                for index, handler in handlers:
+                    if skip[index] > pos:
+                        continue
+                    if m is None:
+                        m = regex.match(text, pos)
+                        if m is None:
+                            break
+                    node = handler.handleMatch(PositionalMatch(text, m))
+                    if node is not None:
+                        return m, node
+                    skip[index] = m.end()
+            pos += 1
+
+
+class AmazeInlinePattern(Pattern):
+    """The `figure`, `link_image` and `link_icon_tab` patterns in one."""
+
+    def __init__(self, markdown_instance, host='', brands=None):
+        super(AmazeInlinePattern, self).__init__(_OPENER_RE,
+                                                 markdown_instance)
+        md = markdown_instance
+        brand_index = BrandIndex(
+            load_brands(LinkIconMixin.brands, brands, host))
+        icon = dict(host=host, brand_index=brand_index)
+
+        images = [
+            (IMAGE_LINK_RE, [FigurePattern(IMAGE_LINK_RE, md)]),
+            (IMAGE_REFERENCE_RE,
+             [FigureReferencePattern(IMAGE_REFERENCE_RE, md)]),
+        ]
+        self.compiled_re = FusedRegex([
+            (REFERENCE_RE, [LinkImageReferencePattern(REFERENCE_RE, md),
+                            LinkIconReferencePattern(REFERENCE_RE, md,
+                                                     **icon)]),
+            (LINK_RE, [LinkImageLinkPattern(LINK_RE, md),
+                       LinkIconLinkPattern(LINK_RE, md, **icon)]),
+        ] + images + [
+            (SHORT_REF_RE, [LinkImageReferencePattern(SHORT_REF_RE, md),
+                            LinkIconReferencePattern(SHORT_REF_RE, md,
+                                                     **icon)]),
+            (AUTOLINK_RE, [AutolinkPattern(AUTOLINK_RE, md)]),
+            (AUTOMAIL_RE, [LinkIconAutomailPattern(AUTOMAIL_RE, md,
+                                                   **icon)]),
+        ])
+        self._images = self.compiled_re.kinds[2:4]
+
+    def handleMatch(self, m):
+        node = m.node
+        if node.tag == 'a':
+            self._nest_image(node)
+        return node
+
+    def _nest_image(self, elem):
+        """Turn the first image in the text of `elem` into a figure; the
+        treeprocessor hands the text after it back to this pattern."""
+        text = elem.text
+        if not text or isinstance(text, AtomicString) or '![' not in text:
+            return
+
+        regex = self.compiled_re
+        found = regex.search(text, 0, [0] * regex.handlers,
+                             kinds=self._images)
+        if found is None:
+            return
+
+        m, figure = found
+        elem.text = text[:m.start()]
+        figure.tail = text[m.end():]
+        elem.insert(0, figure)
+
+
+GALLERIES = {'list_gallery': list_gallery,
+             'list_avg_gallery': list_avg_gallery}
+
+
+class AllExtension(Extension):
+
+    def __init__(self, **kwargs):
+        self.config = {'host': [kwargs.get('host', ''), 'host name'],
+                       'brands': [kwargs.get('brands', None),
+                                  'domains, domain -> icon mapping, '
+                                  'or a JSON file of the mapping'],
+                       'gallery': [kwargs.get('gallery', 'list_avg_gallery'),
+                                   'list_avg_gallery or list_gallery']}
+        super(AllExtension, self).__init__(**kwargs)
+
+    @property
+    def blocks(self):
+        gallery = self.getConfig('gallery', 'list_avg_gallery')
+        if gallery not in GALLERIES:
+            raise ValueError('gallery is one of %s, not %r' % (
+                ', '.join(sorted(GALLERIES)), gallery))
+        return image_block, link_image_block, GALLERIES[gallery], quote_by
+
+    def extendMarkdown(self, md, md_globals):
+        md.inlinePatterns.add(
+            'amazedown',
+            AmazeInlinePattern(md, host=self.getConfig('host', ''),
+                               brands=self.getConfig('brands', None)),
+            '<reference')
+
+        for module in self.blocks:
+            module.makeExtension().extendMarkdown(md, md_globals)
+
+
+def makeExtension(**kwargs):
+    """Loads the extension."""
+    return AllExtension(**kwargs)
+
+
+if __name__ == '__main__':
+    import markdown
+
+    text = (
+        '[text](http://example.com/t) [text](https://github.com) '
+        '[![img](small.jpg)](big.jpg) ![img](pic.jpg title) '
+        '<someone@example.com>\n\n'
+        '-   ![a](a.jpg)\n'
+        '-   ![b](b.jpg)\n'
+    )
+    print(markdown.markdown(text, extensions=[makeExtension(
+        host='example.com')]))
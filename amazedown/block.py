@@ -0,0 +1,114 @@
+"""
+Base of the amazedown block processors
+
+Every block of a document goes through the `test` of every block processor.
+`AmazeBlockProcessor.test` first looks at the first and the last character
+and at the length of the block, and only calls `test_block` (the real regex
+work) when the block could match. `stats` counts both outcomes, so
+
+    block_stats(md)
+
+tells how many blocks each processor rejected early and how many it fully
+evaluated. A block passing the early checks spends a step of the document's
+budget (see `amazedown.budget`); once the budget is exhausted, no block is
+evaluated any more and plain Markdown renders the rest. `test_block` hands
+`self.check` to the tokenizer, so the time budget also runs out in the
+middle of a block, which is then left to plain Markdown too.
+
+The processors keep no state between `test` and `run` other than through
+`remember` / `recall`, which is per thread and bound to the block object,
+so one configured instance can be used from several threads. The scans of
+the document are kept by `self.tokenizer`, shared by the processors of the
+Markdown instance (see `amazedown.tokenizer`).
+"""
+import threading
+from markdown.blockprocessors import BlockProcessor
+from amazedown.budget import spend, deadline_check, BudgetExhausted
+from amazedown.tokenizer import tokenizer_of
+
+
+class AmazeBlockProcessor(BlockProcessor):
+
+    FIRST_CHARS = ''  # the block must start with one of these
+    LAST_CHARS = ''  # and end with one of these, if set
+    MIN_LENGTH = 1
+    STRIP = True  # leading/trailing whitespace is allowed around the block
+
+    def __init__(self, parser):
+        super(AmazeBlockProcessor, self).__init__(parser)
+        self.stats = {'rejected': 0, 'evaluated': 0}
+        self.tokenizer = tokenizer_of(parser.markdown)
+        self._local = threading.local()
+
+    def test(self, parent, block):
+        if not self.prefilter(block):
+            self.stats['rejected'] += 1
+            return False
+
+        if not spend(self.parser.markdown):
+            return False
+
+        self.stats['evaluated'] += 1
+        try:
+            return self.test_block(parent, block)
+        except BudgetExhausted:
+            return False
+
+    @property
+    def check(self):
+        """What a scan done by `test_block` calls to keep to the time
+        budget, or None."""
+        return deadline_check(self.parser.markdown)
+
+    def prefilter(self, block):
+        """Cheap check done before `test_block`, must never reject a block
+        `test_block` would accept."""
+        if len(block) < self.MIN_LENGTH:
+            return False
+
+        first_chars = self.FIRST_CHARS
+        if first_chars and not self._edge_in(iter(block), first_chars):
+            return False
+
+        last_chars = self.LAST_CHARS
+        if last_chars and not self._edge_in(reversed(block), last_chars):
+            return False
+
+        return True
+
+    def _edge_in(self, chars_iter, chars):
+        for char in chars_iter:
+            if char in chars:
+                return True
+            if not (self.STRIP and char.isspace()):
+                return False
+        return False
+
+    def test_block(self, parent, block):
+        """The actual test, only called for blocks passing `prefilter`."""
+        raise NotImplementedError
+
+    def remember(self, block, result):
+        """Keep what `test` found for `block` so that `run` can reuse it."""
+        local = self._local
+        local.block = block
+        local.result = result
+
+    def recall(self, block):
+        """Return what `remember` kept for this very `block` in this thread,
+        or None."""
+        local = self._local
+        if getattr(local, 'block', None) is not block:
+            return None
+
+        result = local.result
+        local.block = local.result = None
+        return result
+
+
+def block_stats(md):
+    """Return `{name: stats}` of the amazedown block processors of `md`."""
+    return dict(
+        (name, dict(processor.stats))
+        for name, processor in md.parser.blockprocessors.items()
+        if isinstance(processor, AmazeBlockProcessor))
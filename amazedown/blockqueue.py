@@ -0,0 +1,153 @@
+"""
+Block parsing in linear time for documents of many blocks
+
+    md = markdown.Markdown(extensions=[
+        image_block.makeExtension(),
+        list_gallery.makeExtension(),
+        blockqueue.makeExtension(),
+    ])
+
+The block processors, the ones of Markdown and of amazedown alike, take
+the block they work on with `blocks.pop(0)` and hand back what they leave
+with `blocks.insert(0, block)`. On a list each of these moves every block
+after it, so a document of n blocks takes O(n^2) to parse.
+
+With this extension the block parser hands the processors a `BlockQueue`
+instead of a list once there are more than `QUEUE_MIN` blocks: it keeps the
+blocks in reverse order, so the first block is the last item of a list
+and both operations are O(1). Other list operations still work, at the
+cost of a list. Smaller lists are left as they are, being cheaper to
+index from the processors' `test` calls.
+"""
+from markdown import Extension
+from markdown.blockparser import BlockParser
+
+QUEUE_MIN = 256
+
+
+class BlockQueue(object):
+    """The blocks left to parse, as the list the block processors expect,
+    kept in reverse order."""
+
+    def __init__(self, blocks=()):
+        self._reversed = list(blocks)[::-1]
+
+    def _index(self, index):
+        """The index in `_reversed` of the block at `index`."""
+        size = len(self._reversed)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError('block index out of range')
+        return size - 1 - index
+
+    def __len__(self):
+        return len(self._reversed)
+
+    def __bool__(self):
+        return bool(self._reversed)
+
+    __nonzero__ = __bool__
+
+    def __iter__(self):
+        return reversed(self._reversed)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'BlockQueue(%r)' % list(self)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index == 0:
+            return self._reversed[-1]
+        return self._reversed[self._index(index)]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            blocks = list(self)
+            blocks[index] = value
+            self._reversed[:] = blocks[::-1]
+        elif index == 0 and self._reversed:
+            self._reversed[-1] = value
+        else:
+            self._reversed[self._index(index)] = value
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            blocks = list(self)
+            del blocks[index]
+            self._reversed[:] = blocks[::-1]
+        else:
+            del self._reversed[self._index(index)]
+
+    def pop(self, index=-1):
+        if index == 0:
+            return self._reversed.pop()
+        return self._reversed.pop(self._index(index))
+
+    def insert(self, index, block):
+        if index == 0:
+            self._reversed.append(block)
+            return
+        size = len(self._reversed)
+        if index < 0:
+            index = max(index + size, 0)
+        self._reversed.insert(size - min(index, size), block)
+
+    def append(self, block):
+        self._reversed.insert(0, block)
+
+    def extend(self, blocks):
+        self._reversed[:0] = list(blocks)[::-1]
+
+
+class QueueBlockParser(BlockParser):
+    """A `BlockParser` handing long lists of blocks over as a `BlockQueue`."""
+
+    def parseBlocks(self, parent, blocks):
+        if len(blocks) <= QUEUE_MIN and not isinstance(blocks, BlockQueue):
+            return super(QueueBlockParser, self).parseBlocks(parent, blocks)
+
+        if not isinstance(blocks, BlockQueue):
+            blocks = BlockQueue(blocks)
+        # the loop of `BlockParser.parseBlocks`, reading the first block
+        # once for all the `test` calls rather than through `blocks[0]`
+        pending = blocks._reversed
+        while pending:
+            block = pending[-1]
+            for processor in self.blockprocessors.values():
+                if processor.test(parent, block):
+                    if processor.run(parent, blocks) is not False:
+                        break
+                    block = blocks[0]
+
+
+class BlockQueueExtension(Extension):
+
+    def extendMarkdown(self, md, md_globals):
+        # the processors hold on to the parser: it is kept and only its
+        # class changes
+        if not isinstance(md.parser, QueueBlockParser):
+            md.parser.__class__ = QueueBlockParser
+
+
+def makeExtension(**kwargs):
+    """Loads the extension."""
+    return BlockQueueExtension(**kwargs)
+
+
+if __name__ == '__main__':
+    import markdown
+    from amazedown import image_block
+
+    text = '\n\n'.join('![%d](%d.jpg)\n\ntext %d' % (index, index, index)
+                       for index in range(1000))
+    md = markdown.Markdown(extensions=[image_block.makeExtension(),
+                                       makeExtension()])
+    print(md.convert(text)[:200])
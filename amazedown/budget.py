@@ -0,0 +1,124 @@
+"""
+Time / step budget of the amazedown processors for each document
+
+    md = markdown.Markdown(extensions=[
+        link_icon_tab.makeExtension(host=host),
+        list_gallery.makeExtension(),
+        budget.makeExtension(seconds=0.5, steps=10000),
+    ])
+    html = md.convert(text)
+    if md.budget.exhausted:
+        logger.warning('%s rendered without decoration', name)
+
+Each block an amazedown block processor would evaluate and each link or
+image an amazedown inline pattern would handle spends one step. Once the
+document has used up `steps`, or once `seconds` have passed since its
+conversion started, the amazedown processors step aside: the rest of the
+document is rendered by plain Python-Markdown, without the AmazeUI markup.
+`md.budget.exhausted` tells whether it happened, until the next conversion.
+
+The time is also checked while a block is scanned for images (see
+`amazedown.scanner`), so a single huge block can not hold the processors
+past the deadline: `Budget.check` raises `BudgetExhausted`, and the block
+is left to plain Markdown.
+
+Without this extension the processors run unbounded, as before.
+"""
+from timeit import default_timer
+from markdown import Extension
+from markdown.preprocessors import Preprocessor
+
+
+class BudgetExhausted(Exception):
+    """Raised by `Budget.check` once the time of the document is up."""
+
+
+class Budget(object):
+
+    def __init__(self, seconds=None, steps=None):
+        self.seconds = seconds
+        self.steps = steps
+        self.start()
+
+    def start(self):
+        self.used = 0
+        self.exhausted = False
+        self._deadline = (None if self.seconds is None
+                          else default_timer() + self.seconds)
+
+    def spend(self):
+        """Take one step; return False once the budget has run out."""
+        if self.exhausted:
+            return False
+
+        self.used += 1
+        if ((self.steps is not None and self.used > self.steps) or
+                (self._deadline is not None and
+                 default_timer() > self._deadline)):
+            self.exhausted = True
+            return False
+        return True
+
+    def check(self):
+        """Raise `BudgetExhausted` once the budget has run out or the time
+        is up; unlike `spend`, take no step."""
+        if not self.exhausted and (self._deadline is None or
+                                   default_timer() <= self._deadline):
+            return
+        self.exhausted = True
+        raise BudgetExhausted()
+
+
+def spend(md):
+    """Take one step of the budget of `md`, if it has one; return False when
+    the amazedown processors must leave the work to plain Markdown."""
+    budget = getattr(md, 'budget', None)
+    return budget is None or budget.spend()
+
+
+def deadline_check(md):
+    """`Budget.check` of the budget of `md`, or None when it has no time
+    budget: what a long scan calls now and then."""
+    budget = getattr(md, 'budget', None)
+    if budget is None or budget.seconds is None:
+        return None
+    return budget.check
+
+
+class StartBudgetPreprocessor(Preprocessor):
+    """Starts the budget over for every document."""
+
+    def run(self, lines):
+        self.markdown.budget.start()
+        return lines
+
+
+class BudgetExtension(Extension):
+
+    def __init__(self, **kwargs):
+        self.config = {'seconds': [kwargs.get('seconds', None),
+                                   'time budget of a document'],
+                       'steps': [kwargs.get('steps', None),
+                                 'step budget of a document']}
+        super(BudgetExtension, self).__init__(**kwargs)
+
+    def extendMarkdown(self, md, md_globals):
+        md.budget = Budget(self.getConfig('seconds', None),
+                           self.getConfig('steps', None))
+        md.preprocessors.add('amazedown_budget',
+                             StartBudgetPreprocessor(md), '_begin')
+
+
+def makeExtension(**kwargs):
+    """Loads the extension."""
+    return BudgetExtension(**kwargs)
+
+
+if __name__ == '__main__':
+    import markdown
+    from amazedown import link_icon_tab
+
+    md = markdown.Markdown(extensions=[
+        link_icon_tab.makeExtension(), makeExtension(steps=1)])
+    print(md.convert('[one](http://github.com) [two](http://github.com)'))
+    print('exhausted: %s' % md.budget.exhausted)
@@ -0,0 +1,275 @@
+"""
+Convert a tree of Markdown files to HTML
+
+    python -m amazedown posts/ html/ --host example.com -j 8
+    python -m amazedown posts/ html/ --config site.json
+
+Every `.md` / `.markdown` file under the source directory is rendered with
+the amazedown extensions to the same path under the output directory, with
+an `.html` suffix, by a pool of `--jobs` processes. The config file is a
+JSON object:
+
+    {
+        "extensions": {
+            "link_icon_tab": {"host": "example.com", "brands": "brands.json"},
+            "list_avg_gallery": {}
+        },
+        "markdown": {"output_format": "html5"}
+    }
+
+"extensions" lists the extensions to load with their config, and
+"markdown" holds other `markdown.Markdown` arguments. By default all of
+them are loaded but `list_gallery`: it and `list_avg_gallery` render the
+same lists and only one of the two can be loaded. The extensions are
+loaded in the order of `ORDER`, whatever the order of the config.
+`--extension`, `--set extension.key=value`, `--host` and `--brands` change
+it from the command line.
+
+A manifest in the output directory remembers the modification time, size
+and content hash of each source. A file is rendered again only when its
+content changed, or when the configuration did. Outputs are written
+atomically, so an interrupted build leaves no truncated file behind.
+"""
+import os
+import sys
+import json
+import hashlib
+import logging
+import argparse
+import multiprocessing
+import markdown
+import amazedown
+from amazedown.cache import config_key
+from amazedown.util import atomic_write
+
+logger = logging.getLogger('amazedown.build')
+
+SUFFIXES = ('.md', '.markdown')
+MANIFEST = '.amazedown-manifest.json'
+
+# the order extensions are loaded in: `link_image` has to take a link to an
+# image before `link_icon_tab` takes it as a plain link
+ORDER = ('figure', 'link_image', 'link_icon_tab', 'image_block',
+         'link_image_block', 'list_gallery', 'list_avg_gallery', 'quote_by')
+# extensions adding the same processor, of which only one can be loaded
+EXCLUSIVE = (('list_gallery', 'list_avg_gallery'),)
+
+
+def load_config(path=None):
+    """Return the config of `path` (a JSON file), or the default one."""
+    config = {'extensions': dict((name, {}) for name in amazedown.__all__
+                                 if name != 'list_gallery'),
+              'markdown': {}}
+    if path is not None:
+        with open(path, 'r') as f:
+            config.update(json.load(f))
+    return config
+
+
+def check_extensions(names):
+    """Raise `ValueError` if `names` holds extensions that can not be loaded
+    together."""
+    for exclusive in EXCLUSIVE:
+        found = [name for name in exclusive if name in names]
+        if len(found) > 1:
+            raise ValueError('%s can not be loaded together' %
+                             ' and '.join(found))
+
+
+def load_order(name):
+    if name in ORDER:
+        return ORDER.index(name), name
+    return len(ORDER), name
+
+
+def markdown_kwargs(config):
+    """Turn `config` into the arguments of `markdown.Markdown`."""
+    kwargs = dict(config.get('markdown', {}))
+    extensions = config['extensions']
+    check_extensions(extensions)
+    kwargs['extensions'] = [
+        'amazedown.%s' % name for name in sorted(extensions, key=load_order)]
+    kwargs['extension_configs'] = dict(
+        ('amazedown.%s' % name, ext_config)
+        for name, ext_config in extensions.items() if ext_config)
+    return kwargs
+
+
+def build_key(kwargs):
+    """Key of the output a configuration gives, see `cache.config_key`."""
+    md = markdown.Markdown()
+    configs = kwargs.get('extension_configs', {})
+    extensions = [md.build_extension(name, configs.get(name, {}))
+                  for name in kwargs['extensions']]
+    others = dict((key, value) for key, value in kwargs.items()
+                  if key not in ('extensions', 'extension_configs'))
+    return config_key(extensions, **others)
+
+
+def iter_sources(source):
+    """Yield the path, relative to `source`, of each Markdown file."""
+    for root, dirs, files in os.walk(source):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(SUFFIXES):
+                yield os.path.relpath(os.path.join(root, name), source)
+
+
+def output_path(output, rel_path):
+    return os.path.join(output, os.path.splitext(rel_path)[0] + '.html')
+
+
+_md = None  # the Markdown instance of a worker
+
+
+def _init_worker(kwargs):
+    global _md
+    _md = markdown.Markdown(**kwargs)
+
+
+def _convert(job):
+    """Render one file unless its content hash is `old_hash`; return
+    `(rel_path, [mtime, size, hash], rendered)`."""
+    source, output, rel_path, old_hash = job
+    path = os.path.join(source, rel_path)
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        content = f.read()
+    digest = hashlib.sha256(content).hexdigest()
+    target = output_path(output, rel_path)
+
+    rendered = digest != old_hash or not os.path.exists(target)
+    if rendered:
+        try:
+            atomic_write(target, _md.convert(content.decode('utf-8')))
+        finally:
+            _md.reset()
+
+    return rel_path, [stat.st_mtime, stat.st_size, digest], rendered
+
+
+def _load_manifest(output, key):
+    try:
+        with open(os.path.join(output, MANIFEST), 'r') as f:
+            manifest = json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
+
+    if manifest.get('key') != key:
+        return {}
+    return manifest.get('files', {})
+
+
+def build(source, output, config, jobs=None, force=False):
+    """Convert every Markdown file of `source` into `output`; return
+    `(rendered, unchanged)` counts."""
+    kwargs = markdown_kwargs(config)
+    key = build_key(kwargs)
+    known = {} if force else _load_manifest(output, key)
+
+    files = {}
+    todo = []
+    for rel_path in iter_sources(source):
+        stat = os.stat(os.path.join(source, rel_path))
+        entry = known.get(rel_path)
+        if (entry is not None and entry[:2] == [stat.st_mtime, stat.st_size]
+                and os.path.exists(output_path(output, rel_path))):
+            files[rel_path] = entry
+        else:
+            old_hash = None if entry is None else entry[2]
+            todo.append((source, output, rel_path, old_hash))
+
+    rendered = 0
+    if todo:
+        if jobs == 1:
+            _init_worker(kwargs)
+            results = map(_convert, todo)
+            pool = None
+        else:
+            pool = multiprocessing.Pool(jobs, _init_worker, (kwargs,))
+            results = pool.imap_unordered(_convert, todo, chunksize=8)
+
+        try:
+            for rel_path, entry, was_rendered in results:
+                files[rel_path] = entry
+                rendered += was_rendered
+                if was_rendered:
+                    logger.info('rendered %s', rel_path)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+    atomic_write(os.path.join(output, MANIFEST),
+                 json.dumps({'key': key, 'files': files}, sort_keys=True))
+    return rendered, len(files) - rendered
+
+
+def parse_value(value):
+    """Config values from the command line: JSON when it parses."""
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m amazedown',
+        description='Convert a directory of Markdown files to HTML.')
+    parser.add_argument('source', help='directory of Markdown files')
+    parser.add_argument('output', help='directory to write HTML files to')
+    parser.add_argument('-c', '--config', help='JSON config file')
+    parser.add_argument('-e', '--extension', action='append',
+                        choices=amazedown.__all__, metavar='NAME',
+                        help='only load these extensions (repeatable)')
+    parser.add_argument('-s', '--set', action='append', default=[],
+                        metavar='EXTENSION.KEY=VALUE',
+                        help='set an extension config value (repeatable)')
+    parser.add_argument('--host', help='link_icon_tab host')
+    parser.add_argument('--brands', help='link_icon_tab brands JSON file')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes (default: one per core)')
+    parser.add_argument('-f', '--force', action='store_true',
+                        help='render unchanged files too')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(message)s')
+
+    config = load_config(args.config)
+    extensions = config['extensions']
+    if args.extension:
+        extensions = config['extensions'] = dict(
+            (name, extensions.get(name, {})) for name in args.extension)
+
+    settings = list(args.set)
+    if args.host is not None:
+        settings.append('link_icon_tab.host=%s' % args.host)
+    if args.brands is not None:
+        settings.append('link_icon_tab.brands=%s' % args.brands)
+    for setting in settings:
+        name, sep, value = setting.partition('=')
+        extension, dot, key = name.partition('.')
+        if not (sep and dot and key):
+            parser.error('--set expects EXTENSION.KEY=VALUE, not %r' %
+                         setting)
+        if extension not in extensions:
+            parser.error('extension %r is not loaded' % extension)
+        extensions[extension][key] = parse_value(value)
+
+    try:
+        check_extensions(extensions)
+    except ValueError as e:
+        parser.error(str(e))
+
+    rendered, unchanged = build(args.source, args.output, config,
+                                jobs=args.jobs, force=args.force)
+    print('%d rendered, %d unchanged' % (rendered, unchanged))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+Content-addressed cache of rendered Markdown
+
+    cache = RenderCache(maxsize=64 * 1024 * 1024, directory='/var/cache/md')
+    html = cache.render(text, extensions=[
+        link_icon_tab.makeExtension(host='example.com'),
+        list_gallery.makeExtension(),
+    ])
+    cache.stats  # {'hits': ..., 'misses': ..., 'evictions': ..., ...}
+
+The key is a hash of the source text, of the enabled extensions with their
+config (`host` and `brands` of link_icon_tab, ...), of the other `Markdown`
+options and of the versions of Python-Markdown and amazedown, so that an
+upgrade does not serve the HTML of the old code from the disk tier.
+Rendered HTML is kept in an in-memory LRU holding at most `maxsize`
+characters, and, when `directory` is given, in one file per key there, so
+that it survives restarts.
+"""
+import os
+import json
+import hashlib
+import markdown
+from markdown.extensions import Extension
+from markdown.util import string_type
+from amazedown import __version__
+from amazedown.util import LRUCache, atomic_write
+
+try:
+    from markdown import version as markdown_version
+except ImportError:  # Markdown 3
+    from markdown import __version__ as markdown_version
+
+_VERSION = 2  # bump when a change alters the output for the same key
+
+
+def _pairs(value):
+    """`value` with its mappings turned into lists of `[key, value]` pairs,
+    in their own order: the first of the brands of link_icon_tab matching a
+    link gives its icon."""
+    if hasattr(value, 'items'):
+        return [[key, _pairs(item)] for key, item in value.items()]
+    if isinstance(value, (list, tuple)):
+        return [_pairs(item) for item in value]
+    return value
+
+
+def _sorted_pairs(options):
+    """`options`, whose order does not matter, as sorted `[key, value]`
+    pairs."""
+    return [[key, _pairs(options[key])] for key in sorted(options)]
+
+
+def extension_key(extension):
+    """Return a JSON-able description of `extension` and its config."""
+    if not isinstance(extension, Extension):
+        return str(extension)
+
+    config = extension.getConfigs()
+    for key, value in config.items():
+        # a file given as config (e.g. brands of link_icon_tab) is part of
+        # the key through its modification time and size
+        if isinstance(value, string_type) and os.path.isfile(value):
+            stat = os.stat(value)
+            config[key] = [value, stat.st_mtime, stat.st_size]
+
+    cls = type(extension)
+    return ['%s.%s' % (cls.__module__, cls.__name__), _sorted_pairs(config)]
+
+
+def config_key(extensions=(), **kwargs):
+    """Normalized form of a `Markdown` configuration, as a string."""
+    return json.dumps(
+        [[_VERSION, __version__, markdown_version],
+         [extension_key(each) for each in extensions],
+         _sorted_pairs(kwargs)], default=repr)
+
+
+def render_key(text, extensions=(), **kwargs):
+    digest = hashlib.sha256(config_key(extensions, **kwargs).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(text.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class RenderCache(object):
+
+    def __init__(self, maxsize=64 * 1024 * 1024, directory=None):
+        self.directory = directory
+        self._memory = LRUCache(maxsize, sizeof=len)
+        self._counts = {'hits': 0, 'misses': 0, 'disk_hits': 0}
+
+    @property
+    def stats(self):
+        stats = dict(self._counts)
+        stats['evictions'] = self._memory.evictions
+        stats['entries'] = len(self._memory)
+        stats['size'] = self._memory.size
+        return stats
+
+    def render(self, text, extensions=(), **kwargs):
+        """Same as `markdown.markdown(text, extensions=extensions, **kwargs)`,
+        from the cache when possible."""
+        key = render_key(text, extensions, **kwargs)
+        html = self._memory.get(key)
+        if html is not None:
+            self._counts['hits'] += 1
+            return html
+
+        html = self._load(key)
+        if html is not None:
+            self._counts['hits'] += 1
+            self._counts['disk_hits'] += 1
+        else:
+            self._counts['misses'] += 1
+            html = markdown.markdown(text, extensions=list(extensions),
+                                     **kwargs)
+            self._save(key, html)
+
+        self._memory[key] = html
+        return html
+
+    def clear(self):
+        """Drop the memory tier; the disk tier is kept."""
+        self._memory.clear()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.html')
+
+    def _load(self, key):
+        if self.directory is None:
+            return None
+
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read().decode('utf-8')
+        except (IOError, OSError):
+            return None
+
+    def _save(self, key, html):
+        if self.directory is None:
+            return
+
+        path = self._path(key)
+        atomic_write(path, html)
@@ -0,0 +1,104 @@
+"""
+Render a document piece by piece
+
+`Markdown.convert` runs the preprocessors over the whole text, parses all
+of its blocks into one ElementTree, and serializes it at the end. Most
+top-level blocks do not depend on each other though, so after the
+preprocessors ran (which is where reference definitions are collected),
+
+    blocks = preprocess(md, text)
+    for chunk in iter_chunks(blocks):
+        html = render_blocks(md, chunk)
+
+gives the same HTML as `md.convert(text)` once the results are put together
+with `join_html`.
+
+`iter_chunks` keeps together the blocks that Python-Markdown would look at
+together: blank and indented blocks (code blocks, list continuations) go
+with the block before them, and so do list items following a list and
+quotes following a quote. Raw HTML blocks are already stashed by the
+preprocessors. Extensions keeping document-wide state of their own (toc,
+footnotes, abbr) are not supported.
+"""
+import re
+from markdown import util
+
+LIST_RE = re.compile(r'^[ ]{0,3}(?:[*+-]|\d+\.)[ ]+', re.MULTILINE)
+QUOTE_RE = re.compile(r'^[ ]{0,3}>', re.MULTILINE)
+
+
+def preprocess(md, text):
+    """Reset `md`, run its preprocessors on `text` and return the blocks
+    its block parser would get."""
+    md.reset()
+    if not text.strip():
+        return []
+
+    lines = util.text_type(text).split('\n')
+    for prep in md.preprocessors.values():
+        lines = prep.run(lines)
+
+    return '\n'.join(lines).split('\n\n')
+
+
+def joins(block, last):
+    """Whether `block` must be parsed together with the `last` non-empty
+    block before it."""
+    if not block or block[0] in ' \n':
+        return True
+    # a block can start with blank lines where the preprocessors took some
+    # lines out (reference definitions, raw HTML); Markdown skips them
+    last = last.lstrip('\n')
+    if LIST_RE.match(block):
+        return last[:1] == ' ' or LIST_RE.search(last) is not None
+    if QUOTE_RE.match(block):
+        return last[:1] == ' ' or QUOTE_RE.search(last) is not None
+    return False
+
+
+def iter_chunks(blocks):
+    """Group `blocks` into lists of blocks that can be rendered apart."""
+    chunk = []
+    last = ''
+    for block in blocks:
+        if chunk and not joins(block, last):
+            yield chunk
+            chunk = []
+        chunk.append(block)
+        if block:
+            last = block
+
+    if chunk:
+        yield chunk
+
+
+def render_blocks(md, blocks):
+    """Render `blocks` like the end of `Markdown.convert` does, using the
+    references and the HTML stash currently held by `md`."""
+    root = util.etree.Element(md.doc_tag)
+    md.parser.root = root
+    md.parser.parseBlocks(root, list(blocks))
+
+    for treeprocessor in md.treeprocessors.values():
+        new_root = treeprocessor.run(root)
+        if new_root is not None:
+            root = new_root
+
+    output = md.serializer(root)
+    if md.stripTopLevelTags:
+        start = output.find('<%s>' % md.doc_tag)
+        if start < 0:  # empty root, serialized as <div />
+            output = ''
+        else:
+            output = output[start + len(md.doc_tag) + 2:
+                            output.rindex('</%s>' % md.doc_tag)].strip()
+
+    for postprocessor in md.postprocessors.values():
+        output = postprocessor.run(output)
+
+    return output
+
+
+def join_html(parts):
+    """Join what `render_blocks` returned for each chunk."""
+    return '\n'.join(part for part in parts if part).strip()
@@ -1,32 +1,25 @@
 import logging
 from markdown import Extension
-from markdown.util import etree
 from markdown.inlinepatterns import \
     ImagePattern, ImageReferencePattern, IMAGE_REFERENCE_RE, IMAGE_LINK_RE
+from amazedown.budget import spend
+from amazedown.inline import PositionalMixin
+from amazedown.widget import wrap_figure
 
 logger = logging.getLogger('MARKDOWN.figure')
 
 
-class FigureMixin(object):
+class FigureMixin(PositionalMixin):
 
     def handleMatch(self, m):
+        if not spend(self.markdown):
+            return None  # left to the plain image patterns
+
         elem = super(FigureMixin, self).handleMatch(m)
-        if elem.tag != 'img':
+        if elem is None or elem.tag != 'img':
             return elem
 
-        title = elem.get('title', None)
-
-        root = etree.Element('figure')
-        root.set('data-am-widget', 'figure')
-        root.set('class', 'am am-figure am-figure-default')
-        root.set('data-am-figure', "{  pureview: 'true' }")
-        root.append(elem)
-
-        if title:
-            fig_caption = etree.SubElement(root, 'figcaption')
-            fig_caption.set('class', 'am-figure-capition-btm')
-            fig_caption.text = title
-        return root
+        return wrap_figure(elem)
 
 
 class FigurePattern(FigureMixin, ImagePattern):
@@ -1,73 +1,48 @@
-import re
 import logging
-from markdown.blockprocessors import BlockProcessor
 from markdown import Extension
-from markdown.util import etree
+from amazedown.block import AmazeBlockProcessor
+from amazedown.tokenizer import ImageToken
+from amazedown.widget import figure
+from amazedown import trace
 
 logger = logging.getLogger('MARKDOWN.image_block')
 
 
-class ImageBlockProcesser(BlockProcessor):
-
-    _IMG_RE = re.compile(
-        r'^'
-        r'!\[(?P<alt>[\s\S]*?)\]'  # ![] img alt
-        r'('
-            r'\('
-                r'(?P<src>.+?)'
-                r'(\s+'
-                    r'(?P<title>.+?)'
-                r')?\s?'
-            r'\)'
-        r'|'
-            r'\[(?P<ref>.*?)\]'
-        r')'
-        r'$')
-
-    def test(self, parent, block):
+class ImageBlockProcesser(AmazeBlockProcessor):
+    FIRST_CHARS = '!'
+    LAST_CHARS = ')]'
+    MIN_LENGTH = 5
+
+    def test_block(self, parent, block):
         # return True
         block = block.strip()
-        logger.info(repr(block))
-        self._matched = self._IMG_RE.match(block)
+        if trace.TRACE:
+            logger.info(repr(block))
 
-        return self._matched is not None
+        token = self.tokenizer.match(block, self.check)
+        return isinstance(token, ImageToken)
 
     def run(self, parent, blocks):
         block = blocks.pop(0)
 
-        matched = getattr(self, '_matched', None)
-        if matched is None:
-            matched = self._IMG_RE.match(block.rstrip())
+        token = self.tokenizer.match(block.strip())
 
-        matched_dict = matched.groupdict()
-        logger.debug(matched_dict)
+        if trace.TRACE:
+            logger.debug(token)
 
-        src = matched_dict['src']
-        title = matched_dict['title']
+        src = token.src
+        title = token.title
         if src is None:
-            ref = matched_dict['ref']
+            ref = token.ref
             if ref is None or ref not in self.parser.markdown.references:
-                logger.debug('no ref found')
+                if trace.TRACE:
+                    logger.debug('no ref found')
                 blocks.insert(0, block)
                 return False
 
             src, title = self.parser.markdown.references[ref]
 
-        root = etree.SubElement(parent, 'figure')
-        root.set('data-am-widget', 'figure')
-        root.set('class', 'am am-figure am-figure-default')
-        root.set('data-am-figure', "{  pureview: 'true' }")
-
-        source_img = etree.SubElement(root, 'img')  # root.find('img')
-        source_img.set('src', src)
-        if matched_dict['alt']:
-            source_img.set('alt', matched_dict['alt'])
-        if title:
-            source_img.set('title', title)
-            fig_caption = etree.SubElement(root, 'figcaption')
-            fig_caption.set('class', 'am-figure-capition-btm')
-            fig_caption.text = title
-
+        figure(parent, src, token.alt, title)
         return True
 
 
@@ -92,6 +67,7 @@ def makeExtension(configs=None):
 
 if __name__ == '__main__':
     import markdown
+    trace.enable()
     logging.basicConfig(level=logging.DEBUG, format='\033[32m%(levelname)1.1s\033[0m[%(lineno)3s]%(msg)s')
 
     md = """
@@ -0,0 +1,180 @@
+"""
+Tell whether a link points to an image
+
+Used by link_image and link_image_block to decide if a link wraps an image.
+Unlike `mimetypes.guess_type`, this never reads the system `mime.types`
+files: `IMAGE_TYPES` holds the image types of Python's own table and of a
+common `/etc/mime.types`. It also ignores the query string and the
+fragment of a URL, and keeps the latest answers in a bounded cache.
+
+The block regexes can capture more than a URL as a link target (`b.png)
+and ![b](c.jpg?w=1`); such text, holding whitespace or `)`, is classified
+as a whole, as `mimetypes` did, and not cut at its `?`.
+"""
+import re
+import posixpath
+from amazedown.util import LRUCache
+
+IMAGE_TYPES = {
+    '.apng': 'image/apng',
+    '.avci': 'image/avci',
+    '.avcs': 'image/avcs',
+    '.avif': 'image/avif',
+    '.azv': 'image/vnd.airzip.accelerator.azv',
+    '.b16': 'image/vnd.pco.b16',
+    '.bmp': 'image/bmp',
+    '.btf': 'image/prs.btif',
+    '.btif': 'image/prs.btif',
+    '.cdr': 'image/x-coreldraw',
+    '.cdt': 'image/x-coreldrawtemplate',
+    '.cgm': 'image/cgm',
+    '.cpt': 'image/x-corelphotopaint',
+    '.cr2': 'image/x-canon-cr2',
+    '.crw': 'image/x-canon-crw',
+    '.djv': 'image/vnd.djvu',
+    '.djvu': 'image/vnd.djvu',
+    '.dpx': 'image/dpx',
+    '.drle': 'image/dicom-rle',
+    '.dwg': 'image/vnd.dwg',
+    '.dxf': 'image/vnd.dxf',
+    '.emf': 'image/emf',
+    '.erf': 'image/x-epson-erf',
+    '.exr': 'image/aces',
+    '.fbs': 'image/vnd.fastbidsheet',
+    '.fit': 'image/fits',
+    '.fits': 'image/fits',
+    '.fpx': 'image/vnd.fpx',
+    '.fst': 'image/vnd.fst',
+    '.fts': 'image/fits',
+    '.gif': 'image/gif',
+    '.hdr': 'image/vnd.radiance',
+    '.heic': 'image/heic',
+    '.heics': 'image/heic-sequence',
+    '.heif': 'image/heif',
+    '.heifs': 'image/heif-sequence',
+    '.hej2': 'image/hej2k',
+    '.hif': 'image/avif',
+    '.hsj2': 'image/hsj2',
+    '.ico': 'image/vnd.microsoft.icon',
+    '.ief': 'image/ief',
+    '.jfif': 'image/jpeg',
+    '.jhc': 'image/jphc',
+    '.jls': 'image/jls',
+    '.jng': 'image/x-jng',
+    '.jp2': 'image/jp2',
+    '.jpe': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.jpf': 'image/jpx',
+    '.jpg': 'image/jpeg',
+    '.jpg2': 'image/jp2',
+    '.jpgm': 'image/jpm',
+    '.jph': 'image/jph',
+    '.jphc': 'image/jphc',
+    '.jpm': 'image/jpm',
+    '.jpx': 'image/jpx',
+    '.jxl': 'image/jxl',
+    '.jxr': 'image/jxr',
+    '.jxra': 'image/jxrA',
+    '.jxrs': 'image/jxrS',
+    '.jxs': 'image/jxs',
+    '.jxsc': 'image/jxsc',
+    '.jxsi': 'image/jxsi',
+    '.jxss': 'image/jxss',
+    '.ktx': 'image/ktx',
+    '.ktx2': 'image/ktx2',
+    '.mdi': 'image/vnd.ms-modi',
+    '.mmr': 'image/vnd.fujixerox.edmics-mmr',
+    '.nef': 'image/x-nikon-nef',
+    '.orf': 'image/x-olympus-orf',
+    '.pat': 'image/x-coreldrawpattern',
+    '.pbm': 'image/x-portable-bitmap',
+    '.pcx': 'image/vnd.zbrush.pcx',
+    '.pgb': 'image/vnd.globalgraphics.pgb',
+    '.pgm': 'image/x-portable-graymap',
+    '.png': 'image/png',
+    '.pnm': 'image/x-portable-anymap',
+    '.ppm': 'image/x-portable-pixmap',
+    '.psd': 'image/vnd.adobe.photoshop',
+    '.pti': 'image/prs.pti',
+    '.ras': 'image/x-cmu-raster',
+    '.rgb': 'image/x-rgb',
+    '.rgbe': 'image/vnd.radiance',
+    '.rlc': 'image/vnd.fujixerox.edmics-rlc',
+    '.s1g': 'image/vnd.sealedmedia.softseal.gif',
+    '.s1j': 'image/vnd.sealedmedia.softseal.jpg',
+    '.s1n': 'image/vnd.sealed.png',
+    '.sgi': 'image/vnd.sealedmedia.softseal.gif',
+    '.sgif': 'image/vnd.sealedmedia.softseal.gif',
+    '.sjp': 'image/vnd.sealedmedia.softseal.jpg',
+    '.sjpg': 'image/vnd.sealedmedia.softseal.jpg',
+    '.spn': 'image/vnd.sealed.png',
+    '.spng': 'image/vnd.sealed.png',
+    '.svg': 'image/svg+xml',
+    '.tap': 'image/vnd.tencent.tap',
+    '.tfx': 'image/tiff-fx',
+    '.tif': 'image/tiff',
+    '.tiff': 'image/tiff',
+    '.uvg': 'image/vnd.dece.graphic',
+    '.uvi': 'image/vnd.dece.graphic',
+    '.uvvg': 'image/vnd.dece.graphic',
+    '.uvvi': 'image/vnd.dece.graphic',
+    '.vtf': 'image/vnd.valve.source.texture',
+    '.wbmp': 'image/vnd.wap.wbmp',
+    '.webp': 'image/webp',
+    '.wmf': 'image/wmf',
+    '.xbm': 'image/x-xbitmap',
+    '.xcf': 'image/x-xcf',
+    '.xif': 'image/vnd.xiff',
+    '.xpm': 'image/x-xpixmap',
+    '.xwd': 'image/x-xwindowdump',
+    '.xyze': 'image/vnd.radiance',
+}
+
+# same as `mimetypes.suffix_map` and `mimetypes.encodings_map`
+SUFFIXES = {'.svgz': '.svg.gz'}
+ENCODINGS = ('.gz', '.Z', '.bz2', '.xz', '.br')
+
+# no whitespace and no `)`: a URL, not a run of text
+_URL_RE = re.compile(r'[^\s)]*$')
+
+_cache = LRUCache(1024)
+
+
+def guess_image_type(url):
+    """Return the image MIME type of `url`, or None if it's not an image."""
+    if url[:5].lower() == 'data:':
+        # data:[<mediatype>][;base64],<data>
+        comma = url.find(',')
+        if comma < 0:
+            return None
+        semi = url.find(';', 5, comma)
+        mime = url[5:comma if semi < 0 else semi]
+        if mime.startswith('image/') and '=' not in mime:
+            return mime
+        return None
+
+    if _URL_RE.match(url) is not None:
+        for sep in '?#':
+            index = url.find(sep)
+            if index >= 0:
+                url = url[:index]
+
+    base, ext = posixpath.splitext(url)
+    suffix = SUFFIXES.get(ext.lower())
+    if suffix is not None:
+        base, ext = posixpath.splitext(base + suffix)
+    if ext in ENCODINGS:
+        base, ext = posixpath.splitext(base)
+
+    return IMAGE_TYPES.get(ext.lower())
+
+
+def is_image(url):
+    """Whether `url` points to an image."""
+    if not url:
+        return False
+
+    result = _cache.get(url)
+    if result is None:
+        result = _cache[url] = guess_image_type(url) is not None
+    return result
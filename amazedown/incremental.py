@@ -0,0 +1,111 @@
+"""
+Incremental rendering of a document being edited
+
+    renderer = IncrementalRenderer(extensions=[
+        image_block.makeExtension(),
+        list_avg_gallery.makeExtension(),
+    ])
+    html = renderer.render(text)
+    html = renderer.render(text_after_one_keystroke)  # mostly from cache
+    renderer.stats  # {'chunks': ..., 'rendered': ..., 'reused': ...}
+
+The text is split into independent chunks of top-level blocks (see
+`amazedown.chunk`) and the HTML of each chunk is kept until the next
+render. A chunk is rendered again only when its text changed, when raw HTML
+it stashed changed, or when a reference it looked up (`[ref]: url`, used by
+links, images, image_block, link_image_block and the galleries) was
+added, removed or edited.
+
+The preprocessors still run over the whole text on every render, which is
+cheap next to the block and inline processors. One renderer holds one
+`Markdown` instance and must not be shared between threads.
+"""
+import markdown
+from markdown import util
+from amazedown.chunk import preprocess, iter_chunks, render_blocks, \
+    join_html
+
+_MISSING = object()
+
+
+class _RecordingDict(dict):
+    """The references of a document, remembering which ids were looked up
+    and what was found for them."""
+
+    def __init__(self, *args):
+        super(_RecordingDict, self).__init__(*args)
+        self.used = {}
+
+    def __contains__(self, key):
+        self.used[key] = dict.get(self, key, _MISSING)
+        return super(_RecordingDict, self).__contains__(key)
+
+    def __getitem__(self, key):
+        self.used[key] = dict.get(self, key, _MISSING)
+        return super(_RecordingDict, self).__getitem__(key)
+
+    def get(self, key, default=None):
+        self.used[key] = dict.get(self, key, _MISSING)
+        return super(_RecordingDict, self).get(key, default)
+
+
+class IncrementalRenderer(object):
+
+    def __init__(self, **kwargs):
+        self.md = markdown.Markdown(**kwargs)
+        self.stats = {'chunks': 0, 'rendered': 0, 'reused': 0}
+        self._chunks = {}  # key: (used references, html)
+
+    def render(self, text):
+        """Same as `markdown.Markdown(**kwargs).convert(text)`."""
+        md = self.md
+        blocks = preprocess(md, text)
+        stash = md.htmlStash
+        stashed = len(stash.rawHtmlBlocks)
+        references = md.references
+
+        chunks = {}
+        parts = []
+        try:
+            for chunk in iter_chunks(blocks):
+                key = self._key(chunk, stash)
+                self.stats['chunks'] += 1
+
+                cached = chunks.get(key) or self._chunks.get(key)
+                if cached is not None and self._valid(cached[0], references):
+                    self.stats['reused'] += 1
+                else:
+                    self.stats['rendered'] += 1
+                    # inline HTML stashed by the previous chunk is already
+                    # restored in its output
+                    del stash.rawHtmlBlocks[stashed:]
+                    stash.html_counter = stashed
+                    md.references = _RecordingDict(references)
+                    html = render_blocks(md, chunk)
+                    cached = (md.references.used, html)
+
+                chunks[key] = cached
+                parts.append(cached[1])
+        finally:
+            md.references = references
+
+        self._chunks = chunks
+        return join_html(parts)
+
+    def clear(self):
+        self._chunks = {}
+
+    @staticmethod
+    def _key(chunk, stash):
+        stashed = tuple(
+            stash.rawHtmlBlocks[int(index)]
+            for block in chunk
+            for index in util.HTML_PLACEHOLDER_RE.findall(block))
+        return tuple(chunk), stashed
+
+    @staticmethod
+    def _valid(used, references):
+        for ref, value in used.items():
+            if references.get(ref, _MISSING) != value:
+                return False
+        return True
@@ -0,0 +1,168 @@
+"""
+Position-based matching for the amazedown inline patterns
+
+A Python-Markdown 2.6 `Pattern` compiles its regex as `^(.*?)PATTERN(.*)$`,
+and the inline treeprocessor matches it against the whole text again from
+the start after every replacement. When `handleMatch` turns a match down
+(`link_image` does for every link that is not an image link), the
+treeprocessor goes on after it, but only until the next replacement: then
+every turned down match before it is matched and handled again. A paragraph
+of many links takes time quadratic in their number.
+
+`PositionalMixin` gives a pattern a `PositionalRegex` instead, which
+searches `PATTERN` by itself and hands back a match with the groups the
+wrapped regex would have had. It follows the treeprocessor through a text:
+
+-   a match the treeprocessor turned down is not handed back again, unless
+    the text around it changed the match itself;
+-   after a replacement, the search resumes at the placeholder when no
+    bracket, parenthesis or `<` is open before it and the replaced text
+    holds no `"`. A match starting earlier would have to run through the
+    placeholder, and the patterns cannot do that where the replaced text
+    could not be gone through the same way.
+
+Otherwise the search starts over, so the matches, and the output, are the
+very ones of the wrapped regex.
+
+(Python-Markdown 3 has `InlineProcessor` for this, which 2.6 lacks.)
+"""
+import re
+import threading
+
+_STRUCTURE_RE = re.compile(r'[\[\]()<>]')
+
+
+class PositionalMatch(object):
+    """A match of `pattern` in `text`, seen as a match of
+    `^(.*?)pattern(.*)$`."""
+
+    def __init__(self, text, m):
+        self._text = text
+        self._m = m
+        self._last = m.re.groups + 1
+
+    def group(self, index=0):
+        if index == 0:
+            return self._text
+        if index == 1:
+            return self._text[:self._m.start()]
+        if index == self._last:
+            return self._text[self._m.end():]
+        return self._m.group(index)
+
+    def groups(self):
+        return ((self.group(1),) + self._m.groups()[1:] +
+                (self.group(self._last),))
+
+    def span(self, index=0):
+        if index == 0:
+            return 0, len(self._text)
+        if index == 1:
+            return 0, self._m.start()
+        if index == self._last:
+            return self._m.end(), len(self._text)
+        return self._m.span(index)
+
+    def start(self, index=0):
+        return self.span(index)[0]
+
+    def end(self, index=0):
+        return self.span(index)[1]
+
+
+class Chain(object):
+    """What one thread knows of the text the treeprocessor is working on:
+    the matches `handleMatch` turned down, by position, and whether
+    brackets, parentheses or a `<` are open at a position."""
+
+    def __init__(self, text):
+        self.text = text
+        self.rejected = {}
+        self.last = None  # (start, end, groups) of the last match given
+        self._scanned = 0
+        self._brackets = self._parens = 0
+        self._angle = False
+
+    def closed_at(self, end):
+        if end < self._scanned:
+            self._scanned = self._brackets = self._parens = 0
+            self._angle = False
+
+        brackets, parens, angle = self._brackets, self._parens, self._angle
+        for char in _STRUCTURE_RE.findall(self.text, self._scanned, end):
+            if char == '[':
+                brackets += 1
+            elif char == ']':
+                brackets = max(0, brackets - 1)
+            elif char == '(':
+                parens += 1
+            elif char == ')':
+                parens = max(0, parens - 1)
+            else:
+                angle = char == '<'
+        self._brackets, self._parens, self._angle = brackets, parens, angle
+        self._scanned = end
+        return not (brackets or parens or angle)
+
+
+class PositionalRegex(object):
+    """Stands for `re.compile('^(.*?)%s(.*)$' % pattern, flags)`."""
+
+    def __init__(self, pattern, flags=re.DOTALL | re.UNICODE):
+        self.pattern = pattern
+        # the empty group keeps the numbers of the groups, which the
+        # backreferences of the pattern count on
+        self.regex = re.compile('()%s' % pattern, flags)
+        self._local = threading.local()
+
+    def match(self, text):
+        local = self._local
+        chain = getattr(local, 'chain', None)
+        offset = resume = 0
+        if chain is not None:
+            start, end, groups = chain.last
+            if (len(text) == len(chain.text) - end and
+                    chain.text.endswith(text)):
+                # the last match was turned down, the treeprocessor goes on
+                # after it
+                chain.rejected[start] = end, groups
+                offset = end
+            elif text.startswith(chain.prefix):
+                # the last match was replaced by a placeholder
+                if (chain.closed_at(start) and
+                        '"' not in chain.text[start:end]):
+                    resume = start
+                chain.text = text
+            else:
+                chain = None
+
+        if chain is None:
+            chain = local.chain = Chain(text)
+
+        rejected = chain.rejected
+        search = self.regex.search
+        pos = resume
+        while True:
+            m = search(text, pos)
+            if m is None:
+                local.chain = None
+                return None
+
+            groups = m.groups()
+            if rejected.get(offset + m.start()) != (offset + m.end(), groups):
+                break
+            pos = m.end()  # the very match turned down before
+
+        start = offset + m.start()
+        chain.last = start, offset + m.end(), groups
+        chain.prefix = chain.text[:start]
+        return PositionalMatch(text, m)
+
+
+class PositionalMixin(object):
+    """Mixed into a `markdown.inlinepatterns.Pattern` subclass, makes it
+    match with `PositionalRegex`."""
+
+    def __init__(self, pattern, *args, **kwargs):
+        super(PositionalMixin, self).__init__(pattern, *args, **kwargs)
+        self.compiled_re = PositionalRegex(pattern)
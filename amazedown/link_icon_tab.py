@@ -6,10 +6,10 @@ Some codes are from: [markdown-newtab](https://github.com/Undeterminant/markdown
 
 Load this AFTER link_image
 """
-import re
 import logging
 from collections import OrderedDict
 from markdown import Extension
+from markdown.util import string_type
 from markdown.inlinepatterns import \
     LinkPattern, ReferencePattern, AutolinkPattern, AutomailPattern, \
     LINK_RE, REFERENCE_RE, SHORT_REF_RE, IMAGE_LINK_RE, IMAGE_REFERENCE_RE, \
@@ -19,15 +19,19 @@ try:
     from urllib.parse import urlsplit
 except ImportError:
     from urlparse import urlsplit
+from amazedown import trace
+from amazedown.budget import spend
+from amazedown.inline import PositionalMixin
+from amazedown.util import LazyRegex
 
 logger = logging.getLogger('MARKDOWN.link_icon_tab')
 
 
 # pylint: disable=invalid-name, too-few-public-methods
-class LinkIconMixin(object):
+class LinkIconMixin(PositionalMixin):
     """Common extension logic; mixed into the existing classes."""
 
-    _IMG_RE = re.compile(''.join(('^', IMAGE_LINK_RE, '$|^', IMAGE_REFERENCE_RE, '$|^<img\s.*?>$')))
+    _IMG_RE = LazyRegex(''.join(('^', IMAGE_LINK_RE, '$|^', IMAGE_REFERENCE_RE, '$|^<img\s.*?>$')))
 
     brands = OrderedDict((
         ('', 'am-icon-link'),
@@ -46,28 +50,29 @@ class LinkIconMixin(object):
     def __init__(self, *args, **kwargs):
         self._host = kwargs.pop('host', '')
         brands = kwargs.pop('brands', None)
-        if brands is not None:
-            allowed = set(brands).intersection(self.brands)
-            allowed.add('')
-            allowed_brands = OrderedDict((key, self.brands[key]) for key in allowed)
-            self.brands = allowed_brands
+        brand_index = kwargs.pop('brand_index', None)
+        if brand_index is None:
+            brand_index = BrandIndex(
+                load_brands(self.brands, brands, self._host))
 
-        if self._host:
-            self.brands = OrderedDict(self.brands)
-            self.brands[self._host] = self.brands['']
+        self.brands = brand_index.brands
+        self._brand_index = brand_index
 
         super(LinkIconMixin, self).__init__(*args, **kwargs)
 
-
     def handleMatch(self, match):
         """Handles a match on a pattern; used by existing implementation."""
+        if not spend(self.markdown):
+            return None  # left to the plain link patterns
 
         elem = super(LinkIconMixin, self).handleMatch(match)
-        logger.debug(self.type())
+        if trace.TRACE:
+            logger.debug(self.type())
         is_mail = self.type() == 'LinkIconAutomailPattern'
 
         if elem is not None and not self._IMG_RE.match(elem.text):
-            logger.debug('handled %s', elem.get('href', None))
+            if trace.TRACE:
+                logger.debug('handled %s', elem.get('href', None))
             text = elem.text
             link = elem.get('href')
             if is_mail:
@@ -76,36 +81,97 @@ class LinkIconMixin(object):
                 parsed = urlsplit(link)
                 netloc = parsed.netloc
                 icon_class = self.get_brand_icon(netloc)
-                logger.debug('%s -> %s', netloc, icon_class)
+                if trace.TRACE:
+                    logger.debug('%s -> %s', netloc, icon_class)
 
             if icon_class is not None:
-                logger.debug('pre-head icon %s', link)
+                if trace.TRACE:
+                    logger.debug('pre-head icon %s', link)
                 elem.set('class', icon_class)
                 elem.text = ' ' + text
 
             if not is_mail and netloc not in (self._host, ''):
-                logger.debug('external link %s', link)
+                if trace.TRACE:
+                    logger.debug('external link %s', link)
                 elem.text += ' <span class="am-icon-external-link"></span>'
                 elem.set('target', '_blank')
 
         return elem
 
     def get_brand_icon(self, host):
-        if host == '':
-            return self.brands['']
+        return self._brand_index.lookup(host)
+
+
+def load_brands(base, brands=None, host=''):
+    """Build the brand table used by `LinkIconMixin`.
 
-        for k, icon in self.brands.items():
-            if k == '':
-                continue
+    `brands` can be:
 
-            logger.debug('%s/%s - %s', host, k, icon)
-            if host == k:
-                return icon
+    * `None`: use `base` as it is
+    * a list of domains: only keep these entries of `base`
+    * a mapping of domain -> icon class: use it instead of `base`
+    * a path to a JSON file holding such a mapping
+
+    When `host` is given, it gets the same icon as the empty domain.
+    """
+    if brands is None:
+        result = OrderedDict(base)
+    else:
+        if isinstance(brands, string_type):
+            import json  # only for brands given as a file
+
+            with open(brands) as f:
+                brands = json.load(f, object_pairs_hook=OrderedDict)
+
+        if hasattr(brands, 'items'):
+            result = OrderedDict(brands)
+            result.setdefault('', base[''])
+        else:
+            allowed = set(brands)
+            allowed.add('')
+            result = OrderedDict(
+                (key, icon) for key, icon in base.items() if key in allowed)
+
+    if host:
+        result[host] = result['']
+
+    return result
+
+
+class BrandIndex(object):
+    """Suffix index over a brand table.
+
+    A host matches a domain when it is the domain itself or one of its
+    sub-domains, and the earliest matching entry of the table wins. Every
+    domain is stored with its position in the table, so a lookup only
+    checks the suffixes of the host starting at a label boundary, no
+    matter how large the table is.
+    """
+
+    def __init__(self, brands):
+        self.brands = brands
+        self.default = brands.get('')
+        self._index = dict(
+            (domain, (order, icon))
+            for order, (domain, icon) in enumerate(brands.items())
+            if domain != '')
+
+    def lookup(self, host):
+        if host == '':
+            return self.default
 
-            if host.endswith('.' + k):
-                return icon
+        index = self._index
+        found = index.get(host)
+        dot = host.find('.')
+        while dot != -1:
+            suffix = index.get(host[dot + 1:])
+            if suffix is not None and (found is None or suffix[0] < found[0]):
+                found = suffix
+            dot = host.find('.', dot + 1)
 
-        return None
+        if found is None:
+            return None
+        return found[1]
 
 
 class LinkIconLinkPattern(LinkIconMixin, LinkPattern):
@@ -134,44 +200,48 @@ class LinkIconTabExtension(Extension):
 
     def __init__(self, **kwargs):
         self.config = {'host': [kwargs.get('host', ''), 'host name'],
-                       'brands': [kwargs.get('brands', None), 'auto banner']}
+                       'brands': [kwargs.get('brands', None),
+                                  'domains, domain -> icon mapping, '
+                                  'or a JSON file of the mapping']}
         super(LinkIconTabExtension, self).__init__(**kwargs)
 
     def extendMarkdown(self, md, md_globals):
         host = self.getConfig('host', '')
         brands = self.getConfig('brands', None)
+        brand_index = BrandIndex(
+            load_brands(LinkIconMixin.brands, brands, host))
 
         md.inlinePatterns.add(
             'link_icon_tab_link',
             LinkIconLinkPattern(LINK_RE, md,
-                                host=host, brands=brands),
+                                host=host, brand_index=brand_index),
             '<link')
 
         md.inlinePatterns.add(
             'link_icon_tab_reference',
             LinkIconReferencePattern(REFERENCE_RE, md,
-                                     host=host, brands=brands),
+                                     host=host, brand_index=brand_index),
             '<reference'
         )
 
         md.inlinePatterns.add(
             'link_icon_tab_short_reference',
             LinkIconReferencePattern(SHORT_REF_RE, md,
-                                     host=host, brands=brands),
+                                     host=host, brand_index=brand_index),
             '<short_reference'
         )
 
         md.inlinePatterns.add(
             'link_icon_tab_autolink',
             LinkIconReferencePattern(SHORT_REF_RE, md,
-                                     host=host, brands=brands),
+                                     host=host, brand_index=brand_index),
             '<autolink'
         )
 
         md.inlinePatterns.add(
             'link_icon_tab_automail',
             LinkIconAutomailPattern(AUTOMAIL_RE, md,
-                                    host=host, brands=brands),
+                                    host=host, brand_index=brand_index),
             '<automail'
         )
 
@@ -195,6 +265,7 @@ def makeExtension(**kwargs):
 
 if __name__ == '__main__':
     import markdown
+    trace.enable()
     logging.basicConfig(level=logging.DEBUG)
 
     # text = '[![img](img_link)](/some/link "try")'
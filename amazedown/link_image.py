@@ -3,80 +3,107 @@ Image link wrapper for AmazeUI
 
 Load this BEFORE link_icon_tab
 """
-import re
 import logging
-import mimetypes
 from markdown import Extension
 from markdown.util import etree
 from markdown.inlinepatterns import \
-    ImagePattern, ImageReferencePattern, LinkPattern, ReferencePattern, \
+    LinkPattern, ReferencePattern, dequote, handleAttributes, \
     LINK_RE, SHORT_REF_RE, REFERENCE_RE, IMAGE_REFERENCE_RE, IMAGE_LINK_RE
+from amazedown.image_type import is_image
+from amazedown import trace
+from amazedown.budget import spend
+from amazedown.inline import PositionalMixin
+from amazedown.util import LazyRegex
+from amazedown.widget import figure
 
 
 logger = logging.getLogger('MARKDOWN.link_image')
 
 
 # pylint: disable=invalid-name, too-few-public-methods
-class LinkImageMixin(object):
+class LinkImageMixin(PositionalMixin):
     """Common extension logic; mixed into the existing classes."""
-    _COM_IMAGE_LINK_RE = re.compile('^%s$' % IMAGE_LINK_RE)
-    _COM_IMAGE_REFERENCE_RE = re.compile('^%s$' % IMAGE_REFERENCE_RE)
+    _COM_IMAGE_LINK_RE = LazyRegex('^%s$' % IMAGE_LINK_RE)
+    _COM_IMAGE_REFERENCE_RE = LazyRegex('^%s$' % IMAGE_REFERENCE_RE)
+    NEWLINE_CLEANUP_RE = ReferencePattern.NEWLINE_CLEANUP_RE
 
     def handleMatch(self, m):
         """Handles a match on a pattern; used by existing implementation."""
+        if not spend(self.markdown):
+            return None  # left to the plain link patterns
 
         elem = super(LinkImageMixin, self).handleMatch(m)
         if elem is None:
             return None
 
-        mime, _ = mimetypes.guess_type(elem.get('href'))
-        if not mime or not mime.startswith('image'):
-            logger.debug('not image link wrapper')
+        if not is_image(elem.get('href')):
+            if trace.TRACE:
+                logger.debug('not image link wrapper')
             return None
 
         text = elem.text
         inside = self._get_inside_img(text)
-        logger.debug(text)
+        if trace.TRACE:
+            logger.debug(text)
         if inside is None:
-            logger.debug('inside image not found')
+            if trace.TRACE:
+                logger.debug('inside image not found')
             return None
 
-        logger.debug(inside)
+        if trace.TRACE:
+            logger.debug(inside)
         src, alt, title = inside
-
-        root = etree.Element('figure')
-        root.set('data-am-widget', 'figure')
-        root.set('class', 'am am-figure am-figure-default')
-        root.set('data-am-figure', "{  pureview: 'true' }")
-
-        source_img = etree.SubElement(root, 'img') # root.find('img')
-        source_img.set('src', src)
-        source_img.set('data-rel', elem.get('href'))
-        if alt:
-            source_img.set('alt', alt)
-        if title:
-            source_img.set('title', title)
-            fig_caption = etree.SubElement(root, 'figcaption')
-            fig_caption.set('class', 'am-figure-capition-btm')
-            fig_caption.text = title
-        return root
+        return figure(None, src, alt, title, rel=elem.get('href'))
 
     def _get_inside_img(self, text):
-        if self._COM_IMAGE_LINK_RE.match(text) is None:
-            logger.debug('image ref inside not found')
-            if self._COM_IMAGE_REFERENCE_RE.match(text) is None:
+        """Parse the `![alt](src "title")` or `![alt][ref]` that is the
+        whole link text, return `(src, alt, title)` or None."""
+        m = self._COM_IMAGE_LINK_RE.match(text)
+        if m is not None:
+            src_parts = m.group(8).split()
+            if src_parts:
+                src = src_parts[0]
+                if src[0] == "<" and src[-1] == ">":
+                    src = src[1:-1]
+                src = self.sanitize_url(self.unescape(src))
+            else:
+                src = ''
+            if len(src_parts) > 1:
+                title = dequote(self.unescape(" ".join(src_parts[1:])))
+            else:
+                title = None
+        else:
+            if trace.TRACE:
                 logger.debug('image link inside not found')
+            m = self._COM_IMAGE_REFERENCE_RE.match(text)
+            if m is None:
+                if trace.TRACE:
+                    logger.debug('image ref inside not found')
                 return None
-            pattern = ImageReferencePattern(IMAGE_REFERENCE_RE, self.markdown)
-        else:
-            pattern = ImagePattern(IMAGE_LINK_RE, self.markdown)
 
-        m = pattern.compiled_re.match(text)
-        elem = pattern.handleMatch(m)
-        src = elem.get('src')
-        alt = elem.get('alt', None)
-        title = elem.get('title', None)
-        return src, alt, title
+            ref = (m.group(8) or m.group(1)).lower()
+            ref = self.NEWLINE_CLEANUP_RE.sub(' ', ref)
+            if ref not in self.markdown.references:
+                if trace.TRACE:
+                    logger.debug('image ref %s not defined', ref)
+                return None
+
+            src, title = self.markdown.references[ref]
+            src = self.sanitize_url(src)
+            title = title or None
+
+        alt = m.group(1)
+        if self.markdown.enable_attributes and '{@' in alt:
+            # `{@key=value}` in the alt text may override src and title
+            elem = etree.Element('img')
+            elem.set('src', src)
+            if title:
+                elem.set('title', title)
+            alt = handleAttributes(alt, elem)
+            src = elem.get('src')
+            title = elem.get('title', None)
+
+        return src, self.unescape(alt), title
 
 
 class LinkImageLinkPattern(LinkImageMixin, LinkPattern):
@@ -121,6 +148,7 @@ def makeExtension(**kwargs):
 
 if __name__ == '__main__':
     import markdown
+    trace.enable()
     from amazedown import link_icon_tab
     logging.basicConfig(level=logging.DEBUG)
 
@@ -1,66 +1,44 @@
-import re
 import logging
-import mimetypes
-from markdown.blockprocessors import BlockProcessor
 from markdown import Extension
-from markdown.util import etree
+from amazedown.block import AmazeBlockProcessor
+from amazedown.image_type import is_image
+from amazedown.tokenizer import LinkImageToken
+from amazedown.widget import figure
+from amazedown import trace
 
 logger = logging.getLogger('MARKDOWN.link_image_block')
 
 
-class LinkImageBlockProcesser(BlockProcessor):
-
-    _LINK_IMG_RE = re.compile(r'^'
-                              r'\[\s?'
-                                   r'!\[(?P<alt>[\s\S]*?)\]'  # ![] img alt
-                                   r'('
-                                       r'\('
-                                           r'(?P<src>.+?)'
-                                           r'(\s+'
-                                               r'(?P<img_title>.+?)'
-                                           r')?\s?'
-                                       r'\)'
-                                   r'|'
-                                       r'\[(?P<img_ref>.*?)\]'
-                                   r')'  # img src
-                              r'\s?\]' # [] link text
-                              r'('
-                                   r'\('
-                                        r'(?P<href>.*?)'
-                                        r"""(\s+['"]"""
-                                            r'(?P<title>.+?)'
-                                        r"""['"])?\s?"""
-                                   r'\)'  # () link link & title
-                              r'|'  # or
-                                  r'\[(?P<ref>.+?)\]'  # [] link ref
-                              r')'
-                              r'$')
-
-    def test(self, parent, block):
+class LinkImageBlockProcesser(AmazeBlockProcessor):
+    FIRST_CHARS = '['
+    LAST_CHARS = ')]'
+    MIN_LENGTH = 9
+
+    def test_block(self, parent, block):
         # return True
         block = block.strip()
-        logger.info(repr(block))
-        self._matched = self._LINK_IMG_RE.match(block)
+        if trace.TRACE:
+            logger.info(repr(block))
 
-        return self._matched is not None
+        token = self.tokenizer.match(block, self.check)
+        return isinstance(token, LinkImageToken)
 
     def run(self, parent, blocks):
         block = blocks.pop(0)
 
-        matched = getattr(self, '_matched', None)
-        if matched is None:
-            matched = self._LINK_IMG_RE.match(block.rstrip())
+        token = self.tokenizer.match(block.strip())
 
-        matched_dict = matched.groupdict()
-        logger.debug(matched_dict)
+        if trace.TRACE:
+            logger.debug(token)
 
-        href = matched_dict['href']
-        link_title = matched_dict['title']
+        href = token.href
+        link_title = token.link_title
 
         if href is None:
-            ref = matched_dict['ref']
+            ref = token.link_ref
             if ref is None or ref not in self.parser.markdown.references:
-                logger.debug('no ref found')
+                if trace.TRACE:
+                    logger.debug('no ref found')
                 blocks.insert(0, block)
                 return False
 
@@ -69,18 +47,19 @@ class LinkImageBlockProcesser(BlockProcessor):
         elif href.startswith('<'):
             href = href[1:-1]
 
-        href_mime = mimetypes.guess_type(href)[0]
-        if href_mime is None or not href_mime.startswith('image'):
-            logger.debug('%s not image', href)
+        if not is_image(href):
+            if trace.TRACE:
+                logger.debug('%s not image', href)
             blocks.insert(0, block)
             return False
 
-        src = matched_dict['src']
-        img_title = matched_dict['img_title']
+        src = token.src
+        img_title = token.title
         if src is None:
-            img_ref = matched_dict['img_ref']
+            img_ref = token.ref
             if img_ref is None or img_ref not in self.parser.markdown.references:
-                logger.debug('no ref found')
+                if trace.TRACE:
+                    logger.debug('no ref found')
                 blocks.insert(0, block)
                 return False
 
@@ -88,22 +67,7 @@ class LinkImageBlockProcesser(BlockProcessor):
 
         img_title = img_title or link_title
 
-        root = etree.SubElement(parent, 'figure')
-        root.set('data-am-widget', 'figure')
-        root.set('class', 'am am-figure am-figure-default')
-        root.set('data-am-figure', "{  pureview: 'true' }")
-
-        source_img = etree.SubElement(root, 'img')  # root.find('img')
-        source_img.set('src', src)
-        source_img.set('data-rel', href)
-        if matched_dict['alt']:
-            source_img.set('alt', matched_dict['alt'])
-        if img_title:
-            source_img.set('title', img_title)
-            fig_caption = etree.SubElement(root, 'figcaption')
-            fig_caption.set('class', 'am-figure-capition-btm')
-            fig_caption.text = img_title
-
+        figure(parent, src, token.alt, img_title, rel=href)
         return True
 
 
@@ -125,6 +89,7 @@ def makeExtension(configs=None):
 
 if __name__ == '__main__':
     import markdown
+    trace.enable()
     logging.basicConfig(level=logging.DEBUG, format='\033[32m%(levelname)1.1s\033[0m[%(lineno)3s]%(msg)s')
 
     md = """
@@ -35,94 +35,56 @@ result:
 
 import re
 import logging
-from markdown.blockprocessors import BlockProcessor
 from markdown import Extension
 from markdown.util import etree
+from amazedown.block import AmazeBlockProcessor
+from amazedown.tokenizer import LinkImageToken
+from amazedown.widget import gallery, GalleryItem
+from amazedown import trace
 
 logger = logging.getLogger('MARKDOWN.list_gallery')
 
 
-class ListGalleryProcesserProcesser(BlockProcessor):
-    # _IMG_RE = ImageBlockProcesser._IMG_RE
-    # _LINK_IMG_RE = LinkImageBlockProcesser._LINK_IMG_RE
-
-    _IMG_RE = re.compile(
-
-          r'\[\s?'
-               r'!\[(?P<alt>[\s\S]*?)\]'  # ![] img alt
-               r'('
-                   r'\('
-                       r'(?P<src>.+?)'
-                       r'(\s+'
-                           r'(?P<title>.+?)'
-                       r')?\s?'
-                   r'\)'
-               r'|'
-                   r'\[(?P<ref>.*?)\]'
-               r')'  # img src
-          r'\s?\]' # [] link text
-          r'('
-               r'\('
-                    r'(?P<preview>.*?)'
-                    r"""(\s+['"]"""
-                        r'(?P<preview_title>.+?)'
-                    r"""['"])?\s?"""
-               r'\)'  # () link link & title
-          r'|'  # or
-              r'\[(?P<preview_ref>.+?)\]'  # [] link ref
-          r')'
-
-        r'|'
-
-            r'!\[(?P<alt2>[\s\S]*?)\]'  # ![] img alt
-            r'('
-                r'\('
-                    r'(?P<src2>.+?)'
-                    r'(\s+'
-                        r'(?P<title2>.+?)'
-                    r')?\s?'
-                r'\)'
-            r'|'
-                r'\[(?P<ref2>.*?)\]'
-            r')'
-
-    )
+class ListGalleryProcesserProcesser(AmazeBlockProcessor):
+    FIRST_CHARS = '-'
+    MIN_LENGTH = 2
+    STRIP = False
 
     _LEADING = re.compile(r'[\+\-\*]')
     _EMPTY = re.compile(r'^[\n\ ]*$')
 
-    def test(self, parent, block):
-        if not block.startswith('-') or len(block) < 2:
-            return None
+    def test_block(self, parent, block):
+        if trace.TRACE:
+            logger.debug(block)
 
-        logger.debug(block)
-
-        result = self._raw_result = self._formal(block)
+        result = self._formal(block, self.check)
+        if not result:
+            return False
 
-        return bool(result)
+        self.remember(block, result)
+        return True
 
     def run(self, parent, blocks):
-        result = getattr(self, '_raw_result', None)
+        result = self.recall(blocks[0])
         if not result:
             result = self._formal(blocks[0])
 
         blocks.pop(0)
 
-        levels = self._parse_level(x['level'] for x in result)
+        levels = self._parse_level(x.level for x in result)
         if levels is None:
-            logger.debug('level failed')
+            if trace.TRACE:
+                logger.debug('level failed')
             return False
 
-        logger.debug('get levels %s', levels)
+        if trace.TRACE:
+            logger.debug('get levels %s', levels)
 
         large, middle, small = levels
 
         small = small or 1
 
         wrapper = etree.SubElement(parent, 'div')
-        root = etree.SubElement(wrapper, 'ul')
-        root.set('data-am-widget', 'gallery')
-
         classes = ['am-gallery', 'am-gallery-bordered',
                    'am-avg-sm-%s ' % small]
 
@@ -131,40 +93,16 @@ class ListGalleryProcesserProcesser(BlockProcessor):
         if large:
             classes.append('am-avg-lg-%s' % large)
 
-        root.set('class', ' '.join(classes))
-
-        root.set('data-am-gallery',
-                 "{pureview:{target: 'a', weChatImagePreview: false}}")
-        for each in result:
-            # {'preview': 'link4', 'src': 'pre-link4', 'title': None}
-            item = etree.SubElement(root, 'li')
-            container = etree.SubElement(item, 'div')
-            container.set('class', 'am-gallery-item')
-
-            preview_link = etree.SubElement(container, 'a')
-            preview_link.set('href', each['preview'] or each['src'])
-
-            img = etree.SubElement(preview_link, 'img')
-            img.set('src', each['src'])
-
-            if each['alt']:
-                img.set('alt', each['alt'])
-
-            if each['title']:
-                img.set('title', each['title'])
-                title = etree.SubElement(preview_link, 'h6')
-                title.set('class', "am-gallery-title")
-                title.text = each['title']
+        gallery(wrapper, ' '.join(classes), result)
 
         return True
 
-    def _formal(self, block):
+    def _formal(self, block, check=None):
         prev_end = None
         results = []
         refs = self.parser.markdown.references
-        for each in self._IMG_RE.finditer(block):
-            this_result = {}
-            this_start, this_end = each.span(0)
+        tokens = self.tokenizer.scan(block, check)
+        for this_start, this_end, token in tokens:
             if prev_end is None:
                 prev = 0
             else:
@@ -172,31 +110,29 @@ class ListGalleryProcesserProcesser(BlockProcessor):
 
             leading = block[prev: this_start]
             space, count = self._LEADING.subn(' ', leading)
-            logger.debug(repr(space))
-            logger.debug(self._EMPTY.match(space))
+            if trace.TRACE:
+                logger.debug(repr(space))
+                logger.debug(self._EMPTY.match(space))
             if not self._EMPTY.match(space) or count > 3:
-                logger.debug('leading failed %s / %s', leading, count)
+                if trace.TRACE:
+                    logger.debug('leading failed %s / %s', leading, count)
                 return None
 
-            this_result['level'] = count
-
             prev_end = this_end
 
-            group_dict = each.groupdict()
+            is_link = isinstance(token, LinkImageToken)
 
-            alt = group_dict['alt'] or group_dict['alt2']
-            title = (group_dict['title'] or
-                     group_dict['title2'] or
-                     group_dict['preview_title'])
-            src = group_dict['src'] or group_dict['src2']
+            alt = token.alt
+            title = token.title or (token.link_title if is_link else None)
+            src = token.src
             if not src:
-                ref = group_dict['ref'] or group_dict['ref2']
+                ref = token.ref
                 if ref is None or ref not in refs:
                     return None
 
                 src, title = refs[ref]
 
-            preview_ref = group_dict['preview_ref']
+            preview_ref = token.link_ref if is_link else None
             if preview_ref:
                 if preview_ref not in refs:
                     return None
@@ -205,15 +141,12 @@ class ListGalleryProcesserProcesser(BlockProcessor):
                 if title is None:
                     title = _title
             else:
-                preview = group_dict['preview']
-
-            this_result['alt'] = alt
-            this_result['title'] = title
-            this_result['src'] = src
-            this_result['preview'] = preview or src
+                preview = token.href if is_link else None
 
-            results.append(this_result)
-            logger.debug(this_result)
+            item = GalleryItem(preview or src, src, alt, title, count)
+            results.append(item)
+            if trace.TRACE:
+                logger.debug(item)
 
         return results
 
@@ -235,15 +168,18 @@ class ListGalleryProcesserProcesser(BlockProcessor):
             gap_limit = 1
 
         for index, each in enumerate(loop, 1):
-            logger.debug(each)
+            if trace.TRACE:
+                logger.debug(each)
             gap = first - each
             if gap > gap_limit or level[gap] != 0:
                 continue
 
             level[gap] = index
-            logger.info((index, each, gap, level))
+            if trace.TRACE:
+                logger.info((index, each, gap, level))
 
-        logger.debug(level)
+        if trace.TRACE:
+            logger.debug(level)
         return level
 
 
@@ -265,6 +201,7 @@ def makeExtension(configs=None):
 
 if __name__ == '__main__':
     import markdown
+    trace.enable()
     logging.basicConfig(
         level=logging.DEBUG,
         format='\033[32m%(levelname)1.1s\033[0m[%(lineno)3s]%(message)s')
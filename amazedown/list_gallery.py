@@ -27,98 +27,74 @@ result:
 """
 
 import logging
-from markdown.blockprocessors import BlockProcessor
 from markdown import Extension
-from markdown.util import etree
-from amazedown.image_block import ImageBlockProcesser
-from amazedown.link_image_block import LinkImageBlockProcesser
+from amazedown.block import AmazeBlockProcessor
+from amazedown.tokenizer import ImageToken
+from amazedown.widget import gallery, GalleryItem
+from amazedown import trace
 
 logger = logging.getLogger('MARKDOWN.list_gallery')
 
 
-class ListGalleryProcesserProcesser(BlockProcessor):
-    _IMG_RE = ImageBlockProcesser._IMG_RE
-    _LINK_IMG_RE = LinkImageBlockProcesser._LINK_IMG_RE
+class ListGalleryProcesserProcesser(AmazeBlockProcessor):
+    FIRST_CHARS = '-'
+    MIN_LENGTH = 2
+    STRIP = False
 
-    def test(self, parent, block):
-        if not block.startswith('-') or len(block) < 2:
-            return None
-
-        result = self._match_result = self._formal(block)
+    def test_block(self, parent, block):
+        result = self._formal(block, self.check)
         if result is None:
             return False
-        logger.debug(result)
+
+        self.remember(block, result)
+        if trace.TRACE:
+            logger.debug(result)
         return True
 
     def run(self, parent, blocks):
-        result = getattr(self, '_match_result', None)
+        result = self.recall(blocks[0])
         if not result:
             result = self._formal(blocks[0])
 
         blocks.pop(0)
 
-        root = etree.SubElement(parent, 'ul')
-        root.set('data-am-widget', 'gallery')
-        root.set('class', 'am-gallery am-avg-sm-1 am-gallery-bordered')
-        root.set('data-am-gallery',
-                 "{pureview:{target: 'a', weChatImagePreview: false}}")
-        for each in result:
-            # {'preview': 'link4', 'src': 'pre-link4', 'title': None}
-            item = etree.SubElement(root, 'li')
-            container = etree.SubElement(item, 'div')
-            container.set('class', 'am-gallery-item')
-
-            preview_link = etree.SubElement(container, 'a')
-            preview_link.set('href', each['preview'] or each['src'])
-
-            img = etree.SubElement(preview_link, 'img')
-            img.set('src', each['src'])
-
-            if each['alt']:
-                img.set('alt', each['alt'])
-
-            if each['title']:
-                img.set('title', each['title'])
-                title = etree.SubElement(preview_link, 'h6')
-                title.set('class', "am-gallery-title")
-                title.text = each['title']
+        gallery(parent, 'am-gallery am-avg-sm-1 am-gallery-bordered', result)
 
         return True
 
-    def _formal(self, block):
+    def _formal(self, block, check=None):
         items = block.split('\n-')
         items[0] = items[0][1:]
         result = []
         for item in items:
             item = item.lstrip()
-            logger.debug(repr(item))
-            matched = self._IMG_RE.match(item)
-            if matched:
-                group_dict = matched.groupdict()
+            if trace.TRACE:
+                logger.debug(repr(item))
+            token = self.tokenizer.match(item, check)
+            if token is None:
+                if trace.TRACE:
+                    logger.debug('none matched')
+                return None
+
+            if isinstance(token, ImageToken):
                 preview = None
-                src = group_dict['src']
-                title = group_dict['title']
+                src = token.src
+                title = token.title
                 if src is None:
-                    ref = group_dict['ref']
+                    ref = token.ref
                     if (ref is None or
                                 ref not in self.parser.markdown.references):
-                        logger.debug('ref not found')
+                        if trace.TRACE:
+                            logger.debug('ref not found')
                         return None
                     src, title = self.parser.markdown.references[ref]
 
             else:
-                matched = self._LINK_IMG_RE.match(item)
-                if not matched:
-                    logger.debug('none matched')
-                    return None
-
-                group_dict = matched.groupdict()
-
-                preview = group_dict['href']
-                link_title = group_dict['title']
+                preview = token.href
+                link_title = token.link_title
 
                 if preview is None:
-                    ref = group_dict['ref']
+                    ref = token.link_ref
                     if (ref is None or
                                 ref not in self.parser.markdown.references):
                         return None
@@ -128,22 +104,24 @@ class ListGalleryProcesserProcesser(BlockProcessor):
                 elif preview.startswith('<'):
                     preview = preview[1:-1]
 
-                src = group_dict['src']
-                img_title = group_dict['img_title']
+                src = token.src
+                img_title = token.title
                 if src is None:
-                    img_ref = group_dict['img_ref']
+                    img_ref = token.ref
                     if (img_ref is None or
                                 img_ref not in self.parser.markdown.references):
-                        logger.debug('no ref found')
+                        if trace.TRACE:
+                            logger.debug('no ref found')
                         return None
 
                     src, img_title = self.parser.markdown.references[img_ref]
 
                 title = img_title or link_title
 
-            result.append({'src': src, 'preview': preview, 'title':title,
-                           'alt': group_dict['alt']})
-            logger.debug(result[-1])
+            result.append(
+                GalleryItem(preview or src, src, token.alt, title, 1))
+            if trace.TRACE:
+                logger.debug(result[-1])
 
         return result
 
@@ -165,6 +143,7 @@ def makeExtension(configs=None):
 
 if __name__ == '__main__':
     import markdown
+    trace.enable()
     logging.basicConfig(
         level=logging.DEBUG,
         format='\033[32m%(levelname)1.1s\033[0m[%(lineno)3s]%(msg)s')
@@ -0,0 +1,285 @@
+"""
+Per-extension metrics of the amazedown processors
+
+    md = markdown.Markdown(extensions=[
+        link_icon_tab.makeExtension(host=host),
+        list_avg_gallery.makeExtension(),
+        metrics.makeExtension(),
+    ])
+    html = md.convert(text)
+    md.metrics['extensions']['list_avg_gallery']['seconds']
+
+    metrics.prometheus()  # the totals of the process
+
+With this extension loaded, every amazedown block processor and inline
+pattern of the instance is counted and timed, per extension (the amazedown
+module it comes from):
+
+    calls     blocks its block processors tested, matches handed to its
+              inline patterns
+    matches   those it rendered
+    misses    those it left to the other processors
+    seconds   wall time spent in its code and regexes, without the time of
+              the processors it runs in turn: the gallery in a quote counts
+              for the gallery
+
+`seconds` of the document is the whole conversion; what the extensions do
+not account for is core Markdown. `md.metrics` holds the dict of the last
+document, `totals()` the sums of every document of the process, and
+`prometheus()` gives them in the Prometheus text exposition format.
+
+The processors are wrapped when the first document starts, so the extension
+can be loaded in any order. Without it nothing is wrapped or counted.
+"""
+import threading
+from timeit import default_timer
+from markdown import Extension
+from markdown.preprocessors import Preprocessor
+from markdown.postprocessors import Postprocessor
+from amazedown.util import extension_name
+
+FIELDS = ('calls', 'matches', 'misses', 'seconds')
+CALLS, MATCHES, MISSES, SECONDS = range(len(FIELDS))
+HELP = {
+    'calls': 'Blocks tested and matches handled by the extension.',
+    'matches': 'Blocks and matches the extension rendered.',
+    'misses': 'Blocks and matches the extension left to others.',
+    'seconds': 'Wall time spent in the extension, without what it runs.',
+}
+
+_lock = threading.Lock()
+_totals = {}
+
+
+def _empty():
+    return {'documents': 0, 'seconds': 0.0, 'extensions': {}}
+
+
+class _TimedRegex(object):
+    """Stands for the compiled regex of a pattern, timing its `match`."""
+
+    def __init__(self, regex, recorder, counts):
+        self._regex = regex
+        self.match = recorder.timed(counts, regex.match)
+
+    def __getattr__(self, name):
+        return getattr(self._regex, name)
+
+
+class Recorder(object):
+    """The counts of one Markdown instance, for the document in hand."""
+
+    def __init__(self):
+        self.wrapped = False
+        self.extensions = {}
+        # for each timed call running, the time of the timed calls it made
+        self._nested = []
+        self.start()
+
+    def start(self):
+        for counts in self.extensions.values():
+            counts[:] = [0, 0, 0, 0.0]
+        del self._nested[:]
+        self._start = default_timer()
+
+    def finish(self):
+        """The dict of the document."""
+        return {'documents': 1, 'seconds': default_timer() - self._start,
+                'extensions': dict((name, dict(zip(FIELDS, counts)))
+                                   for name, counts in
+                                   self.extensions.items())}
+
+    def counts(self, name):
+        counts = self.extensions.get(name)
+        if counts is None:
+            counts = self.extensions[name] = [0, 0, 0, 0.0]
+        return counts
+
+    def timed(self, counts, call):
+        """`call`, adding the time it takes to `counts`."""
+        nested = self._nested
+
+        def timed_call(*args):
+            nested.append(0.0)
+            start = default_timer()
+            try:
+                return call(*args)
+            finally:
+                elapsed = default_timer() - start
+                counts[SECONDS] += elapsed - nested.pop()
+                if nested:
+                    nested[-1] += elapsed
+        return timed_call
+
+    def wrap(self, md):
+        """Wrap the amazedown processors of `md`, once."""
+        if self.wrapped:
+            return
+        self.wrapped = True
+
+        for processor in md.parser.blockprocessors.values():
+            name = extension_name(processor)
+            if name is not None:
+                self._wrap_block(processor, self.counts(name))
+
+        for pattern in md.inlinePatterns.values():
+            # the handlers `amazedown.all` matches with
+            for _, handlers in getattr(pattern.compiled_re, 'kinds', ()):
+                for _, handler in handlers:
+                    name = extension_name(handler)
+                    if name is not None:
+                        self._wrap_inline(handler, self.counts(name))
+
+            name = extension_name(pattern)
+            if name is not None:
+                counts = self.counts(name)
+                self._wrap_inline(pattern, counts)
+                pattern.compiled_re = _TimedRegex(pattern.compiled_re, self,
+                                                  counts)
+
+    def _wrap_block(self, processor, counts):
+        test = self.timed(counts, processor.test)
+        run = self.timed(counts, processor.run)
+
+        def test_block(parent, block):
+            counts[CALLS] += 1
+            result = test(parent, block)
+            if not result:
+                counts[MISSES] += 1
+            return result
+
+        def run_block(parent, blocks):
+            result = run(parent, blocks)
+            counts[MISSES if result is False else MATCHES] += 1
+            return result
+
+        processor.test = test_block
+        processor.run = run_block
+
+    def _wrap_inline(self, pattern, counts):
+        handle = self.timed(counts, pattern.handleMatch)
+
+        def handle_match(m):
+            counts[CALLS] += 1
+            node = handle(m)
+            counts[MISSES if node is None else MATCHES] += 1
+            return node
+
+        pattern.handleMatch = handle_match
+
+
+def _add(document):
+    with _lock:
+        if not _totals:
+            _totals.update(_empty())
+        _totals['documents'] += document['documents']
+        _totals['seconds'] += document['seconds']
+        extensions = _totals['extensions']
+        for name, counts in document['extensions'].items():
+            total = extensions.setdefault(name, dict.fromkeys(FIELDS, 0))
+            for field in FIELDS:
+                total[field] += counts[field]
+
+
+def totals():
+    """The sums of every document rendered with metrics in this process."""
+    with _lock:
+        if not _totals:
+            return _empty()
+        return {'documents': _totals['documents'],
+                'seconds': _totals['seconds'],
+                'extensions': dict((name, dict(counts)) for name, counts in
+                                   _totals['extensions'].items())}
+
+
+def reset():
+    """Forget the totals of the process."""
+    with _lock:
+        _totals.clear()
+
+
+def _number(value):
+    return repr(value) if isinstance(value, float) else '%d' % value
+
+
+def prometheus(metrics=None, prefix='amazedown'):
+    """`metrics`, the totals of the process by default, in the Prometheus
+    text exposition format."""
+    if metrics is None:
+        metrics = totals()
+
+    lines = []
+
+    def family(name, description):
+        lines.append('# HELP %s_%s_total %s' % (prefix, name, description))
+        lines.append('# TYPE %s_%s_total counter' % (prefix, name))
+
+    family('documents', 'Documents rendered.')
+    lines.append('%s_documents_total %s' % (
+        prefix, _number(metrics['documents'])))
+    family('document_seconds', 'Wall time spent rendering the documents.')
+    lines.append('%s_document_seconds_total %s' % (
+        prefix, _number(metrics['seconds'])))
+
+    extensions = sorted(metrics['extensions'].items())
+    for field in FIELDS:
+        family('extension_' + field, HELP[field])
+        for name, counts in extensions:
+            lines.append('%s_extension_%s_total{extension="%s"} %s' % (
+                prefix, field, name, _number(counts[field])))
+    return '\n'.join(lines) + '\n'
+
+
+class StartMetricsPreprocessor(Preprocessor):
+    """Starts the counts over for every document."""
+
+    def __init__(self, md, recorder):
+        super(StartMetricsPreprocessor, self).__init__(md)
+        self.recorder = recorder
+
+    def run(self, lines):
+        self.recorder.wrap(self.markdown)
+        self.recorder.start()
+        return lines
+
+
+class FinishMetricsPostprocessor(Postprocessor):
+    """Hands the counts of the document to `md.metrics` and the totals."""
+
+    def __init__(self, md, recorder):
+        super(FinishMetricsPostprocessor, self).__init__(md)
+        self.recorder = recorder
+
+    def run(self, text):
+        self.markdown.metrics = self.recorder.finish()
+        _add(self.markdown.metrics)
+        return text
+
+
+class MetricsExtension(Extension):
+
+    def extendMarkdown(self, md, md_globals):
+        recorder = Recorder()
+        md.metrics = _empty()
+        md.preprocessors.add('amazedown_metrics',
+                             StartMetricsPreprocessor(md, recorder), '_begin')
+        md.postprocessors.add('amazedown_metrics',
+                              FinishMetricsPostprocessor(md, recorder), '_end')
+
+
+def makeExtension(**kwargs):
+    """Loads the extension."""
+    return MetricsExtension(**kwargs)
+
+
+if __name__ == '__main__':
+    import markdown
+    from amazedown import link_icon_tab, list_gallery
+
+    md = markdown.Markdown(extensions=[
+        makeExtension(), link_icon_tab.makeExtension(),
+        list_gallery.makeExtension()])
+    md.convert('[one](http://github.com) [two](http://example.com)\n\n'
+               '-   ![a](a.jpg)\n-   ![b](b.jpg)\n')
+    print(md.metrics)
+    print(prometheus())
@@ -0,0 +1,173 @@
+"""
+Render one large document on a pool of worker processes
+
+    with ParallelRenderer(workers=4) as renderer:
+        html = renderer.render(text, {
+            'extensions': ['amazedown.image_block',
+                           'amazedown.list_avg_gallery'],
+        })
+
+gives the same HTML as `markdown.Markdown(**config).convert(text)`, byte
+for byte, but in one case: where Python-Markdown itself leaves an inline
+placeholder in its output (`![x]([a.jpg(<img src="a">](` gives a `src`
+holding `klzzwxh:0000`), the number in it counts the placeholders of the
+chunk rather than of the document.
+
+The preprocessors run over the whole text first, in this process: that is
+where the reference definitions (`[ref]: url`, which can be anywhere in
+the document) are collected and raw HTML is stashed. The blocks are then
+split into chunks that can be rendered apart (see `amazedown.chunk`), the
+chunks are grouped into tasks of about `task_size` characters, and the
+workers render the tasks with the references and the stash of the
+document. The HTML comes back in order and is joined.
+
+Texts shorter than `min_size`, or any text with one worker, are rendered
+here by `convert`. As with `amazedown.aio`, `config` holds the keyword
+arguments of `markdown.Markdown` and is pickled to the workers, so
+extensions are given by name; each worker, and each thread calling
+`render`, keeps one `Markdown` instance per config. Extensions keeping
+document-wide state (toc, footnotes, abbr, `amazedown.budget`) are not
+supported.
+"""
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import markdown
+from amazedown.cache import config_key
+from amazedown.chunk import preprocess, iter_chunks, render_blocks, \
+    join_html
+
+MIN_SIZE = 64 * 1024
+TASKS_PER_WORKER = 4
+
+_local = threading.local()  # in each thread: config key -> Markdown
+
+
+def _markdown(key, config):
+    """The `Markdown` of `config` of the current thread."""
+    instances = getattr(_local, 'instances', None)
+    if instances is None:
+        instances = _local.instances = {}
+    md = instances.get(key)
+    if md is None:
+        md = instances[key] = markdown.Markdown(**config)
+    return md
+
+
+def _prepare(configs):
+    for config in configs:
+        _markdown(config_key(**config), config)
+
+
+def _state(md):
+    """What the chunks of the document need of the preprocessors."""
+    stash = md.htmlStash
+    return (dict(md.references), list(stash.rawHtmlBlocks),
+            stash.html_counter, stash.tag_counter, list(stash.tag_data))
+
+
+def _render_chunks(key, config, state, chunks):
+    """The HTML of each of `chunks`, blocks of the document whose
+    preprocessors left `state`."""
+    md = _markdown(key, config)
+    references, raw_html, html_counter, tag_counter, tag_data = state
+    md.reset()
+    md.references.update(references)
+    stash = md.htmlStash
+    parts = []
+    try:
+        for chunk in chunks:
+            # what inline HTML the last chunk stashed is in its output
+            stash.rawHtmlBlocks = list(raw_html)
+            stash.html_counter = html_counter
+            stash.tag_counter = tag_counter
+            stash.tag_data = list(tag_data)
+            parts.append(render_blocks(md, chunk))
+    finally:
+        md.reset()
+    return parts
+
+
+def tasks(chunks, size):
+    """Group consecutive `chunks` into lists of about `size` characters."""
+    task = []
+    length = 0
+    for chunk in chunks:
+        task.append(chunk)
+        length += sum(len(block) for block in chunk)
+        if length >= size:
+            yield task
+            task = []
+            length = 0
+    if task:
+        yield task
+
+
+class ParallelRenderer(object):
+
+    def __init__(self, workers=None, task_size=None, min_size=MIN_SIZE,
+                 configs=()):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.task_size = task_size
+        self.min_size = min_size
+        self._executor = None
+        self._configs = list(configs)
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                self.workers, initializer=_prepare,
+                initargs=(self._configs,))
+        return self._executor
+
+    def render(self, text, config=None):
+        """Same as `markdown.Markdown(**config).convert(text)`."""
+        config = config or {}
+        key = config_key(**config)
+        md = _markdown(key, config)
+        try:
+            if self.workers < 2 or len(text) < self.min_size:
+                return md.convert(text)
+
+            blocks = preprocess(md, text)
+            state = _state(md)
+        finally:
+            md.reset()
+
+        size = self.task_size or max(
+            1, len(text) // (self.workers * TASKS_PER_WORKER))
+        pool = self._pool()
+        futures = [pool.submit(_render_chunks, key, config, state, task)
+                   for task in tasks(iter_chunks(blocks), size)]
+        parts = []
+        for future in futures:
+            parts.extend(future.result())
+        return join_html(parts)
+
+    def close(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def render_parallel(text, config=None, workers=None):
+    """Render `text` on a pool of `workers` made for this call."""
+    with ParallelRenderer(workers=workers) as renderer:
+        return renderer.render(text, config)
+
+
+if __name__ == '__main__':
+    config = {'extensions': ['amazedown.image_block',
+                             'amazedown.list_avg_gallery']}
+    text = '\n\n'.join(
+        '-   [![%d][img]](big-%d.jpg)\n-   ![%d][img]\n\ntext %d' % (
+            (index,) * 4) for index in range(5000)) + '\n\n[img]: small.jpg'
+    html = render_parallel(text, config, workers=2)
+    assert html == markdown.Markdown(**config).convert(text)
+    print(html[:300])
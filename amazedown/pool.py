@@ -0,0 +1,65 @@
+"""
+A pool of configured Markdown instances for threaded servers
+
+Building a `Markdown` object loads every extension again, so rather than
+creating one per request:
+
+    pool = MarkdownPool(extensions=[link_icon_tab.makeExtension(host=host),
+                                    list_gallery.makeExtension()],
+                        size=8)
+
+    html = pool.convert(text)
+
+    with pool.markdown() as md:
+        html = md.convert(text)
+
+Instances are created on demand, up to `size`; a thread asking for one when
+all are in use waits for one to be released. An instance is reset before it
+goes back to the pool, and dropped if the conversion raised.
+"""
+import markdown
+from contextlib import contextmanager
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class MarkdownPool(object):
+
+    def __init__(self, size=4, **kwargs):
+        """`kwargs` are passed to `markdown.Markdown`."""
+        self.size = size
+        self._kwargs = kwargs
+        # None stands for a free slot with no instance built yet
+        self._idle = queue.LifoQueue()
+        for _ in range(size):
+            self._idle.put(None)
+
+    @contextmanager
+    def markdown(self, timeout=None):
+        """Borrow a reset Markdown instance for the `with` block."""
+        try:
+            md = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise PoolTimeout('no Markdown instance free after %ss' % timeout)
+
+        try:
+            if md is None:
+                md = markdown.Markdown(**self._kwargs)
+            yield md
+        except BaseException:
+            self._idle.put(None)
+            raise
+        else:
+            md.reset()
+            self._idle.put(md)
+
+    def convert(self, text, timeout=None):
+        with self.markdown(timeout) as md:
+            return md.convert(text)
@@ -0,0 +1,138 @@
+"""
+Switch off, for each document, the amazedown processors it cannot use
+
+    md = markdown.Markdown(extensions=[
+        link_icon_tab.makeExtension(host=host),
+        figure.makeExtension(),
+        list_gallery.makeExtension(),
+        prescan.makeExtension(),
+    ])
+
+Every amazedown block processor is tested on every block of a document,
+and every amazedown inline pattern is tried on every piece of text, even
+when the document holds none of their syntax. Before a document is parsed,
+this extension looks through its source for what each extension needs:
+
+    figure, link_image, image_block,
+    link_image_block                    `![`
+    list_gallery, list_avg_gallery      `![` and `-`
+    quote_by                            `>`
+    link_icon_tab, all                  `[` or `<`
+
+and takes the processors of the extensions whose syntax is missing out of
+the Markdown instance until the next document. Each check is only a
+necessary condition of the processors matching, so a document renders the
+same with the extension as without it.
+
+The processors are looked at when the first document starts, so the
+extension can be loaded in any order. `md.prescan.disabled` holds the
+extensions switched off for the last document.
+"""
+from markdown import Extension
+from markdown.preprocessors import Preprocessor
+from amazedown.util import extension_name
+
+
+def has_image(text):
+    return '![' in text
+
+
+def has_gallery(text):
+    return '![' in text and '-' in text
+
+
+def has_quote(text):
+    return '>' in text
+
+
+def has_link(text):
+    return '[' in text or '<' in text
+
+
+NEEDS = {
+    'figure': has_image,
+    'link_image': has_image,  # a link to an image is written `[![`
+    'image_block': has_image,
+    'link_image_block': has_image,
+    'list_gallery': has_gallery,
+    'list_avg_gallery': has_gallery,
+    # the quotes it renders keep a line break, with or without `-- name`
+    'quote_by': has_quote,
+    'link_icon_tab': has_link,
+    'all': has_link,
+}
+
+
+class Prescan(object):
+    """The processors of one Markdown instance and the ones it uses for the
+    document in hand."""
+
+    def __init__(self, md):
+        self.markdown = md
+        self.disabled = set()
+        self._registries = None
+
+    def _collect(self):
+        md = self.markdown
+        self._registries = []
+        for registry in (md.parser.blockprocessors, md.inlinePatterns):
+            self._registries.append((registry, [
+                (key, value, extension_name(value))
+                for key, value in registry.items()]))
+
+    def select(self, text):
+        """Keep the processors `text` may use, put back the others."""
+        if self._registries is None:
+            self._collect()
+
+        found = {}
+        disabled = set()
+        for registry, items in self._registries:
+            kept = []
+            for key, value, name in items:
+                need = NEEDS.get(name)
+                if need is not None:
+                    if need not in found:
+                        found[need] = need(text)
+                    if not found[need]:
+                        disabled.add(name)
+                        continue
+                kept.append((key, value))
+
+            if registry.keyOrder != [key for key, _ in kept]:
+                registry.clear()
+                for key, value in kept:
+                    registry[key] = value
+        self.disabled = disabled
+
+
+class PrescanPreprocessor(Preprocessor):
+
+    def run(self, lines):
+        self.markdown.prescan.select('\n'.join(lines))
+        return lines
+
+
+class PrescanExtension(Extension):
+
+    def extendMarkdown(self, md, md_globals):
+        md.prescan = Prescan(md)
+        # after the `_begin` ones: `amazedown.metrics` finds all processors
+        md.preprocessors.add('amazedown_prescan', PrescanPreprocessor(md),
+                             '>normalize_whitespace')
+
+
+def makeExtension(**kwargs):
+    """Loads the extension."""
+    return PrescanExtension(**kwargs)
+
+
+if __name__ == '__main__':
+    import markdown
+    from amazedown import figure, link_icon_tab, list_gallery
+
+    md = markdown.Markdown(extensions=[
+        figure.makeExtension(), link_icon_tab.makeExtension(),
+        list_gallery.makeExtension(), makeExtension()])
+    print(md.convert('Some *text* with [a link](http://github.com).'))
+    print('disabled: %s' % ', '.join(sorted(md.prescan.disabled)))
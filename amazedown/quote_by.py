@@ -2,6 +2,8 @@ import re
 from markdown.blockprocessors import BlockQuoteProcessor
 from markdown import Extension
 import logging
+from amazedown import trace
+from amazedown.budget import spend
 
 logger = logging.getLogger('MARKDOWN.quote_by')
 
@@ -11,36 +13,42 @@ class QuoteByProcessor(BlockQuoteProcessor):
                        r'(-- ?|—— ?)'
                        r'(?P<name>.*)'
                        )
+    # line boundaries of `str.splitlines()` other than '\n'; looked for
+    # one by one, which is much faster than a character class
+    BREAKS = (u'\r', u'\x0b', u'\x0c', u'\x1c', u'\x1d', u'\x1e', u'\x85',
+              u'\u2028', u'\u2029')
 
     def run(self, parent, blocks):
+        if not spend(self.parser.markdown):
+            return super(QuoteByProcessor, self).run(parent, blocks)
+
         block = blocks[0]
-        reversed_line_result = []
+        # the lines as `splitlines()` sees them, joined by '\n'
+        if any(each in block for each in self.BREAKS):
+            block = '\n'.join(block.splitlines())
+        elif block.endswith('\n'):
+            block = block[:-1]
+
+        # the `-- name` lines at the end, from the last one up
         BY_RE = self.BY_RE
-        no_more = False
-        line_count = 0
-        for each_line in block.splitlines()[::-1]:
-            if no_more:
-                reversed_line_result.append(each_line)
-                continue
-
-            logger.debug(each_line)
-            match = BY_RE.match(each_line)
-            if match:
-                each_line = match.expand('\g<pre><small>\g<name></small>')
-                line_count += 1
-            else:
-                no_more = True
-
-            reversed_line_result.append(each_line)
-
-        line_result = reversed_line_result[::-1]
-        sep_at = len(line_result) - line_count
-        raw_result = line_result[:sep_at]
-        by_result = line_result[sep_at:]
-        raw = '\n'.join(raw_result)
-        by = '<br/>\n'.join(by_result)
-        logger.debug(raw)
-        logger.debug(by)
+        by_result = []
+        end = len(block)
+        while end >= 0:
+            start = block.rfind('\n', 0, end) + 1
+            if trace.TRACE:
+                logger.debug(block[start:end])
+            match = BY_RE.match(block, start, end)
+            if match is None:
+                break
+
+            by_result.append(match.expand('\g<pre><small>\g<name></small>'))
+            end = start - 1
+
+        raw = block[:max(end, 0)] if by_result else block
+        by = '<br/>\n'.join(reversed(by_result))
+        if trace.TRACE:
+            logger.debug(raw)
+            logger.debug(by)
 
         blocks[0] = '%s\n%s' % (raw, by)
         return super(QuoteByProcessor, self).run(parent, blocks)
@@ -64,6 +72,7 @@ def makeExtension(configs=None):
 
 if __name__ == '__main__':
     import markdown
+    trace.enable()
     logging.basicConfig(
         level=logging.DEBUG,
         format='\033[32m%(levelname)1.1s\033[0m[%(lineno)3s]%(message)s')
@@ -0,0 +1,480 @@
+"""
+Linear-time matching of the image and image-link syntax
+
+`tokenizer.IMAGE_RE` and `tokenizer.LINK_IMAGE_RE` stack lazy groups
+(`[\\s\\S]*?`, `.+?`) next to optional whitespace groups, so a backtracking
+regex engine tries every way of splitting a text that almost matches:
+`'![a](b c' * 200` took thirty seconds to scan.
+
+`Scanner` gives the very matches the regexes give (the same split into
+alt, src, title, ...) without backtracking. The part of the pattern after
+each lazy group only depends on the position it starts from, so whether it
+can succeed from a position is computed once and kept. A lazy group then
+takes the first candidate end (a `]`, a `)`, a quote, ...) from which the
+rest succeeds, found with `_Chain`. The candidates of each kind are found
+in one pass over the text, the first time one is needed, so looking for
+the next one is a bisection and not a search that could go over the same
+stretch again for every start. Every position is looked at a bounded
+number of times, so the work grows linearly with the text (and the
+bisections with its logarithm).
+
+Well formed images go through `_SIMPLE` first: a regex without lazy groups
+or length choices, bounded in length, that only matches where the split is
+the one the full pattern would make. The scanner is set up for whatever it
+leaves.
+
+    scanner = Scanner(text)
+    scanner.match()  # (start, end, groups) of `^(?:LINK_IMAGE|IMAGE)$`
+    scanner.scan()   # [(start, end, groups), ...] like `finditer`
+
+`groups` holds the named groups of `tokenizer.LINK_IMAGE_RE` or of
+`tokenizer.IMAGE_RE`. `Scanner(text, check)` calls `check()` every
+`CHECK_EVERY` steps of its loops, which can stop a long scan by raising
+(see `amazedown.budget`).
+"""
+import re
+from bisect import bisect_left
+from amazedown.util import LazyRegex
+
+_WS_RUN = re.compile(r'\s*')
+_QUOTE = re.compile('[\'"]')
+_WS_OR_CLOSE = re.compile(r'[\s)]')
+_START = re.compile(r'[\[!]')
+_NEWLINE = re.compile('\n')
+
+CHECK_EVERY = 1024
+
+# `(?=(?P<x>...))(?P=x)` matches `...` without backtracking into it: a
+# shorter src or href would end before a character that can not follow it
+_SIMPLE_IMAGE = (
+    r'!\[(?P<{alt}>[^\]]{{0,200}})\]'
+    r'(?:\((?=(?P<{src}>[^\s)]{{1,1000}}))(?P={src})'
+    r'(?:\s(?P<{title}>[^\s)](?:[^)\n]{{0,200}}[^\s)])?))?\)'
+    r'|\[(?P<{ref}>[^\]\n]{{0,200}})\])'
+)
+_SIMPLE_LINK = (
+    r'\[\s?' + _SIMPLE_IMAGE.format(
+        alt='link_alt', src='link_src', title='img_title', ref='img_ref') +
+    r'\s?\]'
+    r'(?:\((?=(?P<href>[^\s)]{0,1000}))(?P=href)'
+    r'(?:\s[\'"](?P<link_title>[^\'"\n]{1,200})[\'"])?\)'
+    r'|\[(?P<link_ref>[^\]\n]{1,200})\])'
+)
+_SIMPLE_IMAGE = _SIMPLE_IMAGE.format(
+    alt='alt', src='src', title='title', ref='ref')
+_SIMPLE = LazyRegex('(?:%s)|(?:%s)' % (_SIMPLE_LINK, _SIMPLE_IMAGE))
+_SIMPLE_FULL = LazyRegex('(?:%s|%s)$' % (_SIMPLE_LINK, _SIMPLE_IMAGE))
+_IMAGE_GROUPS = ('alt', 'src', 'title', 'ref')
+_LINK_GROUPS = ('link_alt', 'link_src', 'img_title', 'img_ref',
+                'href', 'link_title', 'link_ref')
+
+
+def _simple(m):
+    names = _IMAGE_GROUPS if m.group('link_alt') is None else _LINK_GROUPS
+    return m.start(), m.end(), dict(zip(names, m.group(*names)))
+
+
+def _no_tick():
+    pass
+
+
+class _Ticker(object):
+    """Calls `check` every `CHECK_EVERY` ticks."""
+
+    def __init__(self, check):
+        self._check = check
+        self._left = CHECK_EVERY
+
+    def tick(self):
+        self._left -= 1
+        if self._left == 0:
+            self._left = CHECK_EVERY
+            self._check()
+
+
+class _Candidates(object):
+    """Next position >= p where a regex matches, from the list of all of
+    them, made on the first call. Each call is a tick of the scan."""
+
+    def __init__(self, text, regex, tick):
+        self._text = text
+        self._regex = regex
+        self._tick = tick
+        self._positions = None
+
+    def __call__(self, p):
+        self._tick()
+        positions = self._positions
+        if positions is None:
+            positions = self._positions = [
+                m.start() for m in self._regex.finditer(self._text)]
+        index = bisect_left(positions, p)
+        return positions[index] if index < len(positions) else -1
+
+
+class _Chain(object):
+    """First position >= p among the candidates `find` gives for which
+    `test` holds, remembering the answer for every position passed."""
+
+    def __init__(self, find, test):
+        self._find = find
+        self._test = test
+        self._first = {}
+
+    def first(self, p):
+        first = self._first
+        passed = []
+        while True:
+            found = first.get(p)
+            if found is not None:
+                break
+
+            passed.append(p)
+            candidate = self._find(p)
+            if candidate < 0:
+                found = -1
+                break
+            if self._test(candidate):
+                found = candidate
+                break
+            p = candidate + 1
+
+        for each in passed:
+            first[each] = found
+        return found
+
+
+class _Text(object):
+
+    def __init__(self, text, tick=_no_tick):
+        self.text = text
+        self.tick = tick
+        self.length = len(text)
+        self._ws_ends = {}
+        self._candidates = {}
+        self._newline = self.search(_NEWLINE)
+
+    def char(self, i):
+        return self.text[i:i + 1]
+
+    def is_ws(self, i):
+        return self.text[i:i + 1].isspace()
+
+    def newline(self, p):
+        """Position of the first newline at or after `p`, or the length."""
+        found = self._newline(p)
+        return self.length if found < 0 else found
+
+    def ws_end(self, p):
+        """End of the whitespace run at `p`. Positions of a run are asked
+        about from left to right, so the run is only measured once."""
+        ends = self._ws_ends
+        end = ends.get(p)
+        if end is None:
+            end = ends.get(p - 1)
+            if end is None or end <= p:
+                end = _WS_RUN.match(self.text, p).end()
+            ends[p] = end
+        return end
+
+    def find(self, char):
+        return self.search(re.compile(re.escape(char)))
+
+    def search(self, regex):
+        """The `_Candidates` of `regex`, shared by all who ask."""
+        candidates = self._candidates.get(regex.pattern)
+        if candidates is None:
+            candidates = self._candidates[regex.pattern] = _Candidates(
+                self.text, regex, self.tick)
+        return candidates
+
+    def close_paren(self, i, ok):
+        """Whether `\\s?\\)` matches at `i` followed by something `ok`,
+        and where it ends, trying `\\s` first like the regex does."""
+        if self.is_ws(i) and self.char(i + 1) == ')' and ok(i + 2):
+            return i + 2
+        if self.char(i) == ')' and ok(i + 1):
+            return i + 1
+        return -1
+
+
+class _ImageTail(object):
+    """What follows the alt text of an image:
+
+        \\((src .+?)(\\s+(title .+?))?\\s?\\)  |  \\[(ref .*?)\\]
+
+    then anything `ok` accepts from where it ends."""
+
+    def __init__(self, text, ok):
+        self.t = text
+        self.ok = ok
+        self._ref_close = _Chain(text.find(']'), lambda c: ok(c + 1))
+        self._title_close = _Chain(text.find(')'), lambda c: ok(c + 1))
+        self._src_end = _Chain(text.search(_WS_OR_CLOSE), self._src_end_ok)
+        self._title_start = {}
+        self._after_alt = {}
+
+    def after_alt(self, a):
+        """Whether the tail matches after the `]` of the alt at `a`."""
+        result = self._after_alt.get(a)
+        if result is None:
+            t = self.t
+            opening = t.char(a + 1)
+            start = a + 2
+            if opening == '(':
+                end = self._src_end.first(start + 1)
+                result = 0 <= end <= t.newline(start)
+            elif opening == '[':
+                end = self._ref_close.first(start)
+                result = 0 <= end <= t.newline(start)
+            else:
+                result = False
+            self._after_alt[a] = result
+        return result
+
+    def groups(self, a):
+        """`(src, title, ref, end)` of the tail after the alt at `a`."""
+        t = self.t
+        text = t.text
+        start = a + 2
+        if t.char(a + 1) == '[':
+            close = self._ref_close.first(start)
+            return None, None, text[start:close], close + 1
+
+        src_end = self._src_end.first(start + 1)
+        src = text[start:src_end]
+        title_start = self._title_start_of(src_end)
+        if title_start is not None:
+            title_end, end = self._title_end(title_start)
+            return src, text[title_start:title_end], None, end
+
+        return src, None, None, t.close_paren(src_end, self.ok)
+
+    def _title_end(self, start):
+        """End of the title starting at `start` and end of the tail, or
+        None when no title can start there."""
+        t = self.t
+        close = self._title_close.first(start + 1)
+        if close < 0:
+            return None
+        # `\s?\)` takes a space before the parenthesis if there is one
+        if close - 1 >= start + 1 and t.is_ws(close - 1):
+            title_end = close - 1
+        else:
+            title_end = close
+        if title_end > t.newline(start):
+            return None
+        return title_end, close + 1
+
+    def _title_start_of(self, src_end):
+        """Where `\\s+` stops before the title when `src_end` starts one;
+        `\\s+` is greedy, so the furthest start that works."""
+        t = self.t
+        if not t.is_ws(src_end):
+            return None
+
+        run_end = t.ws_end(src_end)
+        start = self._title_start.get(run_end, -2)
+        if start == -2:
+            start = run_end
+            while True:
+                if (start < t.length and t.char(start) != '\n' and
+                        self._title_end(start) is not None):
+                    break
+                start -= 1
+                if not t.is_ws(start - 1):
+                    start = None
+                    break
+            self._title_start[run_end] = start
+
+        if start is None or start < src_end + 1:
+            return None
+        return start
+
+    def _src_end_ok(self, i):
+        return (self._title_start_of(i) is not None or
+                self.t.close_paren(i, self.ok) >= 0)
+
+
+class _LinkTail(object):
+    """What follows the image inside an image link:
+
+        \\s?\\](\\((href .*?)(\\s+['"](link_title .+?)['"])?\\s?\\)
+             |\\[(link_ref .+?)\\])
+
+    then anything `ok` accepts from where it ends."""
+
+    def __init__(self, text, ok):
+        self.t = text
+        self.ok = ok
+        self._ref_close = _Chain(text.find(']'), lambda c: ok(c + 1))
+        self._title_close = _Chain(text.search(_QUOTE), self._title_close_ok)
+        self._href_end = _Chain(text.search(_WS_OR_CLOSE), self._href_end_ok)
+        self._title = {}
+        self._ok = {}
+
+    def matches(self, e):
+        result = self._ok.get(e)
+        if result is None:
+            result = self._ok[e] = self._link_start(e) is not None
+        return result
+
+    def groups(self, e):
+        """`(href, link_title, link_ref, end)` of the tail at `e`."""
+        t = self.t
+        text = t.text
+        start, opening = self._link_start(e)
+        if opening == '[':
+            close = self._ref_close.first(start + 1)
+            return None, None, text[start:close], close + 1
+
+        href_end = self._href_end.first(start)
+        href = text[start:href_end]
+        title = self._title_of(href_end)
+        if title is not None:
+            title_start, quote = title
+            end = t.close_paren(quote + 1, self.ok)
+            return href, text[title_start:quote], None, end
+
+        return href, None, None, t.close_paren(href_end, self.ok)
+
+    def _link_start(self, e):
+        """`(start, opening)` of the link part after the image, trying a
+        space before the `]` first."""
+        t = self.t
+        for bracket in ((e + 1, e) if t.is_ws(e) else (e,)):
+            if t.char(bracket) != ']':
+                continue
+
+            opening = t.char(bracket + 1)
+            start = bracket + 2
+            if opening == '(':
+                end = self._href_end.first(start)
+                if 0 <= end <= t.newline(start):
+                    return start, opening
+            elif opening == '[':
+                end = self._ref_close.first(start + 1)
+                if 0 <= end <= t.newline(start):
+                    return start, opening
+        return None
+
+    def _title_of(self, href_end):
+        """`(title_start, closing_quote)` when a quoted title follows the
+        href ending at `href_end`."""
+        t = self.t
+        if not t.is_ws(href_end):
+            return None
+
+        run_end = t.ws_end(href_end)
+        title = self._title.get(run_end, False)
+        if title is False:
+            title = None
+            if _QUOTE.match(t.char(run_end)):
+                quote = self._title_close.first(run_end + 2)
+                if 0 <= quote <= t.newline(run_end + 1):
+                    title = run_end + 1, quote
+            self._title[run_end] = title
+        return title
+
+    def _title_close_ok(self, quote):
+        return self.t.close_paren(quote + 1, self.ok) >= 0
+
+    def _href_end_ok(self, i):
+        return (self._title_of(i) is not None or
+                self.t.close_paren(i, self.ok) >= 0)
+
+
+class Scanner(object):
+
+    def __init__(self, text, check=None):
+        self.text = text
+        self._tick = _no_tick if check is None else _Ticker(check).tick
+
+    def match(self):
+        """Match of `^(?:LINK_IMAGE_RE|IMAGE_RE)$` on the text, or None."""
+        text = self.text
+        m = _SIMPLE_FULL.match(text)
+        if m is not None:
+            return _simple(m)
+
+        length = len(text)
+
+        def at_end(i):
+            return i == length or (i == length - 1 and text[i] == '\n')
+
+        return _Matcher(text, at_end, self._tick).at(0)
+
+    def scan(self):
+        """Matches of `LINK_IMAGE_RE|IMAGE_RE` like `finditer`."""
+        text = self.text
+        tick = self._tick
+        matcher = None
+        result = []
+        p = 0
+        while True:
+            tick()
+            m = _START.search(text, p)
+            if m is None:
+                return result
+
+            start = m.start()
+            m = _SIMPLE.match(text, start)
+            if m is not None:
+                result.append(_simple(m))
+                p = m.end()
+                continue
+
+            if matcher is None:
+                matcher = _Matcher(text, lambda i: True, tick)
+            found = matcher.at(start)
+            if found is None:
+                p = start + 1
+            else:
+                result.append(found)
+                p = found[1]
+
+
+class _Matcher(object):
+
+    def __init__(self, text, ok, tick=_no_tick):
+        t = self.t = _Text(text, tick)
+        self._image = _ImageTail(t, ok)
+        self._link = _LinkTail(t, ok)
+        self._inner = _ImageTail(t, self._link.matches)
+        self._image_alt = _Chain(t.find(']'), self._image.after_alt)
+        self._inner_alt = _Chain(t.find(']'), self._inner.after_alt)
+
+    def at(self, start):
+        t = self.t
+        if t.char(start) == '[':
+            return self._link_image(start)
+        if t.text.startswith('![', start):
+            return self._image_at(start)
+        return None
+
+    def _image_at(self, start):
+        alt_end = self._image_alt.first(start + 2)
+        if alt_end < 0:
+            return None
+
+        src, title, ref, end = self._image.groups(alt_end)
+        return start, end, {
+            'alt': self.t.text[start + 2:alt_end],
+            'src': src, 'title': title, 'ref': ref}
+
+    def _link_image(self, start):
+        t = self.t
+        image = start + 2 if t.is_ws(start + 1) else start + 1
+        if not t.text.startswith('![', image):
+            return None
+
+        alt_end = self._inner_alt.first(image + 2)
+        if alt_end < 0:
+            return None
+
+        src, title, ref, image_end = self._inner.groups(alt_end)
+        href, link_title, link_ref, end = self._link.groups(image_end)
+        return start, end, {
+            'link_alt': t.text[image + 2:alt_end],
+            'link_src': src, 'img_title': title, 'img_ref': ref,
+            'href': href, 'link_title': link_title, 'link_ref': link_ref}
@@ -0,0 +1,225 @@
+"""
+Streaming rendering of large documents
+
+    with open('travel-log.md') as f:
+        for html in render_stream(f, extensions=[
+                list_avg_gallery.makeExtension()]):
+            out.write(html)
+
+`render_stream` reads its source line by line and yields the HTML of each
+chunk of top-level blocks (see `amazedown.chunk`) as soon as the chunk is
+complete, so memory grows with the largest chunk rather than with the
+whole document. The pieces put together are `Markdown.convert` of the
+whole text.
+
+The lines are cut where running the preprocessors on each piece gives the
+blocks of the whole text (`iter_line_chunks`), then those blocks are
+grouped with the rule of `amazedown.chunk.iter_chunks`, so that reference
+definitions and raw HTML split the chunks as they split the document.
+
+Reference definitions (`[ref]: url`) may follow the blocks using them.
+When the source is a seekable file, a first pass collects them, then the
+file is read again from where it was. Any other iterable of lines is read
+once, and only the references defined before a chunk ends apply to it.
+"""
+import markdown
+from markdown import util
+from markdown.preprocessors import HtmlBlockPreprocessor
+from amazedown.chunk import joins, render_blocks
+
+
+def _seekable(source):
+    try:
+        return source.seekable()
+    except AttributeError:
+        return False
+
+
+class _RawHtmlState(HtmlBlockPreprocessor):
+    """Follow the blocks of a text the way `HtmlBlockPreprocessor.run`
+    does, only to tell whether a raw HTML block is left open."""
+
+    def __init__(self):
+        super(_RawHtmlState, self).__init__()
+        self.items = None  # blocks of the open raw HTML block
+        self.left_tag = self.left_index = None
+
+    @property
+    def open(self):
+        return self.items is not None
+
+    def feed(self, block):
+        """Go over the next block of the text."""
+        text = [block]
+        while text:
+            block = text.pop(0)
+            if block.startswith('\n'):
+                block = block[1:]
+            if block.startswith('\n'):
+                block = block[1:]
+
+            if self.items is not None:
+                self.items.append(block)
+                right_tag, data_index = self._get_right_tag(
+                    self.left_tag, self.left_index, ''.join(self.items))
+                data_index -= sum(len(item) for item in self.items[:-1])
+                if self._equal_tags(self.left_tag, right_tag):
+                    if data_index < len(block):
+                        text.insert(0, block[data_index:])
+                    self.items = None
+                continue
+
+            if not block.startswith('<') or len(block.strip()) <= 1:
+                continue
+            if block[1:4] == '!--':
+                left_tag, left_index = '--', 2
+            else:
+                left_tag, left_index, _ = self._get_left_tag(block)
+            right_tag, data_index = self._get_right_tag(left_tag, left_index,
+                                                        block)
+            block_level = util.isBlockLevel(left_tag) or left_tag == '--'
+            if data_index < len(block) and block_level:
+                text.insert(0, block[data_index:])
+                block = block[:data_index]
+
+            if not (block_level or block[1] in '!?@%') or \
+                    self._is_oneliner(left_tag) or \
+                    self._equal_tags(left_tag, right_tag):
+                continue
+            if block_level:
+                self.items = [block.strip()]
+                self.left_tag, self.left_index = left_tag, left_index
+
+
+def _normalized_lines(lines, tab_length):
+    """Yield `(line, normalized)` for each line of `lines`, the second as
+    the normalize_whitespace preprocessor leaves it."""
+    first = True
+    for line in lines:
+        if line.endswith('\n'):
+            line = line[:-1]
+        line = line.replace('\r\n', '\n').replace('\r', '\n')
+        for line in line.split('\n'):
+            normalized = line.replace(util.STX, '').replace(util.ETX, '')
+            normalized = normalized.expandtabs(tab_length)
+            if not first and not normalized.strip(' '):
+                normalized = ''
+            first = False
+            yield line, normalized
+
+
+def iter_line_chunks(lines, tab_length=4):
+    """Group `lines` into lists of lines that can be preprocessed apart,
+    the blocks of each put together giving the blocks of the whole text.
+
+    The lines are only cut before the first line of a block, outside of
+    raw HTML, after an odd number of blank lines: an even number leaves the
+    next block starting with a newline. The last of those blank lines is
+    left out."""
+    html = _RawHtmlState()
+    chunk = []
+    seen = False   # a non-blank line
+    block = []     # normalized lines of the block in hand
+    newlines = 0   # since the last non-blank line
+    for line, normalized in _normalized_lines(lines, tab_length):
+        if chunk:
+            newlines += 1
+        if not normalized:
+            chunk.append(line)
+            continue
+
+        if newlines < 2:
+            block.append(normalized)
+        else:
+            # the text splits on '\n\n', the way the preprocessors do
+            html.feed('\n'.join(block))
+            for _ in range(newlines // 2 - 1):
+                html.feed('')
+            block = [normalized] if newlines % 2 == 0 else ['', normalized]
+            if newlines % 2 == 0 and not html.open and seen:
+                yield chunk[:-1]
+                chunk = []
+        seen = True
+        newlines = 0
+        chunk.append(line)
+
+    if chunk:
+        yield chunk
+
+
+def _preprocess(md, lines):
+    """Run the preprocessors of `md` on `lines`, return the text."""
+    for prep in md.preprocessors.values():
+        lines = prep.run(lines)
+    return '\n'.join(lines)
+
+
+def _with_last(iterable):
+    """Yield `(item, is_last)` for each item of `iterable`."""
+    iterator = iter(iterable)
+    try:
+        item = next(iterator)
+    except StopIteration:
+        return
+    for following in iterator:
+        yield item, False
+        item = following
+    yield item, True
+
+
+def _iter_chunks(md, source):
+    """Yield the chunks of blocks of `source`, as `iter_chunks` would group
+    the blocks of the whole text."""
+    chunk = []
+    last = ''
+    rest = ''
+    for lines, is_last in _with_last(iter_line_chunks(source, md.tab_length)):
+        if not any(util.STX in block for block in chunk):
+            # no block left refers to what was stashed so far
+            md.htmlStash.reset()
+        # the preprocessed text of the pieces put together is the one of the
+        # whole text, which the block parser splits on blank lines; what
+        # follows the last one of a piece goes with the next piece
+        blocks = (rest + _preprocess(md, lines)).split('\n\n')
+        rest = '' if is_last else blocks.pop()
+        for block in blocks:
+            if chunk and not joins(block, last):
+                yield chunk
+                chunk = []
+            chunk.append(block)
+            if block:
+                last = block
+
+    if chunk:
+        yield chunk
+
+
+def render_stream(source, md=None, **kwargs):
+    """Yield the HTML of `source`, a file or an iterable of lines, piece
+    by piece. `kwargs` configure the `Markdown` instance used unless `md`
+    is given."""
+    if md is None:
+        md = markdown.Markdown(**kwargs)
+    md.reset()
+
+    if _seekable(source):
+        start = source.tell()
+        for lines in iter_line_chunks(source, md.tab_length):
+            md.htmlStash.reset()
+            _preprocess(md, lines)  # collects the references
+        source.seek(start)
+
+    pending = None
+    for chunk in _iter_chunks(md, source):
+        html = render_blocks(md, chunk)
+        if not html:
+            continue
+
+        if pending is not None:
+            yield pending + '\n'
+        else:
+            html = html.lstrip()
+        pending = html
+
+    if pending is not None:
+        yield pending.rstrip()
@@ -1,4 +1,30 @@
-from amazedown.test.test_link_icon_tab import TestNewHost
+from amazedown.test.test_link_icon_tab import TestNewHost, TestBrandIndex
+from amazedown.test.test_block_conformance import \
+    TestBlockConformance, TestTokenizer, TestPrefilter
+from amazedown.test.test_pool import TestMarkdownPool
+from amazedown.test.test_cache import TestRenderCache
+from amazedown.test.test_incremental import TestIncrementalRenderer
+from amazedown.test.test_stream import TestRenderStream
+from amazedown.test.test_build import TestBuild
+from amazedown.test.test_scanner import TestScanner
+from amazedown.test.test_budget import TestBudget
+from amazedown.test.test_inline import \
+    TestPositionalRegex, TestPositionalPatterns
+from amazedown.test.test_all import TestAll
+from amazedown.test.test_lazy import TestLazyImport
+from amazedown.test.test_widget import TestWidget
+from amazedown.test.test_quote_by import TestQuoteBy
+from amazedown.test.test_metrics import TestMetrics
+from amazedown.test.test_prescan import TestPrescan
+from amazedown.test.test_blockqueue import TestBlockQueue
+try:
+    from amazedown.test.test_aio import TestAsyncRenderer
+except SyntaxError:  # Python 2 has no asyncio
+    pass
+try:
+    from amazedown.test.test_parallel import TestParallelRenderer
+except ImportError:  # Python 2 without the futures backport
+    pass
 from unittest import main
 
 if __name__ == '__main__':
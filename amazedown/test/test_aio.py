@@ -0,0 +1,74 @@
+import time
+import asyncio
+import markdown
+from unittest import TestCase, main
+from amazedown.aio import AsyncRenderer
+from amazedown.pool import PoolTimeout
+from amazedown.test.test_incremental import DOCUMENT
+
+CONFIG = {
+    'extensions': ['amazedown.link_icon_tab', 'amazedown.image_block',
+                   'amazedown.list_avg_gallery', 'amazedown.quote_by'],
+    'extension_configs': {'amazedown.link_icon_tab': {'host': 'github.com'}},
+}
+
+
+class TestAsyncRenderer(TestCase):
+
+    def setUp(self):
+        self.renderer = AsyncRenderer(workers=2, max_pending=2,
+                                      configs=[CONFIG])
+
+    def tearDown(self):
+        self.renderer.close()
+
+    def test_render(self):
+        async def render_all():
+            return await asyncio.gather(*[
+                self.renderer.render(DOCUMENT, config)
+                for config in (CONFIG, None) * 3])
+
+        results = asyncio.run(render_all())
+        self.assertEqual(results[0], markdown.markdown(DOCUMENT, **CONFIG))
+        self.assertEqual(results[1], markdown.markdown(DOCUMENT))
+        self.assertEqual(results, results[:2] * 3)
+
+    def test_timeout(self):
+        with self.assertRaises(PoolTimeout):
+            asyncio.run(self.renderer.render(DOCUMENT * 50, timeout=0.001))
+
+    def test_timed_out_render_keeps_its_slot(self):
+        renderer = AsyncRenderer(workers=1, max_pending=1)
+        try:
+            asyncio.run(renderer.render('warm up'))
+            with self.assertRaises(PoolTimeout):
+                # running in the worker once the timeout is up
+                asyncio.run(renderer.render(DOCUMENT * 100, CONFIG,
+                                            timeout=0.2))
+            self.assertEqual(renderer._slots.free, 0)
+
+            deadline = time.time() + 30
+            while renderer._slots.free == 0 and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(renderer._slots.free, 1)
+        finally:
+            renderer.close()
+
+    def test_several_event_loops(self):
+        async def render_all():
+            return await asyncio.gather(*[
+                self.renderer.render(DOCUMENT) for _ in range(5)])
+
+        expected = markdown.markdown(DOCUMENT)
+        for _ in range(2):
+            self.assertEqual(asyncio.run(render_all()), [expected] * 5)
+        self.assertEqual(self.renderer._slots.free, 2)
+
+    def test_error(self):
+        with self.assertRaises(ImportError):
+            asyncio.run(self.renderer.render(
+                DOCUMENT, {'extensions': ['amazedown.missing']}))
+
+
+if __name__ == '__main__':
+    main()
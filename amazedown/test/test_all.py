@@ -0,0 +1,89 @@
+import random
+import markdown
+from unittest import TestCase, main
+from amazedown import all as amaze_all, list_gallery, list_avg_gallery
+from amazedown.test.test_incremental import DOCUMENT, extensions
+
+# whole constructs, which the separate extensions see the same way
+PARTS = ['[a]', '[r]', '[![x](s.jpg)](b.jpg)', '[![x][r]][r]', '![i](a.jpg t)',
+         '![i][r]', '<http://a.com>', '<a@b.c>', '[l](http://example.com)',
+         '[g](http://github.com/x "T")', '[![x](s.jpg)](http://github.com)',
+         '[r][a]', '*em*', '`code`', '\n', '[link ![i](a.jpg)](http://x.com)',
+         '![u][undefined]', '[u][undefined]', '"q"', '(p)']
+REFERENCES = '\n\n[r]: ref.jpg "T"\n[a]: http://github.com\n'
+GALLERY = '-   ![a](a.jpg)\n-   [![b](s.jpg)](b.jpg "B")\n'
+
+
+class TestAll(TestCase):
+
+    def setUp(self):
+        self.md = markdown.Markdown(extensions=[
+            amaze_all.makeExtension(host='example.com')])
+        self.separate = markdown.Markdown(extensions=extensions())
+
+    def convert(self, md, text):
+        try:
+            return md.convert(text)
+        finally:
+            md.reset()
+
+    def assertSameAsSeparate(self, text):
+        self.assertEqual(self.convert(self.md, text),
+                         self.convert(self.separate, text), text)
+
+    def test_document(self):
+        self.assertSameAsSeparate(DOCUMENT)
+
+    def test_random(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            self.assertSameAsSeparate(' w '.join(
+                rng.choice(PARTS) for _ in range(rng.randint(1, 30))) +
+                REFERENCES)
+
+    def test_one_inline_pattern(self):
+        names = list(self.md.inlinePatterns.keys())
+        self.assertIn('amazedown', names)
+        self.assertEqual(names, [name for name in names if name in
+                                 markdown.Markdown().inlinePatterns or
+                                 name == 'amazedown'])
+
+    def test_first_match_wins(self):
+        html = self.convert(self.md, '![i][r] [r]' + REFERENCES)
+        self.assertIn('<img alt="i" src="ref.jpg" title="T" />', html)
+        self.assertIn('> r</a>', html)
+
+    def test_image_in_link(self):
+        html = self.convert(self.md,
+                            '[see ![i](a.jpg) and ![j](b.jpg)](http://x.com)')
+        self.assertEqual(html.count('<figure'), 2)
+        self.assertTrue(html.startswith(
+            '<p><a href="http://x.com" target="_blank">see <figure'), html)
+
+    def test_undefined_image_reference(self):
+        self.assertEqual(self.convert(self.md, '![u][undefined]'),
+                         '<p>![u][undefined]</p>')
+
+    def test_gallery(self):
+        self.assertIsInstance(
+            self.md.parser.blockprocessors['list_gallery'],
+            list_avg_gallery.ListGalleryProcesserProcesser)
+        self.assertSameAsSeparate(GALLERY)
+
+        md = markdown.Markdown(extensions=[
+            amaze_all.makeExtension(gallery='list_gallery')])
+        self.assertIsInstance(md.parser.blockprocessors['list_gallery'],
+                              list_gallery.ListGalleryProcesserProcesser)
+        self.assertEqual(
+            self.convert(md, GALLERY),
+            markdown.markdown(GALLERY,
+                              extensions=[list_gallery.makeExtension()]))
+        self.assertNotEqual(self.convert(md, GALLERY),
+                            self.convert(self.md, GALLERY))
+
+        self.assertRaises(ValueError, markdown.Markdown, extensions=[
+            amaze_all.makeExtension(gallery='gallery')])
+
+
+if __name__ == '__main__':
+    main()
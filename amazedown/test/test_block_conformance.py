@@ -0,0 +1,513 @@
+"""
+The block processors must render exactly what they did before they were
+moved to the shared tokenizer.
+"""
+import markdown
+from markdown.treeprocessors import Treeprocessor
+from unittest import TestCase, main
+from amazedown import image_block, link_image_block, \
+    list_gallery, list_avg_gallery
+from amazedown.tokenizer import Tokenizer, ImageToken, LinkImageToken
+from amazedown.block import block_stats
+
+EXTENSIONS = {
+    'image_block': image_block,
+    'link_image_block': link_image_block,
+    'list_gallery': list_gallery,
+    'list_avg_gallery': list_avg_gallery,
+}
+
+CASES = [
+    (('image_block',),
+     '![img](imglink imgtitle)',
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="img" src="imglink" title="imgtitle" /><figcaption class="am-figure-capition-btm">imgtitle</figcaption>\n'
+     '</figure>'),
+    (('image_block',),
+     '![img](imglink)',
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="img" src="imglink" /></figure>'),
+    (('image_block',),
+     '  ![a](b c d)  ',
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="a" src="b" title="c d" /><figcaption class="am-figure-capition-btm">c d</figcaption>\n'
+     '</figure>'),
+    (('image_block',),
+     '![a](b) ![c](d)',
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="a" src="b)" title="![c](d" /><figcaption class="am-figure-capition-btm">![c](d</figcaption>\n'
+     '</figure>'),
+    (('image_block',),
+     '![mul\n'
+     'ti](x)',
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="mul\n'
+     'ti" src="x" /></figure>'),
+    (('image_block',),
+     '![a](b)\n'
+     'trailing',
+     '<p><img alt="a" src="b" />\n'
+     'trailing</p>'),
+    (('image_block',),
+     '![img][0]\n'
+     '\n'
+     '[0]: link "ref title"',
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="img" src="link" title="ref title" /><figcaption class="am-figure-capition-btm">ref title</figcaption>\n'
+     '</figure>'),
+    (('image_block',),
+     '![img][missing]',
+     '<p>![img][missing]</p>'),
+    (('image_block',),
+     '    ![indented](pic.jpg)',
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="indented" src="pic.jpg" /></figure>'),
+    (('image_block',),
+     '![img](imglink imgtitle)]\n'
+     '\n'
+     '![img][img-id]\n'
+     '\n'
+     '![img][0]\n'
+     '\n'
+     '[0]: link\n'
+     '[1]: link-1.jpg\n'
+     '[img-id]: pic2.jpg',
+     '<p>![img](imglink imgtitle)]</p>\n'
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="img" src="pic2.jpg" /></figure>\n'
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="img" src="link" /></figure>'),
+    (('link_image_block',),
+     '[![img](imglink imgtitle)](link.jpg)',
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="img" data-rel="link.jpg" src="imglink" title="imgtitle" /><figcaption class="am-figure-capition-btm">imgtitle</figcaption>\n'
+     '</figure>'),
+    (('link_image_block',),
+     '[![img](imglink)](http://link)',
+     '<p><a href="http://link"><img alt="img" src="imglink" /></a></p>'),
+    (('link_image_block',),
+     '[![img](i)](<http://link.com/a.png>)',
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="img" data-rel="http://link.com/a.png" src="i" /></figure>'),
+    (('link_image_block',),
+     '[![img](i "x")](a.png \'link title\')',
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="img" data-rel="a.png" src="i" title="&quot;x&quot;" /><figcaption class="am-figure-capition-btm">"x"</figcaption>\n'
+     '</figure>'),
+    (('link_image_block',),
+     '[![img](i)](a.png "link title")',
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="img" data-rel="a.png" src="i" title="link title" /><figcaption class="am-figure-capition-btm">link title</figcaption>\n'
+     '</figure>'),
+    (('link_image_block',),
+     '[ ![img](i) ](a.png)',
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="img" data-rel="a.png" src="i" /></figure>'),
+    (('link_image_block',),
+     '[![img][0]][1]\n'
+     '\n'
+     '[0]: s.png "img t"\n'
+     '[1]: b.jpg "link t"',
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="img" data-rel="b.jpg" src="s.png" title="img t" /><figcaption class="am-figure-capition-btm">img t</figcaption>\n'
+     '</figure>'),
+    (('link_image_block',),
+     '[![img][0]][1]\n'
+     '\n'
+     '[0]: s.png\n'
+     '[1]: b.jpg "link t"',
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="img" data-rel="b.jpg" src="s.png" title="link t" /><figcaption class="am-figure-capition-btm">link t</figcaption>\n'
+     '</figure>'),
+    (('link_image_block',),
+     '[![img][missing]](a.png)',
+     '<p><a href="a.png">![img][missing]</a></p>'),
+    (('link_image_block',),
+     '[![img](i)][missing]',
+     '<p>[<img alt="img" src="i" />][missing]</p>'),
+    (('link_image_block',),
+     '[![a](p.jpg)](b.png?w=1#top)',
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="a" data-rel="b.png?w=1#top" src="p.jpg" /></figure>'),
+    (('link_image_block',),
+     '[![a](p.jpg)](b.png) and ![b](c.jpg?w=1)',
+     '<p><a href="b.png"><img alt="a" src="p.jpg" /></a> and <img alt="b" src="c.jpg?w=1" /></p>'),
+    (('link_image_block',),
+     '-   [![a](s)](http://x.com) and ![a](p.jpg?w=1)',
+     '<ul>\n'
+     '<li><a href="http://x.com"><img alt="a" src="s" /></a> and <img alt="a" src="p.jpg?w=1" /></li>\n'
+     '</ul>'),
+    (('link_image_block',),
+     '[![img](imglink imgtitle)](link.jpg)\n'
+     '\n'
+     '[![img][img-id]](<http://link.com/pic.jpg>)\n'
+     '\n'
+     "[![img][0]](link.png 'title')\n"
+     '\n'
+     '[![img][img-id]][link]\n'
+     '\n'
+     '[\n'
+     '![im\n'
+     'g][0]\n'
+     '][1]\n'
+     '\n'
+     '\n'
+     '[0]: link\n'
+     '[1]: link-1.jpg\n'
+     '[img-id]: pic2.jpg\n'
+     '[link]: some.jpg',
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="img" data-rel="link.jpg" src="imglink" title="imgtitle" /><figcaption class="am-figure-capition-btm">imgtitle</figcaption>\n'
+     '</figure>\n'
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="img" data-rel="http://link.com/pic.jpg" src="pic2.jpg" /></figure>\n'
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="img" data-rel="link.png" src="link" title="title" /><figcaption class="am-figure-capition-btm">title</figcaption>\n'
+     '</figure>\n'
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="img" data-rel="some.jpg" src="pic2.jpg" /></figure>\n'
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="im\n'
+     'g" data-rel="link-1.jpg" src="link" /></figure>'),
+    (('list_gallery',),
+     '-   ![im\n'
+     'g1](link1 title1)\n'
+     '-   [![i\n'
+     '    mg2](pre-link2)](link2 "title2")\n'
+     '-   ![img3][ref3]\n'
+     '-   [![img4][ref4]][link4]\n'
+     '\n'
+     '[ref3]: link3\n'
+     '[ref4]: pre-link4\n'
+     '[link4]: link4',
+     '<ul class="am-gallery am-avg-sm-1 am-gallery-bordered" data-am-gallery="{pureview:{target: \'a\', weChatImagePreview: false}}" data-am-widget="gallery">\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="link1"><img alt="im\n'
+     'g1" src="link1" title="title1" /><h6 class="am-gallery-title">title1</h6></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="link2"><img alt="i\n'
+     '    mg2" src="pre-link2" title="title2" /><h6 class="am-gallery-title">title2</h6></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="link3"><img alt="img3" src="link3" /></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="link4"><img alt="img4" src="pre-link4" /></a></div>\n'
+     '</li>\n'
+     '</ul>'),
+    (('list_gallery',),
+     '-   ![a](b)\n'
+     '-   not an image',
+     '<ul>\n'
+     '<li><img alt="a" src="b" /></li>\n'
+     '<li>not an image</li>\n'
+     '</ul>'),
+    (('list_gallery',),
+     '-   ![a](b)\n'
+     '-   ![c][missing]',
+     '<ul>\n'
+     '<li><img alt="a" src="b" /></li>\n'
+     '<li>![c][missing]</li>\n'
+     '</ul>'),
+    (('list_gallery',),
+     '-   [![a](b)](<c>)\n'
+     '-   [![d](e "t")](f \'g\')',
+     '<ul class="am-gallery am-avg-sm-1 am-gallery-bordered" data-am-gallery="{pureview:{target: \'a\', weChatImagePreview: false}}" data-am-widget="gallery">\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="c"><img alt="a" src="b" /></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="f"><img alt="d" src="e" title="&quot;t&quot;" /><h6 class="am-gallery-title">"t"</h6></a></div>\n'
+     '</li>\n'
+     '</ul>'),
+    (('list_gallery',),
+     '- plain\n'
+     '- list',
+     '<ul>\n'
+     '<li>plain</li>\n'
+     '<li>list</li>\n'
+     '</ul>'),
+    (('list_avg_gallery',),
+     '-   +   *   [![img1](preview-link)](link "title1")\n'
+     '            [![img2](preview-link)](link "title2")\n'
+     '        *   [![img3](preview-link)](link "title3")\n'
+     '            [![img4](preview-link)](link "title4")\n'
+     '    +   *   [![img5](preview-link)](link "title5")\n'
+     '            [![img6](preview-link)](link "title6")\n'
+     '        *   [![img7](preview-link)](link "title7")\n'
+     '            [![img8](preview-link)](link "title8")\n'
+     '-   +   *   [![img9](preview-link)](link "title9")\n'
+     '            [![img10](preview-link)](link "title10")\n'
+     '        *   [![img11](preview-link)](link "title11")\n'
+     '            [![img12](preview-link)](link "title12")\n'
+     '    +   *   [![img13](preview-link)](link "title13")\n'
+     '            [![img14](preview-link)](link "title14")\n'
+     '        *   [![img15](preview-link)](link "title15")\n'
+     '            [![img16](preview-link)](link "title16")',
+     '<div>\n'
+     '<ul class="am-gallery am-gallery-bordered am-avg-sm-2  am-avg-md-4 am-avg-lg-8" data-am-gallery="{pureview:{target: \'a\', weChatImagePreview: false}}" data-am-widget="gallery">\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="link"><img alt="img1" src="preview-link" title="title1" /><h6 class="am-gallery-title">title1</h6></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="link"><img alt="img2" src="preview-link" title="title2" /><h6 class="am-gallery-title">title2</h6></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="link"><img alt="img3" src="preview-link" title="title3" /><h6 class="am-gallery-title">title3</h6></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="link"><img alt="img4" src="preview-link" title="title4" /><h6 class="am-gallery-title">title4</h6></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="link"><img alt="img5" src="preview-link" title="title5" /><h6 class="am-gallery-title">title5</h6></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="link"><img alt="img6" src="preview-link" title="title6" /><h6 class="am-gallery-title">title6</h6></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="link"><img alt="img7" src="preview-link" title="title7" /><h6 class="am-gallery-title">title7</h6></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="link"><img alt="img8" src="preview-link" title="title8" /><h6 class="am-gallery-title">title8</h6></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="link"><img alt="img9" src="preview-link" title="title9" /><h6 class="am-gallery-title">title9</h6></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="link"><img alt="img10" src="preview-link" title="title10" /><h6 class="am-gallery-title">title10</h6></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="link"><img alt="img11" src="preview-link" title="title11" /><h6 class="am-gallery-title">title11</h6></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="link"><img alt="img12" src="preview-link" title="title12" /><h6 class="am-gallery-title">title12</h6></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="link"><img alt="img13" src="preview-link" title="title13" /><h6 class="am-gallery-title">title13</h6></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="link"><img alt="img14" src="preview-link" title="title14" /><h6 class="am-gallery-title">title14</h6></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="link"><img alt="img15" src="preview-link" title="title15" /><h6 class="am-gallery-title">title15</h6></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="link"><img alt="img16" src="preview-link" title="title16" /><h6 class="am-gallery-title">title16</h6></a></div>\n'
+     '</li>\n'
+     '</ul>\n'
+     '</div>'),
+    (('list_avg_gallery',),
+     '-   *   ![a](b c)\n'
+     '        ![d][ref]\n'
+     '    *   [![e][ref]][pre]\n'
+     '        [![f](g)][pre]\n'
+     '-   *   ![h](i)\n'
+     '        ![j](k)\n'
+     '    *   ![l](m)\n'
+     '        ![n](o)\n'
+     '\n'
+     '[ref]: ref.jpg "ref title"\n'
+     '[pre]: pre.jpg "pre title"',
+     '<div>\n'
+     '<ul class="am-gallery am-gallery-bordered am-avg-sm-1  am-avg-md-2 am-avg-lg-4" data-am-gallery="{pureview:{target: \'a\', weChatImagePreview: false}}" data-am-widget="gallery">\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="b"><img alt="a" src="b" title="c" /><h6 class="am-gallery-title">c</h6></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="ref.jpg"><img alt="d" src="ref.jpg" title="ref title" /><h6 class="am-gallery-title">ref title</h6></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="pre.jpg"><img alt="e" src="ref.jpg" title="ref title" /><h6 class="am-gallery-title">ref title</h6></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="pre.jpg"><img alt="f" src="g" title="pre title" /><h6 class="am-gallery-title">pre title</h6></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="i"><img alt="h" src="i" /></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="k"><img alt="j" src="k" /></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="m"><img alt="l" src="m" /></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="o"><img alt="n" src="o" /></a></div>\n'
+     '</li>\n'
+     '</ul>\n'
+     '</div>'),
+    (('list_avg_gallery',),
+     '-   ![a](b)\n'
+     '-   ![c](d)',
+     '<div>\n'
+     '<ul class="am-gallery am-gallery-bordered am-avg-sm-1  am-avg-lg-1" data-am-gallery="{pureview:{target: \'a\', weChatImagePreview: false}}" data-am-widget="gallery">\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="b"><img alt="a" src="b" /></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="d"><img alt="c" src="d" /></a></div>\n'
+     '</li>\n'
+     '</ul>\n'
+     '</div>'),
+    (('list_avg_gallery',),
+     '-   ![a](b)\n'
+     '-   ![c][missing]',
+     '<ul>\n'
+     '<li><img alt="a" src="b" /></li>\n'
+     '<li>![c][missing]</li>\n'
+     '</ul>'),
+    (('list_avg_gallery',),
+     '-   ![a](b) text\n'
+     '-   ![c](d)',
+     '<ul>\n'
+     '<li><img alt="a" src="b" /> text</li>\n'
+     '<li><img alt="c" src="d" /></li>\n'
+     '</ul>'),
+    (('list_avg_gallery',),
+     '- plain\n'
+     '- list',
+     '<ul>\n'
+     '<li>plain</li>\n'
+     '<li>list</li>\n'
+     '</ul>'),
+    (('image_block', 'link_image_block', 'list_gallery'),
+     '# title\n'
+     '\n'
+     '![a](b.jpg t)\n'
+     '\n'
+     '[![c](d.jpg)](e.png)\n'
+     '\n'
+     '-   ![f](g)\n'
+     '-   [![h][r]](i.jpg)\n'
+     '\n'
+     'some *text*\n'
+     '\n'
+     '> ![quoted](q.jpg)\n'
+     '\n'
+     '[r]: r.jpg',
+     '<h1>title</h1>\n'
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="a" src="b.jpg" title="t" /><figcaption class="am-figure-capition-btm">t</figcaption>\n'
+     '</figure>\n'
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="c" data-rel="e.png" src="d.jpg" /></figure>\n'
+     '<ul class="am-gallery am-avg-sm-1 am-gallery-bordered" data-am-gallery="{pureview:{target: \'a\', weChatImagePreview: false}}" data-am-widget="gallery">\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="g"><img alt="f" src="g" /></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="i.jpg"><img alt="h" src="r.jpg" /></a></div>\n'
+     '</li>\n'
+     '</ul>\n'
+     '<p>some <em>text</em></p>\n'
+     '<blockquote>\n'
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="quoted" src="q.jpg" /></figure>\n'
+     '</blockquote>'),
+    (('image_block', 'link_image_block', 'list_avg_gallery'),
+     '![a](b.jpg t)\n'
+     '\n'
+     '[![c](d.jpg)](e.png)\n'
+     '\n'
+     '-   *   ![f](g)\n'
+     '        ![h](i)\n'
+     '    *   ![j](k)\n'
+     '        ![l](m)\n'
+     '\n'
+     'some *text*',
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="a" src="b.jpg" title="t" /><figcaption class="am-figure-capition-btm">t</figcaption>\n'
+     '</figure>\n'
+     '<figure class="am am-figure am-figure-default" data-am-figure="{  pureview: \'true\' }" data-am-widget="figure"><img alt="c" data-rel="e.png" src="d.jpg" /></figure>\n'
+     '<div>\n'
+     '<ul class="am-gallery am-gallery-bordered am-avg-sm-1  am-avg-md-2 am-avg-lg-4" data-am-gallery="{pureview:{target: \'a\', weChatImagePreview: false}}" data-am-widget="gallery">\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="g"><img alt="f" src="g" /></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="i"><img alt="h" src="i" /></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="k"><img alt="j" src="k" /></a></div>\n'
+     '</li>\n'
+     '<li>\n'
+     '<div class="am-gallery-item"><a href="m"><img alt="l" src="m" /></a></div>\n'
+     '</li>\n'
+     '</ul>\n'
+     '</div>\n'
+     '<p>some <em>text</em></p>'),
+]
+
+
+class TestBlockConformance(TestCase):
+
+    def test_cases(self):
+        for names, md, html in CASES:
+            extensions = [EXTENSIONS[name].makeExtension() for name in names]
+            self.assertEqual(
+                markdown.markdown(md, extensions=extensions), html, md)
+
+
+class TestTokenizer(TestCase):
+
+    def setUp(self):
+        self.tokenizer = Tokenizer()
+
+    def test_match_image(self):
+        self.assertEqual(self.tokenizer.match('![a](b "c")'),
+                         ImageToken('a', 'b', '"c"', None))
+        self.assertEqual(self.tokenizer.match('![a][b]'),
+                         ImageToken('a', None, None, 'b'))
+
+    def test_match_link_image(self):
+        self.assertEqual(
+            self.tokenizer.match('[![a][b]](c.jpg "d")'),
+            LinkImageToken('a', None, None, 'b', 'c.jpg', 'd', None))
+
+    def test_match_whole_text_only(self):
+        self.assertIsNone(self.tokenizer.match('![a](b)\ntext'))
+        self.assertIsNone(self.tokenizer.match('text ![a](b)'))
+
+    def test_scan(self):
+        self.assertEqual(
+            [(start, end) for start, end, _ in
+             self.tokenizer.scan('-   ![a](b)\n    [![c](d)][e]')],
+            [(4, 11), (16, 28)])
+
+    def test_cached(self):
+        text = '![a](b)'
+        self.assertIs(self.tokenizer.match(text),
+                      self.tokenizer.match(text))
+
+    def test_one_per_markdown(self):
+        md = markdown.Markdown(extensions=[image_block.makeExtension(),
+                                           list_gallery.makeExtension()])
+        processors = md.parser.blockprocessors
+        self.assertIs(processors['image_block'].tokenizer, md.tokenizer)
+        self.assertIs(processors['list_gallery'].tokenizer, md.tokenizer)
+        other = markdown.Markdown(extensions=[image_block.makeExtension()])
+        self.assertIsNot(other.tokenizer, md.tokenizer)
+
+    def test_dropped_after_document(self):
+        md = markdown.Markdown(extensions=[image_block.makeExtension(),
+                                           list_avg_gallery.makeExtension()])
+        self.assertIn('<figure', md.convert('![a](b)\n\n-   ![c](d)'))
+        self.assertEqual(len(md.tokenizer._matched), 0)
+        self.assertEqual(len(md.tokenizer._scanned), 0)
+
+    def test_dropped_after_failed_document(self):
+        md = markdown.Markdown(extensions=[image_block.makeExtension()])
+        kept = []
+
+        class Probe(Treeprocessor):
+            def run(self, root):
+                kept.append('![a](b)' in md.tokenizer._matched)
+                if len(kept) == 1:
+                    raise ValueError
+
+        md.treeprocessors.add('probe', Probe(md), '_begin')
+        self.assertRaises(ValueError, md.convert, '![a](b)')
+        md.convert('text')
+        self.assertEqual(kept, [True, False])
+
+
+class TestPrefilter(TestCase):
+
+    def test_prose_rejected_early(self):
+        md = markdown.Markdown(extensions=[
+            image_block.makeExtension(),
+            link_image_block.makeExtension(),
+            list_avg_gallery.makeExtension(),
+        ])
+        md.convert('Some prose.\n\n[a link](x) in text\n\n# header\n\n'
+                   '![img](x) and text\n\n    indented code')
+        stats = block_stats(md)
+        self.assertEqual(len(stats), 3)
+        for name, each in stats.items():
+            self.assertEqual(each['evaluated'], 0, name)
+            self.assertTrue(each['rejected'], name)
+
+    def test_candidate_evaluated(self):
+        md = markdown.Markdown(extensions=[image_block.makeExtension()])
+        md.convert('text\n\n  ![img](x.jpg)\n')
+        self.assertEqual(block_stats(md)['image_block'],
+                         {'rejected': 1, 'evaluated': 1})
+
+
+if __name__ == '__main__':
+    main()
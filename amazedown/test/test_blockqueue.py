@@ -0,0 +1,45 @@
+import markdown
+from unittest import TestCase, main
+from amazedown import blockqueue
+from amazedown.blockqueue import BlockQueue
+from amazedown.test.test_incremental import DOCUMENT, extensions
+
+
+class TestBlockQueue(TestCase):
+
+    def test_like_a_list(self):
+        blocks = ['a', 'b', 'c', 'd']
+        queue = BlockQueue(blocks)
+        self.assertEqual(queue, blocks)
+        self.assertEqual((queue[0], queue[1], queue[-1]), ('a', 'b', 'd'))
+        self.assertEqual(queue[1:3], ['b', 'c'])
+        self.assertEqual(queue.pop(0), 'a')
+        queue.insert(0, 'x')
+        queue.insert(2, 'y')
+        queue.insert(-1, 'z')
+        queue.insert(10, 'e')
+        queue[0] = 'X'
+        queue.append('f')
+        self.assertEqual(queue, ['X', 'b', 'y', 'c', 'z', 'd', 'e', 'f'])
+        self.assertEqual(queue.pop(), 'f')
+        self.assertEqual(queue.pop(-2), 'd')
+        del queue[:2]
+        self.assertEqual(list(queue), ['y', 'c', 'z', 'e'])
+        self.assertEqual(len(queue), 4)
+        self.assertRaises(IndexError, lambda: queue[4])
+        while queue:
+            queue.pop(0)
+        self.assertRaises(IndexError, queue.pop, 0)
+
+    def test_same_html(self):
+        text = '\n\n'.join([DOCUMENT] * 20)
+        md = markdown.Markdown(extensions=extensions() +
+                               [blockqueue.makeExtension()])
+        self.assertIsInstance(md.parser, blockqueue.QueueBlockParser)
+        self.assertGreater(len(text.split('\n\n')), blockqueue.QUEUE_MIN)
+        self.assertEqual(md.convert(text),
+                         markdown.markdown(text, extensions=extensions()))
+
+
+if __name__ == '__main__':
+    main()
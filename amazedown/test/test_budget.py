@@ -0,0 +1,93 @@
+import markdown
+from timeit import default_timer
+from unittest import TestCase, main
+from markdown.util import etree
+from amazedown import budget, link_icon_tab, image_block, list_avg_gallery
+from amazedown.test.test_incremental import DOCUMENT, extensions
+
+
+def render(text, **config):
+    md = markdown.Markdown(extensions=extensions() + [
+        budget.makeExtension(**config)])
+    return md.convert(text), md
+
+
+class TestBudget(TestCase):
+
+    def test_unbounded(self):
+        html, md = render(DOCUMENT)
+        self.assertEqual(html, markdown.markdown(DOCUMENT,
+                                                 extensions=extensions()))
+        self.assertFalse(md.budget.exhausted)
+        self.assertGreater(md.budget.used, 0)
+
+    def test_large_enough(self):
+        html, md = render(DOCUMENT, seconds=60, steps=1000)
+        self.assertEqual(html, markdown.markdown(DOCUMENT,
+                                                 extensions=extensions()))
+        self.assertFalse(md.budget.exhausted)
+
+    def test_no_steps_renders_plain_markdown(self):
+        html, md = render(DOCUMENT, steps=0)
+        self.assertEqual(html, markdown.markdown(DOCUMENT))
+        self.assertTrue(md.budget.exhausted)
+
+    def test_no_time_renders_plain_markdown(self):
+        html, md = render(DOCUMENT, seconds=-1)
+        self.assertEqual(html, markdown.markdown(DOCUMENT))
+        self.assertTrue(md.budget.exhausted)
+
+    def test_rest_of_document_falls_back(self):
+        md = markdown.Markdown(extensions=[
+            image_block.makeExtension(),
+            link_icon_tab.makeExtension(host='example.com'),
+            budget.makeExtension(steps=2)])
+        html = md.convert('![a](a.jpg)\n\n![b](b.jpg)\n\n![c](c.jpg)\n\n'
+                          '[link](http://github.com)')
+        self.assertEqual(html.count('<figure'), 2)
+        self.assertIn('<p><img alt="c" src="c.jpg" /></p>', html)
+        self.assertIn('<a href="http://github.com">link</a>', html)
+        self.assertTrue(md.budget.exhausted)
+
+    def test_started_for_each_document(self):
+        md = markdown.Markdown(extensions=[
+            image_block.makeExtension(), budget.makeExtension(steps=1)])
+        md.convert('![a](a.jpg)\n\n![b](b.jpg)')
+        self.assertTrue(md.budget.exhausted)
+        md.reset()
+        self.assertIn('<figure', md.convert('![a](a.jpg)'))
+        self.assertFalse(md.budget.exhausted)
+
+    def test_deadline_inside_a_block(self):
+        # one block the scanner takes over a second on
+        block = '-   ' + '![a](b(' * 40000
+        md = markdown.Markdown(extensions=[
+            list_avg_gallery.makeExtension(),
+            budget.makeExtension(seconds=0.01)])
+        md.budget.start()
+        processor = md.parser.blockprocessors['list_gallery']
+        start = default_timer()
+        self.assertFalse(processor.test(etree.Element('div'), block))
+        self.assertLess(default_timer() - start, 0.5)
+        self.assertTrue(md.budget.exhausted)
+        self.assertEqual(md.budget.used, 1)
+
+    def test_check_takes_no_step(self):
+        md = markdown.Markdown(extensions=[budget.makeExtension(seconds=60,
+                                                                steps=1)])
+        check = budget.deadline_check(md)
+        for _ in range(3):
+            check()
+        self.assertEqual(md.budget.used, 0)
+        self.assertTrue(budget.spend(md))
+        self.assertFalse(budget.spend(md))
+        self.assertRaises(budget.BudgetExhausted, check)
+
+    def test_no_check_without_time_budget(self):
+        self.assertIsNone(budget.deadline_check(markdown.Markdown()))
+        md = markdown.Markdown(extensions=[budget.makeExtension(steps=1)])
+        self.assertIsNone(budget.deadline_check(md))
+
+
+if __name__ == '__main__':
+    main()
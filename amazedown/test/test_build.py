@@ -0,0 +1,124 @@
+import os
+import io
+import shutil
+import tempfile
+import markdown
+from unittest import TestCase, main
+from amazedown.build import build, load_config, markdown_kwargs, main as cli
+from amazedown.test.test_incremental import DOCUMENT
+
+FIGURE = ('<figure class="am am-figure am-figure-default" '
+          'data-am-figure="{  pureview: \'true\' }" data-am-widget="figure">')
+
+
+class TestBuild(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.source = os.path.join(self.directory, 'src')
+        self.output = os.path.join(self.directory, 'out')
+        self.write('a.md', DOCUMENT)
+        self.write('sub/b.markdown', '- ![a](a.jpg)\n- ![b](b.jpg)\n')
+        self.write('notes.txt', 'not markdown')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, rel_path, text):
+        path = os.path.join(self.source, rel_path)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with io.open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def read(self, rel_path):
+        with io.open(os.path.join(self.output, rel_path),
+                     encoding='utf-8') as f:
+            return f.read()
+
+    def test_build(self):
+        config = load_config()
+        self.assertEqual(build(self.source, self.output, config, jobs=2),
+                         (2, 0))
+        self.assertEqual(
+            self.read('a.html'),
+            markdown.markdown(DOCUMENT, **markdown_kwargs(config)))
+        self.assertTrue(os.path.exists(
+            os.path.join(self.output, 'sub', 'b.html')))
+        self.assertFalse(os.path.exists(
+            os.path.join(self.output, 'notes.html')))
+
+    def test_unchanged(self):
+        config = load_config()
+        build(self.source, self.output, config, jobs=1)
+        self.assertEqual(build(self.source, self.output, config, jobs=1),
+                         (0, 2))
+
+        # same content, new modification time
+        os.utime(os.path.join(self.source, 'a.md'), (0, 0))
+        self.assertEqual(build(self.source, self.output, config, jobs=1),
+                         (0, 2))
+
+        self.write('a.md', 'changed')
+        self.assertEqual(build(self.source, self.output, config, jobs=1),
+                         (1, 1))
+        self.assertEqual(self.read('a.html'), '<p>changed</p>')
+
+        config['extensions']['link_icon_tab']['host'] = 'github.com'
+        self.assertEqual(build(self.source, self.output, config, jobs=1),
+                         (2, 0))
+
+    def test_cli(self):
+        cli([self.source, self.output, '-j', '1', '-e', 'link_icon_tab',
+             '--host', 'github.com'])
+        self.assertEqual(
+            self.read('a.html'),
+            markdown.markdown(DOCUMENT, extensions=['amazedown.link_icon_tab'],
+                              extension_configs={'amazedown.link_icon_tab': {
+                                  'host': 'github.com'}}))
+
+    def test_default_config(self):
+        html = markdown.markdown(
+            'A [![i](s.jpg)](b.jpg) and [site](http://github.com).\n'
+            '\n'
+            '-   ![a](a.jpg)\n'
+            '-   ![b](b.jpg)\n',
+            **markdown_kwargs(load_config()))
+        self.assertEqual(
+            html,
+            '<p>A ' + FIGURE + '<img alt="i" data-rel="b.jpg" src="s.jpg" />'
+            '</figure> and <a class="am-icon-github" href="http://github.com" '
+            'target="_blank"> site <span class="am-icon-external-link">'
+            '</span></a>.</p>\n'
+            '<div>\n'
+            '<ul class="am-gallery am-gallery-bordered am-avg-sm-1  '
+            'am-avg-lg-1" data-am-gallery="{pureview:{target: \'a\', '
+            'weChatImagePreview: false}}" data-am-widget="gallery">\n'
+            '<li>\n'
+            '<div class="am-gallery-item"><a href="a.jpg">'
+            '<img alt="a" src="a.jpg" /></a></div>\n'
+            '</li>\n'
+            '<li>\n'
+            '<div class="am-gallery-item"><a href="b.jpg">'
+            '<img alt="b" src="b.jpg" /></a></div>\n'
+            '</li>\n'
+            '</ul>\n'
+            '</div>')
+
+    def test_order(self):
+        config = {'extensions': {'quote_by': {}, 'link_icon_tab': {},
+                                 'link_image': {}, 'figure': {}}}
+        self.assertEqual(markdown_kwargs(config)['extensions'], [
+            'amazedown.figure', 'amazedown.link_image',
+            'amazedown.link_icon_tab', 'amazedown.quote_by'])
+
+    def test_both_galleries(self):
+        config = {'extensions': {'list_gallery': {}, 'list_avg_gallery': {}}}
+        self.assertRaises(ValueError, markdown_kwargs, config)
+        self.assertRaises(SystemExit, cli, [
+            self.source, self.output, '-e', 'list_gallery',
+            '-e', 'list_avg_gallery'])
+
+
+if __name__ == '__main__':
+    main()
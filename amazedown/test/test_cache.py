@@ -0,0 +1,78 @@
+import shutil
+import tempfile
+import markdown
+from collections import OrderedDict
+from unittest import TestCase, main
+from amazedown import link_icon_tab, image_block, cache as cache_module
+from amazedown.cache import RenderCache, render_key
+
+TEXT = '[a](http://github.com/a)\n\n![b](c.jpg d)'
+
+
+class TestRenderCache(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _extensions(self, host='example.com'):
+        return [link_icon_tab.makeExtension(host=host),
+                image_block.makeExtension()]
+
+    def test_hit(self):
+        cache = RenderCache()
+        html = cache.render(TEXT, self._extensions())
+        self.assertEqual(
+            html, markdown.markdown(TEXT, extensions=self._extensions()))
+        self.assertEqual(cache.render(TEXT, self._extensions()), html)
+        self.assertEqual(cache.stats['hits'], 1)
+        self.assertEqual(cache.stats['misses'], 1)
+
+    def test_config_in_key(self):
+        self.assertNotEqual(
+            render_key(TEXT, self._extensions('a.com')),
+            render_key(TEXT, self._extensions('b.com')))
+        self.assertNotEqual(
+            render_key(TEXT, self._extensions()),
+            render_key(TEXT, self._extensions()[:1]))
+        self.assertEqual(
+            render_key(TEXT, self._extensions()),
+            render_key(TEXT, self._extensions()))
+
+    def test_brands_order_in_key(self):
+        brands = [('github.com', 'icon-github'), ('', 'icon-link')]
+        keys = [render_key(TEXT, [link_icon_tab.makeExtension(
+            brands=OrderedDict(each))]) for each in (brands, brands[::-1])]
+        self.assertNotEqual(keys[0], keys[1])
+
+    def test_versions_in_key(self):
+        key = render_key(TEXT, self._extensions())
+        for name in ('__version__', 'markdown_version'):
+            version = getattr(cache_module, name)
+            setattr(cache_module, name, version + '.1')
+            try:
+                self.assertNotEqual(render_key(TEXT, self._extensions()), key)
+            finally:
+                setattr(cache_module, name, version)
+        self.assertEqual(render_key(TEXT, self._extensions()), key)
+
+    def test_eviction(self):
+        cache = RenderCache(maxsize=100)
+        for index in range(5):
+            cache.render('paragraph %d %s' % (index, 'x' * 20))
+        self.assertLessEqual(cache.stats['size'], 100)
+        self.assertEqual(cache.stats['evictions'],
+                         5 - cache.stats['entries'])
+
+    def test_disk(self):
+        html = RenderCache(directory=self.directory).render(TEXT)
+        cache = RenderCache(directory=self.directory)
+        self.assertEqual(cache.render(TEXT), html)
+        self.assertEqual(cache.stats['disk_hits'], 1)
+        self.assertEqual(cache.stats['misses'], 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+import markdown
+from unittest import TestCase, main
+from amazedown import figure, link_image, link_icon_tab, image_block, \
+    link_image_block, list_avg_gallery, quote_by
+from amazedown.incremental import IncrementalRenderer
+
+DOCUMENT = '''\
+Title
+=====
+
+Some [link](http://github.com/a) and [another][gh], with
+[![img](small.jpg)](big.jpg) and <span>inline html</span>.
+
+![block image](pic.jpg title)
+
+![ref image][pic]
+
+[![block link image](pic.jpg)](big.jpg "title")
+
+[![ref link image][pic]][gh]
+
+-   ![a](a.jpg)
+-   ![b][pic]
+
+*   item one
+
+    still item one
+
+*   item two
+    1. nested
+    2. list
+
+> quoted text
+> -- someone
+
+> first quote paragraph
+
+> second quote paragraph
+
+    code block
+
+    with a blank line
+
+<div class="raw">
+raw *html*
+</div>
+
+## Section ##
+
+Trailing paragraph with `code` & entities &copy;.
+
+[gh]: http://github.com/b "GitHub"
+[pic]: ref.jpg "Ref title"
+'''
+
+
+def extensions():
+    return [
+        figure.makeExtension(),
+        link_image.makeExtension(),
+        link_icon_tab.makeExtension(host='example.com'),
+        image_block.makeExtension(),
+        link_image_block.makeExtension(),
+        list_avg_gallery.makeExtension(),
+        quote_by.makeExtension(),
+    ]
+
+
+class TestIncrementalRenderer(TestCase):
+
+    def setUp(self):
+        self.renderer = IncrementalRenderer(extensions=extensions())
+
+    def assertSameAsFull(self, text):
+        self.assertEqual(
+            self.renderer.render(text),
+            markdown.markdown(text, extensions=extensions()))
+
+    def rendered(self, text):
+        before = self.renderer.stats['rendered']
+        self.assertSameAsFull(text)
+        return self.renderer.stats['rendered'] - before
+
+    def test_same_as_full(self):
+        self.assertSameAsFull(DOCUMENT)
+        self.assertSameAsFull(DOCUMENT * 3)
+        self.assertSameAsFull('')
+        self.assertSameAsFull('   \n')
+
+    def test_blank_lines(self):
+        for blanks in range(1, 5):
+            sep = '\n' * (blanks + 1)
+            self.assertSameAsFull(sep.join(['- a', '- b', 'c']))
+            self.assertSameAsFull(sep.join(['> a', '> b', 'c']))
+            self.assertSameAsFull(sep.join(['a', '    b', '    c']))
+
+    def test_lines_taken_out(self):
+        # the reference leaves '\n    - nested' behind, still in the list
+        self.assertSameAsFull(
+            '* item\n\n[r]: http://x/r.jpg\n    - nested\n\n- item')
+        self.assertSameAsFull(
+            '> a\n\n[r]: http://x/r.jpg\n    > b\n\n> c')
+
+    def test_edit(self):
+        self.rendered(DOCUMENT)
+        self.assertEqual(self.rendered(DOCUMENT), 0)
+        self.assertEqual(
+            self.rendered(DOCUMENT.replace('Trailing', 'Trailin')), 1)
+        self.assertEqual(self.rendered(DOCUMENT), 1)
+        self.assertEqual(
+            self.rendered(DOCUMENT.replace('raw *html*', 'raw html')), 1)
+
+    def test_reference_edit(self):
+        self.rendered(DOCUMENT)
+        # used by the first paragraph and the last link image
+        self.assertEqual(self.rendered(DOCUMENT.replace(
+            '"GitHub"', '"Hub"')), 2)
+        self.rendered(DOCUMENT)
+        # used by the ref image, the last link image and the gallery
+        self.assertEqual(self.rendered(DOCUMENT.replace(
+            '[pic]: ref.jpg', '[pic]: other.jpg')), 3)
+        self.rendered(DOCUMENT)
+        self.assertEqual(self.rendered(DOCUMENT.replace(
+            '[gh]: http://github.com/b "GitHub"', '')), 2)
+
+
+if __name__ == '__main__':
+    main()
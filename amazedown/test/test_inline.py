@@ -0,0 +1,106 @@
+import re
+import random
+import markdown
+from unittest import TestCase, main
+from markdown.inlinepatterns import LINK_RE, IMAGE_LINK_RE, AUTOMAIL_RE
+from amazedown import figure, link_image, link_icon_tab
+from amazedown.inline import PositionalRegex
+
+TOKENS = ['[a]', '[r]', '(b.jpg)', '(http://github.com/x)', '![', ' ', '\n',
+          '[![x](s.jpg)](b.jpg)', '[![x][r]][r]', '![i](a.jpg t)', '"t"',
+          '<http://a.com>', '<a@b.c>', '[l](http://example.com)', ')', '(',
+          ']', '[', '!', 'x', '<', '>', "'", '*', '`']
+
+
+def make_markdown(legacy=False):
+    md = markdown.Markdown(extensions=[
+        figure.makeExtension(), link_image.makeExtension(),
+        link_icon_tab.makeExtension(host='example.com')])
+    if legacy:
+        for pattern in md.inlinePatterns.values():
+            if isinstance(pattern.compiled_re, PositionalRegex):
+                pattern.compiled_re = re.compile(
+                    r'^(.*?)%s(.*)$' % pattern.pattern,
+                    re.DOTALL | re.UNICODE)
+    return md
+
+
+def convert(md, text):
+    try:
+        return md.convert(text)
+    except Exception as e:  # the same errors are expected too
+        return type(e)
+    finally:
+        md.reset()
+
+
+class TestPositionalRegex(TestCase):
+
+    def assertSameMatch(self, pattern, text):
+        legacy = re.compile(r'^(.*?)%s(.*)$' % pattern, re.DOTALL | re.UNICODE)
+        expected = legacy.match(text)
+        found = PositionalRegex(pattern).match(text)
+        if expected is None:
+            self.assertIsNone(found)
+            return
+
+        self.assertEqual(found.groups(), expected.groups())
+        for index in range(len(expected.groups()) + 1):
+            self.assertEqual(found.group(index), expected.group(index))
+            self.assertEqual(found.span(index), expected.span(index))
+
+    def test_groups(self):
+        for pattern, text in (
+                (LINK_RE, 'a [b](c "d") e'),
+                (LINK_RE, "[b](c 'd') and [e](f)"),
+                (LINK_RE, 'no link'),
+                (IMAGE_LINK_RE, 'x ![a](b.jpg)\ny'),
+                (AUTOMAIL_RE, 'mail <a@b.c>.')):
+            self.assertSameMatch(pattern, text)
+
+
+class TestPositionalPatterns(TestCase):
+
+    def setUp(self):
+        self.md = make_markdown()
+        self.legacy = make_markdown(legacy=True)
+
+    def assertSameAsLegacy(self, text):
+        self.assertEqual(convert(self.md, text),
+                         convert(self.legacy, text), text)
+
+    def test_examples(self):
+        for text in (
+                'a [b](http://github.com) [![c](d.jpg)](e.jpg) '
+                '![f](g.jpg h) [i][r]\n\n[r]: ref.jpg "T"',
+                # a match appears only once the one after it is replaced
+                '![![](])]()',
+                '[a [b](c) d](http://github.com)'):
+            self.assertSameAsLegacy(text)
+
+    def test_random(self):
+        rng = random.Random(0)
+        for _ in range(300):
+            self.assertSameAsLegacy(''.join(
+                rng.choice(TOKENS) for _ in range(rng.randint(1, 40))) +
+                '\n\n[r]: ref.jpg "T"\n')
+
+    def test_turned_down_once(self):
+        pattern = self.md.inlinePatterns['link_image']
+        calls = []
+        handle_match = pattern.handleMatch
+
+        def counting(m):
+            calls.append(m)
+            return handle_match(m)
+
+        pattern.handleMatch = counting
+        self.md.convert(' '.join(
+            '[a](http://github.com/%d) [![b](c.jpg)](d.jpg)' % index
+            for index in range(100)))
+        # each link once, instead of again after every image link
+        self.assertEqual(len(calls), 200)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+import re
+import sys
+import subprocess
+from unittest import TestCase, main, skipIf
+from amazedown.util import LazyRegex
+
+SCRIPT = '''
+import sys
+import amazedown.all
+from amazedown import scanner
+print(' '.join(name for name in ('tempfile', 'json')
+               if name in sys.modules))
+print(type(scanner._SIMPLE.__dict__.get('match')).__name__)
+'''
+
+
+class TestLazyImport(TestCase):
+
+    def test_lazy_regex(self):
+        lazy = LazyRegex(r'(?P<a>x+)y', re.I)
+        self.assertNotIn('match', lazy.__dict__)
+        self.assertEqual(lazy.match('XXy').group('a'), 'XX')
+        self.assertIn('match', lazy.__dict__)
+        self.assertEqual(lazy.findall('xy xxy'), ['x', 'xx'])
+        self.assertEqual(lazy.groupindex, {'a': 1})
+        self.assertEqual(lazy.pattern, r'(?P<a>x+)y')
+
+    def test_nothing_extra_on_import(self):
+        output = subprocess.check_output(
+            [sys.executable, '-c', SCRIPT], universal_newlines=True)
+        modules, simple = output.split('\n')[:2]
+        self.assertEqual(modules, '')
+        self.assertEqual(simple, 'NoneType')  # not compiled yet
+
+    @skipIf(sys.version_info < (3, 7), 'module __getattr__ is Python 3.7+')
+    def test_extensions_as_attributes(self):
+        import amazedown
+        self.assertTrue(callable(amazedown.quote_by.makeExtension))
+        self.assertTrue(callable(amazedown.all.makeExtension))
+        self.assertRaises(AttributeError, getattr, amazedown, 'missing')
+
+
+if __name__ == '__main__':
+    main()
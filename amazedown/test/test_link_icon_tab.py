@@ -1,5 +1,10 @@
+import os
+import json
+import tempfile
 import markdown
-from amazedown.link_icon_tab import makeExtension
+from collections import OrderedDict
+from amazedown.link_icon_tab import makeExtension, \
+    LinkIconMixin, BrandIndex, load_brands
 from unittest import TestCase, main
 
 
@@ -81,5 +86,60 @@ class TestNewHost(TestCase):
         self._skip(md)
 
 
+class TestBrandIndex(TestCase):
+
+    def _scan(self, brands, host):
+        if host == '':
+            return brands['']
+        for k, icon in brands.items():
+            if k != '' and (host == k or host.endswith('.' + k)):
+                return icon
+        return None
+
+    def test_same_as_scan(self):
+        brands = load_brands(LinkIconMixin.brands, host='test.com')
+        brands['com'] = 'am-icon-com'
+        brands['google.com.hk'] = 'am-icon-google'
+        index = BrandIndex(brands)
+        for host in ('', 'google.com', 'www.google.com', 'plus.google.com',
+                     'a.plus.google.com', 'notgoogle.com', 'github.com:443',
+                     'test.com', 'x.test.com', 'google.com.hk', 'md.org',
+                     '.yahoo.com', 'x..yahoo.com'):
+            self.assertEqual(index.lookup(host), self._scan(brands, host),
+                             host)
+
+    def test_first_match_wins(self):
+        brands = OrderedDict((
+            ('', 'link'),
+            ('google.com', 'google'),
+            ('plus.google.com', 'plus'),
+        ))
+        self.assertEqual(BrandIndex(brands).lookup('plus.google.com'),
+                         'google')
+
+    def test_filter_keeps_order(self):
+        brands = load_brands(LinkIconMixin.brands,
+                             ['google.com', 'plus.google.com'])
+        self.assertEqual(list(brands),
+                         ['', 'plus.google.com', 'google.com'])
+
+    def test_json_brands(self):
+        fd, path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'jolla.com': 'iconfont icon-jolla'}, f)
+        try:
+            html = markdown.markdown(
+                '[tjc](https://together.jolla.com)',
+                extensions=[makeExtension(brands=path)])
+        finally:
+            os.remove(path)
+
+        self.assertEqual(
+            html,
+            '<p><a class="iconfont icon-jolla" '
+            'href="https://together.jolla.com" target="_blank"> tjc '
+            '<span class="am-icon-external-link"></span></a></p>')
+
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
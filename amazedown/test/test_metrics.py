@@ -0,0 +1,95 @@
+import markdown
+from unittest import TestCase, main
+from amazedown import metrics, list_gallery, quote_by
+from amazedown import all as all_in_one
+from amazedown.test.test_incremental import DOCUMENT, extensions
+
+
+def render(text, first=False):
+    if first:
+        loaded = [metrics.makeExtension()] + extensions()
+    else:
+        loaded = extensions() + [metrics.makeExtension()]
+    md = markdown.Markdown(extensions=loaded)
+    return md.convert(text), md
+
+
+class TestMetrics(TestCase):
+
+    def setUp(self):
+        metrics.reset()
+
+    def test_same_html(self):
+        expected = markdown.markdown(DOCUMENT, extensions=extensions())
+        self.assertEqual(render(DOCUMENT)[0], expected)
+        self.assertEqual(render(DOCUMENT, first=True)[0], expected)
+
+    def test_counts(self):
+        _, md = render(DOCUMENT)
+        document = md.metrics
+        self.assertEqual(document['documents'], 1)
+        extensions = document['extensions']
+        self.assertEqual(set(extensions), set([
+            'figure', 'link_image', 'link_icon_tab', 'image_block',
+            'link_image_block', 'list_avg_gallery', 'quote_by']))
+        for counts in extensions.values():
+            self.assertEqual(counts['calls'],
+                             counts['matches'] + counts['misses'])
+        self.assertEqual(extensions['quote_by']['matches'], 3)
+        self.assertGreater(extensions['list_avg_gallery']['misses'], 0)
+        self.assertGreater(extensions['link_icon_tab']['matches'], 0)
+        # the time of a processor run by another counts once
+        self.assertLessEqual(
+            sum(counts['seconds'] for counts in extensions.values()),
+            document['seconds'])
+
+    def test_started_for_each_document(self):
+        _, md = render(DOCUMENT)
+        first = md.metrics['extensions']['image_block']
+        md.reset()
+        md.convert(DOCUMENT)
+        again = md.metrics['extensions']['image_block']
+        self.assertEqual(first['calls'], again['calls'])
+        self.assertEqual(first['matches'], again['matches'])
+
+    def test_totals(self):
+        md = markdown.Markdown(extensions=[quote_by.makeExtension(),
+                                           metrics.makeExtension()])
+        for _ in range(3):
+            md.convert('> quote\n> -- someone')
+            md.reset()
+        self.assertEqual(md.metrics['extensions']['quote_by']['matches'], 1)
+        totals = metrics.totals()
+        self.assertEqual(totals['documents'], 3)
+        self.assertEqual(totals['extensions']['quote_by']['matches'], 3)
+        metrics.reset()
+        self.assertEqual(metrics.totals()['documents'], 0)
+
+    def test_all_in_one(self):
+        md = markdown.Markdown(extensions=[
+            all_in_one.makeExtension(host='example.com'),
+            metrics.makeExtension()])
+        md.convert('[a](http://github.com) [![b](b.jpg)](c.jpg) ![d](d.jpg)')
+        extensions = md.metrics['extensions']
+        self.assertEqual(extensions['link_icon_tab']['matches'], 1)
+        self.assertEqual(extensions['link_image']['matches'], 1)
+        self.assertEqual(extensions['figure']['matches'], 1)
+        self.assertEqual(extensions['all']['matches'], 3)
+
+    def test_prometheus(self):
+        md = markdown.Markdown(extensions=[list_gallery.makeExtension(),
+                                           metrics.makeExtension()])
+        md.convert('-   ![a](a.jpg)\n-   ![b](b.jpg)\n\ntext')
+        text = metrics.prometheus()
+        self.assertIn('# TYPE amazedown_documents_total counter\n'
+                      'amazedown_documents_total 1\n', text)
+        self.assertIn('amazedown_extension_matches_total'
+                      '{extension="list_gallery"} 1\n', text)
+        self.assertIn('amazedown_extension_misses_total'
+                      '{extension="list_gallery"} 1\n', text)
+        self.assertTrue(metrics.prometheus(md.metrics, prefix='blog')
+                        .startswith('# HELP blog_documents_total'))
+
+
+if __name__ == '__main__':
+    main()
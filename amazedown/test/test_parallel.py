@@ -0,0 +1,98 @@
+import re
+import threading
+import markdown
+from unittest import TestCase, main
+from amazedown.parallel import ParallelRenderer, tasks
+from amazedown.test.test_incremental import DOCUMENT
+
+CONFIG = {
+    'extensions': ['amazedown.link_icon_tab', 'amazedown.image_block',
+                   'amazedown.link_image_block', 'amazedown.list_avg_gallery',
+                   'amazedown.quote_by'],
+    'extension_configs': {'amazedown.link_icon_tab': {'host': 'github.com'}},
+}
+
+TEXT = '\n\n'.join([
+    '<div>\nraw html\n</div>',
+    DOCUMENT,
+    'inline <span>html</span> and [a link][late]',
+    '![late image][late-pic]',
+    DOCUMENT,
+    '[late]: http://example.com\n[late-pic]: late.jpg "late title"',
+])
+
+
+class TestParallelRenderer(TestCase):
+
+    def setUp(self):
+        self.renderer = ParallelRenderer(workers=2, task_size=100,
+                                         min_size=0, configs=[CONFIG])
+
+    def tearDown(self):
+        self.renderer.close()
+
+    def test_same_as_serial(self):
+        for config in (CONFIG, None):
+            self.assertEqual(
+                self.renderer.render(TEXT, config),
+                markdown.Markdown(**(config or {})).convert(TEXT))
+
+    def test_lines_taken_out(self):
+        # the reference leaves '\n    - nested' behind, still in the list
+        text = '* item\n\n[r]: http://x/r.jpg\n    - nested\n\n- item'
+        renderer = ParallelRenderer(workers=2, task_size=1, min_size=0)
+        try:
+            self.assertEqual(renderer.render(text),
+                             markdown.Markdown().convert(text))
+        finally:
+            renderer.close()
+
+    def test_references_defined_later(self):
+        html = self.renderer.render(TEXT, CONFIG)
+        self.assertIn('href="http://example.com"', html)
+        self.assertIn('<figcaption class="am-figure-capition-btm">'
+                      'late title</figcaption>', html)
+
+    def test_small_text_serial(self):
+        renderer = ParallelRenderer(workers=2)
+        self.assertEqual(renderer.render(DOCUMENT, CONFIG),
+                         markdown.Markdown(**CONFIG).convert(DOCUMENT))
+        self.assertIsNone(renderer._executor)
+        self.assertEqual(renderer.render('', CONFIG), '')
+
+    def test_threads(self):
+        expected = markdown.Markdown(**CONFIG).convert(TEXT)
+        results = []
+
+        def render(renderer):
+            for _ in range(3):
+                results.append(renderer.render(TEXT, CONFIG))
+
+        serial = ParallelRenderer(workers=2)  # TEXT is below min_size
+        threads = [threading.Thread(target=render, args=(renderer,))
+                   for renderer in (self.renderer, serial) * 2]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [expected] * 12)
+
+    def test_leaked_placeholder(self):
+        # Python-Markdown leaves a placeholder in the src; only its number,
+        # counted in the chunk rather than the document, differs
+        text = '*a* *b* *c*\n\n![x]([a.jpg(<img src="a">](>`<)![))('
+        parallel = self.renderer.render(text)
+        serial = markdown.Markdown().convert(text)
+        self.assertIn('klzzwxh:', serial)
+        number = re.compile('klzzwxh:[0-9]+')
+        self.assertEqual(number.sub('klzzwxh:', parallel),
+                         number.sub('klzzwxh:', serial))
+
+    def test_tasks(self):
+        chunks = [['aaaa'], ['bb', 'cc'], ['d'], ['eeeee']]
+        self.assertEqual(list(tasks(chunks, 4)),
+                         [[['aaaa']], [['bb', 'cc']], [['d'], ['eeeee']]])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+import threading
+import markdown
+from unittest import TestCase, main
+from amazedown import image_block, link_image_block, list_gallery
+from amazedown.pool import MarkdownPool, PoolTimeout
+
+
+def extensions():
+    return [image_block.makeExtension(),
+            link_image_block.makeExtension(),
+            list_gallery.makeExtension()]
+
+
+class TestMarkdownPool(TestCase):
+
+    def test_threads(self):
+        texts = ['![a%d](b%d.jpg t)\n\n[![c%d][r]](d.png)\n\n'
+                 '-   ![e](f)\n-   ![g][r]\n\n[r]: ref%d.jpg' % (i, i, i, i)
+                 for i in range(40)]
+        expected = [markdown.markdown(text, extensions=extensions())
+                    for text in texts]
+        pool = MarkdownPool(size=3, extensions=extensions())
+        results = {}
+
+        def work(offset):
+            for index in range(offset, len(texts), 8):
+                results[index] = pool.convert(texts[index])
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([results[i] for i in range(len(texts))], expected)
+
+    def test_reset_between_uses(self):
+        pool = MarkdownPool(size=1, extensions=extensions())
+        pool.convert('![a][r]\n\n[r]: b.jpg')
+        self.assertEqual(pool.convert('![a][r]'), '<p>![a][r]</p>')
+
+    def test_timeout(self):
+        pool = MarkdownPool(size=1)
+        with pool.markdown():
+            self.assertRaises(PoolTimeout, pool.convert, 'text', 0.01)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+import markdown
+from unittest import TestCase, main
+from amazedown import prescan, metrics
+from amazedown import all as all_in_one
+from amazedown.test.test_incremental import DOCUMENT, extensions
+
+TEXT = '''\
+Title
+=====
+
+Some *text* with [a link](http://github.com/a) and a list:
+
+-   one
+-   two
+
+    code
+'''
+
+
+def prescanned(loaded):
+    return markdown.Markdown(extensions=loaded + [prescan.makeExtension()])
+
+
+class TestPrescan(TestCase):
+
+    def test_same_html(self):
+        for loaded in (extensions, lambda: [all_in_one.makeExtension()]):
+            md = prescanned(loaded())
+            for text in (TEXT, DOCUMENT, TEXT, '> quote', '<http://a.com>'):
+                self.assertEqual(md.convert(text),
+                                 markdown.markdown(text, extensions=loaded()))
+                md.reset()
+
+    def test_disabled(self):
+        md = prescanned(extensions())
+        md.convert(TEXT)
+        self.assertEqual(md.prescan.disabled, set([
+            'figure', 'link_image', 'image_block', 'link_image_block',
+            'list_avg_gallery', 'quote_by']))
+        self.assertNotIn('figure_link', md.inlinePatterns)
+        self.assertIn('link_icon_tab_link', md.inlinePatterns)
+        self.assertIn('link', md.inlinePatterns)
+
+        md.reset()
+        md.convert(DOCUMENT)
+        self.assertEqual(md.prescan.disabled, set())
+        self.assertIn('figure_link', md.inlinePatterns)
+
+    def test_order_kept(self):
+        md = markdown.Markdown(extensions=extensions())
+        order = (list(md.parser.blockprocessors), list(md.inlinePatterns))
+        md = prescanned(extensions())
+        md.convert(TEXT)
+        md.reset()
+        md.convert(DOCUMENT)
+        self.assertEqual(
+            (list(md.parser.blockprocessors), list(md.inlinePatterns)), order)
+
+    def test_with_metrics(self):
+        md = prescanned(extensions() + [metrics.makeExtension()])
+        md.convert(TEXT)
+        self.assertEqual(md.metrics['extensions']['figure']['calls'], 0)
+        md.reset()
+        md.convert(DOCUMENT)
+        self.assertGreater(md.metrics['extensions']['figure']['calls'], 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+from unittest import TestCase, main
+import markdown
+from amazedown import quote_by
+
+
+def render(text):
+    return markdown.markdown(text, extensions=[quote_by.makeExtension()])
+
+
+class TestQuoteBy(TestCase):
+
+    def test_by(self):
+        self.assertEqual(
+            render('> text\n> -- someone\n> —— somewhere'),
+            '<blockquote>\n<p>text\n<small>someone</small><br/>\n'
+            '<small>somewhere</small></p>\n</blockquote>')
+
+    def test_only_by(self):
+        self.assertEqual(render('> -- a\n> -- b'),
+                         '<blockquote>\n<p><small>a</small><br/>\n'
+                         '<small>b</small></p>\n</blockquote>')
+
+    def test_not_at_end(self):
+        self.assertEqual(render('> text\n> -- someone\n> more'),
+                         '<blockquote>\n<p>text\n-- someone\nmore\n</p>\n'
+                         '</blockquote>')
+        self.assertEqual(render('> text'),
+                         '<blockquote>\n<p>text\n</p>\n</blockquote>')
+
+    def test_nested(self):
+        self.assertEqual(
+            render('> > inner\n> > -- someone'),
+            '<blockquote>\n<blockquote>\n<p>inner\n<small>someone</small>'
+            '</p>\n</blockquote>\n</blockquote>')
+
+    def test_line_breaks(self):
+        self.assertEqual(render('> text\r\n> -- someone'),
+                         render('> text\n> -- someone'))
+
+
+if __name__ == '__main__':
+    main()
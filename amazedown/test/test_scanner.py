@@ -0,0 +1,92 @@
+"""
+`Scanner` must give the matches of the tokenizer regexes, in time linear
+with the text.
+"""
+import re
+import random
+import timeit
+from unittest import TestCase, main
+from amazedown.scanner import Scanner
+from amazedown.tokenizer import IMAGE_RE, LINK_IMAGE_RE
+
+TOKEN_RE = re.compile('%s|%s' % (LINK_IMAGE_RE, IMAGE_RE))
+FULL_RE = re.compile('^(?:%s|%s)$' % (LINK_IMAGE_RE, IMAGE_RE))
+
+IMAGE_GROUPS = ('alt', 'src', 'title', 'ref')
+LINK_GROUPS = ('link_alt', 'link_src', 'img_title', 'img_ref',
+               'href', 'link_title', 'link_ref')
+
+ALPHABET = list('![]() \t\n"\'ab') + ['![', '](', '[![', ')](', ' "']
+
+# texts that almost match, repeated; the regexes backtrack on each of them
+ADVERSARIAL = {
+    'open_image': '![',
+    'open_link': '[![',
+    'unclosed_src': '![a](b c',
+    'image_then_junk': '![a](b) c]',
+    'unclosed_link_image': '[![a](b)](c "d',
+    'nested': '[![a](b)',
+    'many_spaces': '![a](b     ',
+    # no `)` or space anywhere: every search for the end of a src used to
+    # go to the end of the text
+    'open_paren': '![a](b(',
+    'open_paren_link': '[![a](b(',
+}
+
+# generous: the regexes took about 20ms per character on 'unclosed_src'
+MAX_US_PER_CHAR = 100
+# texts SCALE times longer must take less than MAX_RATIO times longer:
+# linear is SCALE, quadratic SCALE ** 2
+SIZE = 4000
+SCALE = 8
+MAX_RATIO = 24
+
+
+def expected(m):
+    if m is None:
+        return None
+    groups = m.groupdict()
+    names = IMAGE_GROUPS if groups['link_alt'] is None else LINK_GROUPS
+    return m.start(), m.end(), dict((name, groups[name]) for name in names)
+
+
+class TestScanner(TestCase):
+
+    def assertSameAsRegex(self, text):
+        self.assertEqual(Scanner(text).match(),
+                         expected(FULL_RE.match(text)), text)
+        self.assertEqual(Scanner(text).scan(),
+                         [expected(m) for m in TOKEN_RE.finditer(text)], text)
+
+    def test_examples(self):
+        for text in ('![a](b "c")', '![a][b]', '![a](b  c )', '![a](b)\n',
+                     '[![a][b]](c.jpg "d")', '[ ![a](b c) ][d]',
+                     '-   ![a](b)\n    [![c](d)][e]', '![a](b)](c)'):
+            self.assertSameAsRegex(text)
+
+    def test_random(self):
+        rng = random.Random(0)
+        for _ in range(5000):
+            self.assertSameAsRegex(''.join(
+                rng.choice(ALPHABET) for _ in range(rng.randint(1, 30))))
+
+    def scan_time(self, unit, size, number=1):
+        text = unit * (size // len(unit))
+        return min(timeit.repeat(lambda: Scanner(text).scan(),
+                                 number=number, repeat=3)) / number
+
+    def test_linear_time(self):
+        for name, unit in sorted(ADVERSARIAL.items()):
+            # the small text as many times as it is shorter, for a time as
+            # long as the one of the large text and as little noise
+            small = self.scan_time(unit, SIZE, SCALE)
+            large = self.scan_time(unit, SIZE * SCALE)
+            self.assertLess(large, SIZE * SCALE * MAX_US_PER_CHAR / 1e6,
+                            '%s, %d characters' % (name, SIZE * SCALE))
+            self.assertLess(large, small * MAX_RATIO,
+                            '%s, %d then %d characters: %.3fs then %.3fs' % (
+                                name, SIZE, SIZE * SCALE, small, large))
+
+
+if __name__ == '__main__':
+    main()
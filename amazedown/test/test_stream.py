@@ -0,0 +1,81 @@
+import io
+import markdown
+from unittest import TestCase, main
+from amazedown.stream import render_stream, iter_line_chunks
+from amazedown.test.test_incremental import DOCUMENT, extensions
+
+HTML = '''\
+<div>
+
+a
+
+<div>
+b
+</div>
+
+c
+</div>
+
+<!-- x
+
+y -->
+
+para'''
+
+
+class TestRenderStream(TestCase):
+
+    def assertSameAsFull(self, text, source=None):
+        if source is None:
+            source = io.StringIO(text, newline='')
+        pieces = list(render_stream(source, extensions=extensions()))
+        self.assertEqual(''.join(pieces),
+                         markdown.markdown(text, extensions=extensions()))
+        return pieces
+
+    def test_same_as_full(self):
+        self.assertGreater(len(self.assertSameAsFull(DOCUMENT)), 10)
+        self.assertSameAsFull(DOCUMENT * 3)
+        self.assertSameAsFull(HTML)
+        self.assertSameAsFull('\tcode\n\n\tmore\n\ntext\r\n\r\n    code\n\n')
+        self.assertEqual(self.assertSameAsFull(''), [])
+        self.assertEqual(self.assertSameAsFull('\n \n'), [])
+
+    def test_blank_lines(self):
+        for blanks in range(1, 6):
+            sep = '\n' * (blanks + 1)
+            self.assertSameAsFull(sep.join(['- a', '- b', 'c']))
+            self.assertSameAsFull(sep.join(['> a', '> b', 'c']))
+            self.assertSameAsFull(sep.join(['    a', 'b', '    c', 'd']))
+
+    def test_iterable(self):
+        body, references = DOCUMENT.split('\n[gh]:')
+        text = '[gh]:' + references + '\n' + body
+        self.assertEqual(
+            ''.join(render_stream(text.splitlines(), extensions=extensions())),
+            markdown.markdown(text, extensions=extensions()))
+
+    def test_lines_taken_out(self):
+        for text in ['* item\n\n[r]: http://x/r.jpg\n\n- item',
+                     '* item\n\n[r]: http://x/r.jpg\n    - nested\n\n- item',
+                     '1. one\n[r]: http://x/r.jpg\n\n1. two',
+                     '<div>\na\n<div>\n\nb\n</div>\n\nc\n</div>\n\nd',
+                     '<div>\n<div>\n</div>\n-->\n\n1. one']:
+            self.assertSameAsFull(text)
+            self.assertSameAsFull(text, text.split('\n'))
+
+    def test_chunks(self):
+        self.assertEqual(
+            list(iter_line_chunks(['a', '', '- b', '', '', '- c', '', 'd'])),
+            [['a'], ['- b', '', '', '- c'], ['d']])
+        self.assertEqual(
+            list(iter_line_chunks(['<div>', '', 'a', '</div>', '', 'b'])),
+            [['<div>', '', 'a', '</div>'], ['b']])
+        self.assertEqual(
+            list(iter_line_chunks(['<div>', '<div>', '</div>', '-->', '',
+                                   '1. one'])),
+            [['<div>', '<div>', '</div>', '-->', '', '1. one']])
+
+
+if __name__ == '__main__':
+    main()
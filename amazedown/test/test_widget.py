@@ -0,0 +1,47 @@
+from unittest import TestCase, main
+from markdown.util import etree
+from amazedown import widget
+
+
+def html(elem):
+    return etree.tostring(elem).decode('utf-8')
+
+
+class TestWidget(TestCase):
+
+    def test_figure(self):
+        root = widget.figure(None, 'a.jpg', 'alt', 'title', rel='b.jpg')
+        self.assertEqual(root.attrib, widget.FIGURE)
+        self.assertEqual(root[0].attrib, {'src': 'a.jpg', 'alt': 'alt',
+                                          'title': 'title',
+                                          'data-rel': 'b.jpg'})
+        self.assertEqual(root[1].text, 'title')
+        self.assertEqual(len(widget.figure(None, 'a.jpg')), 1)
+
+    def test_templates_untouched(self):
+        parent = etree.Element('div')
+        root = widget.figure(parent, 'a.jpg', title='t')
+        root.set('class', 'changed')
+        root[1].set('class', 'changed')
+        self.assertEqual(widget.FIGURE['class'],
+                         'am am-figure am-figure-default')
+        self.assertEqual(widget.FIGCAPTION['class'], 'am-figure-capition-btm')
+
+    def test_gallery(self):
+        parent = etree.Element('div')
+        widget.gallery(parent, 'am-gallery', [
+            widget.GalleryItem('big.jpg', 'small.jpg', 'a', 'title', 1),
+            widget.GalleryItem('b.jpg', 'b.jpg', None, None, 1)])
+        self.assertEqual(
+            html(parent[0][1]),
+            '<li><div class="am-gallery-item"><a href="b.jpg">'
+            '<img src="b.jpg" /></a></div></li>')
+        link = parent[0][0][0][0]
+        self.assertEqual(link[0].get('title'), 'title')
+        self.assertEqual(link[1].text, 'title')
+        self.assertEqual(parent[0].get('class'), 'am-gallery')
+        self.assertEqual(parent[0].get('data-am-widget'), 'gallery')
+
+
+if __name__ == '__main__':
+    main()
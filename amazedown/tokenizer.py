@@ -0,0 +1,145 @@
+"""
+Image and image-link tokenizer shared by the block processors
+
+image_block, link_image_block, list_gallery and list_avg_gallery all read
+the same two forms:
+
+    ![alt](src title)           ![alt][ref]
+    [![alt](src title)](href "link title")
+    [![alt][ref]][link_ref]
+
+A `Tokenizer` turns a text into `ImageToken` / `LinkImageToken` records,
+and remembers the latest results, so a block tested by several processors
+is only scanned once. The matching follows `IMAGE_RE` and `LINK_IMAGE_RE`
+exactly, but is done by `amazedown.scanner` in time linear with the text.
+
+The processors of a Markdown instance share `tokenizer_of(md)`, which
+forgets its results when a document starts and once it is converted:
+blocks and tokens are not kept from one document to the next, even when
+converting one raised.
+"""
+from collections import namedtuple
+from markdown.preprocessors import Preprocessor
+from markdown.postprocessors import Postprocessor
+from amazedown.scanner import Scanner
+from amazedown.util import LRUCache
+
+ImageToken = namedtuple('ImageToken', 'alt src title ref')
+LinkImageToken = namedtuple(
+    'LinkImageToken', 'alt src title ref href link_title link_ref')
+
+IMAGE_RE = (
+    r'!\[(?P<alt>[\s\S]*?)\]'  # ![] img alt
+    r'('
+        r'\('
+            r'(?P<src>.+?)'
+            r'(\s+'
+                r'(?P<title>.+?)'
+            r')?\s?'
+        r'\)'
+    r'|'
+        r'\[(?P<ref>.*?)\]'
+    r')'
+)
+
+LINK_IMAGE_RE = (
+    r'\[\s?'
+        r'!\[(?P<link_alt>[\s\S]*?)\]'  # ![] img alt
+        r'('
+            r'\('
+                r'(?P<link_src>.+?)'
+                r'(\s+'
+                    r'(?P<img_title>.+?)'
+                r')?\s?'
+            r'\)'
+        r'|'
+            r'\[(?P<img_ref>.*?)\]'
+        r')'  # img src
+    r'\s?\]'  # [] link text
+    r'('
+        r'\('
+            r'(?P<href>.*?)'
+            r"""(\s+['"]"""
+                r'(?P<link_title>.+?)'
+            r"""['"])?\s?"""
+        r'\)'  # () link link & title
+    r'|'  # or
+        r'\[(?P<link_ref>.+?)\]'  # [] link ref
+    r')'
+)
+
+_MISSING = object()
+
+
+class Tokenizer(object):
+
+    def __init__(self, maxsize=64):
+        self._matched = LRUCache(maxsize)
+        self._scanned = LRUCache(maxsize)
+
+    def match(self, text, check=None):
+        """Return the token that is the whole `text`, or None. `check`, if
+        given, is called before and during the scan (see `Scanner`)."""
+        token = self._matched.get(text, _MISSING)
+        if token is _MISSING:
+            if check is not None:
+                check()
+            found = Scanner(text, check).match()
+            token = self._matched[text] = \
+                None if found is None else self._token(found[2])
+        return token
+
+    def scan(self, text, check=None):
+        """Return every token of `text` as `(start, end, token)`."""
+        tokens = self._scanned.get(text)
+        if tokens is None:
+            if check is not None:
+                check()
+            tokens = self._scanned[text] = tuple(
+                (start, end, self._token(groups))
+                for start, end, groups in Scanner(text, check).scan())
+        return tokens
+
+    def clear(self):
+        self._matched.clear()
+        self._scanned.clear()
+
+    @staticmethod
+    def _token(groups):
+        if 'link_alt' in groups:
+            return LinkImageToken(
+                groups['link_alt'], groups['link_src'], groups['img_title'],
+                groups['img_ref'], groups['href'], groups['link_title'],
+                groups['link_ref'])
+
+        return ImageToken(
+            groups['alt'], groups['src'], groups['title'], groups['ref'])
+
+
+class ClearTokenizerPreprocessor(Preprocessor):
+    """Drops what the tokenizer kept of a document whose conversion did
+    not get to the end."""
+
+    def run(self, lines):
+        self.markdown.tokenizer.clear()
+        return lines
+
+
+class ClearTokenizerPostprocessor(Postprocessor):
+    """Drops what the tokenizer of the document kept."""
+
+    def run(self, text):
+        self.markdown.tokenizer.clear()
+        return text
+
+
+def tokenizer_of(md):
+    """The `Tokenizer` of `md`, made on the first call."""
+    tokenizer = getattr(md, 'tokenizer', None)
+    if tokenizer is None:
+        tokenizer = md.tokenizer = Tokenizer()
+        md.preprocessors.add('amazedown_tokenizer',
+                             ClearTokenizerPreprocessor(md), '_begin')
+        md.postprocessors.add('amazedown_tokenizer',
+                              ClearTokenizerPostprocessor(md), '_end')
+    return tokenizer
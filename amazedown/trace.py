@@ -0,0 +1,25 @@
+"""
+Tracing switch for amazedown
+
+The logging calls in the hot paths of amazedown only run when tracing is
+on, so by default no log argument is built and no logger level is checked
+per block, link or gallery item. Turn tracing on with
+
+    from amazedown import trace
+    trace.enable()
+
+or by setting the `AMAZEDOWN_TRACE` environment variable; the messages then
+go to the `MARKDOWN.*` loggers as usual.
+"""
+import os
+
+TRACE = bool(os.environ.get('AMAZEDOWN_TRACE'))
+
+
+def enable(on=True):
+    global TRACE
+    TRACE = bool(on)
+
+
+def disable():
+    enable(False)
@@ -0,0 +1,120 @@
+"""
+Helpers shared by amazedown extensions
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """A thread-safe dict-like cache dropping the least recently used entries.
+
+    By default it keeps at most `maxsize` entries. With `sizeof`, it keeps
+    entries whose `sizeof(value)` add up to at most `maxsize` instead, and
+    values larger than `maxsize` are not stored at all.
+    """
+
+    def __init__(self, maxsize=128, sizeof=None):
+        self.maxsize = maxsize
+        self.size = 0
+        self.evictions = 0
+        self._sizeof = sizeof
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        data = self._data
+        with self._lock:
+            try:
+                value, size = data.pop(key)
+            except KeyError:
+                return default
+
+            data[key] = (value, size)
+        return value
+
+    def __setitem__(self, key, value):
+        size = 1 if self._sizeof is None else self._sizeof(value)
+        data = self._data
+        with self._lock:
+            old = data.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+
+            if size > self.maxsize:
+                return
+
+            data[key] = (value, size)
+            self.size += size
+            while self.size > self.maxsize:
+                _, (_, dropped) = data.popitem(last=False)
+                self.size -= dropped
+                self.evictions += 1
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+
+class LazyRegex(object):
+    """Stands for `re.compile(pattern, flags)`, compiled when first used
+    rather than when the module defining it is imported."""
+
+    def __init__(self, pattern, flags=0):
+        self.pattern = pattern
+        self._flags = flags
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        # kept on the instance: later lookups do not come here again
+        value = getattr(re.compile(self.pattern, self._flags), name)
+        setattr(self, name, value)
+        return value
+
+
+def extension_name(obj):
+    """The amazedown extension a processor or pattern comes from (the name
+    of its module), or None for the ones of Markdown and others."""
+    module = type(obj).__module__
+    if not module.startswith('amazedown.'):
+        return None
+    return module.rsplit('.', 1)[-1]
+
+
+def atomic_write(path, text, encoding='utf-8'):
+    """Write `text` to `path` so that readers see the old or the new content,
+    never a partial file. Missing parent folders are created."""
+    folder = os.path.dirname(path) or '.'
+    if not os.path.isdir(folder):
+        try:
+            os.makedirs(folder)
+        except OSError:  # created by another process meanwhile
+            if not os.path.isdir(folder):
+                raise
+
+    import tempfile  # only the builds write files
+
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(text.encode(encoding))
+        os.chmod(tmp, 0o644)
+        try:
+            os.replace(tmp, path)
+        except AttributeError:  # Python 2
+            if os.path.exists(path):
+                os.remove(path)
+            os.rename(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
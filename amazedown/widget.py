@@ -0,0 +1,85 @@
+"""
+The AmazeUI figure and gallery markup
+
+Every amazedown extension builds the same few subtrees. Their constant
+attributes are laid out here once, and each element is made by a single
+`SubElement(parent, tag, attrib)` taking a copy of them, instead of being
+created bare and given its attributes by one `set()` call each.
+"""
+from collections import namedtuple
+from markdown.util import etree
+
+FIGURE = {'data-am-widget': 'figure',
+          'class': 'am am-figure am-figure-default',
+          'data-am-figure': "{  pureview: 'true' }"}
+FIGCAPTION = {'class': 'am-figure-capition-btm'}
+GALLERY = {'data-am-widget': 'gallery',
+           'data-am-gallery':
+               "{pureview:{target: 'a', weChatImagePreview: false}}"}
+GALLERY_ITEM = {'class': 'am-gallery-item'}
+GALLERY_TITLE = {'class': 'am-gallery-title'}
+
+# an image of a gallery, linking to `href`; `level` is the number of list
+# markers before it (`list_avg_gallery`)
+GalleryItem = namedtuple('GalleryItem', 'href src alt title level')
+
+Element = etree.Element
+SubElement = etree.SubElement
+
+
+def image(parent, src, alt=None, title=None, rel=None):
+    """An `img` of `src` under `parent`; `rel` is its `data-rel`."""
+    attrib = {'src': src}
+    if rel is not None:
+        attrib['data-rel'] = rel
+    if alt:
+        attrib['alt'] = alt
+    if title:
+        attrib['title'] = title
+    return SubElement(parent, 'img', attrib)
+
+
+def figure(parent, src, alt=None, title=None, rel=None):
+    """A figure of the image `src` under `parent`, or on its own when
+    `parent` is None, with a caption when the image has a `title`."""
+    if parent is None:
+        root = Element('figure', FIGURE)
+    else:
+        root = SubElement(parent, 'figure', FIGURE)
+    image(root, src, alt, title, rel)
+    if title:
+        SubElement(root, 'figcaption', FIGCAPTION).text = title
+    return root
+
+
+def wrap_figure(img):
+    """A figure around the `img` element."""
+    root = Element('figure', FIGURE)
+    root.append(img)
+    title = img.get('title', None)
+    if title:
+        SubElement(root, 'figcaption', FIGCAPTION).text = title
+    return root
+
+
+def gallery(parent, classes, items):
+    """A gallery `ul` of the `classes` under `parent`, with an item for
+    each `GalleryItem` of `items`.
+
+    The items are built here rather than by a call each: a gallery can
+    hold thousands."""
+    attrib = dict(GALLERY)
+    attrib['class'] = classes
+    root = SubElement(parent, 'ul', attrib)
+    for href, src, alt, title, _ in items:
+        item = SubElement(SubElement(root, 'li'), 'div', GALLERY_ITEM)
+        link = SubElement(item, 'a', {'href': href})
+        attrib = {'src': src}
+        if alt:
+            attrib['alt'] = alt
+        if title:
+            attrib['title'] = title
+        SubElement(link, 'img', attrib)
+        if title:
+            SubElement(link, 'h6', GALLERY_TITLE).text = title
+    return root
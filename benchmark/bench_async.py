@@ -0,0 +1,39 @@
+"""
+Throughput of render_async by number of worker processes
+
+    python -m benchmark.bench_async
+"""
+import os
+import time
+import asyncio
+from amazedown.aio import AsyncRenderer
+from amazedown.test.test_aio import CONFIG
+from amazedown.test.test_incremental import DOCUMENT
+
+TEXT = DOCUMENT * 20
+
+
+async def render_many(renderer, count):
+    await asyncio.gather(*[
+        renderer.render(TEXT, CONFIG) for _ in range(count)])
+
+
+def throughput(workers, count=200):
+    with AsyncRenderer(workers=workers, configs=[CONFIG]) as renderer:
+        asyncio.run(render_many(renderer, workers * 2))  # warm up
+        start = time.time()
+        asyncio.run(render_many(renderer, count))
+        return count / (time.time() - start)
+
+
+def main():
+    cores = os.cpu_count() or 1
+    single = throughput(1)
+    for workers in sorted(set([1, 2, cores])):
+        renders = single if workers == 1 else throughput(workers)
+        print('%3d workers: %8.1f renders/s (%.1fx)' % (
+            workers, renders, renders / single))
+
+
+if __name__ == '__main__':
+    main()
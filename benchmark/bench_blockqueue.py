@@ -0,0 +1,72 @@
+"""
+Block parsing time against the number of blocks, with lists and with
+`amazedown.blockqueue`
+
+    python -m benchmark.bench_blockqueue
+    python -m benchmark.bench_blockqueue --max 200000
+
+Documents of paragraphs, block images, link images and small galleries
+are parsed (the block parser only, no inline patterns) with the amazedown
+block processors, the blocks held by a list and by a `BlockQueue`. Linear
+parsing shows as a constant time per block.
+"""
+import sys
+import timeit
+import argparse
+import markdown
+from amazedown import image_block, link_image_block, list_gallery, \
+    quote_by, blockqueue
+
+
+def document(blocks):
+    kinds = ('text %d of a paragraph',
+             '![image %d](image.jpg)',
+             '[![image %d](small.jpg)](big.jpg)',
+             '-   ![a %d](a.jpg)\n-   ![b](b.jpg)',
+             '> quote %d\n> -- someone')
+    return '\n\n'.join(kinds[index % len(kinds)] % index
+                       for index in range(blocks))
+
+
+def extensions():
+    return [image_block.makeExtension(), link_image_block.makeExtension(),
+            list_gallery.makeExtension(), quote_by.makeExtension()]
+
+
+def parse_seconds(md, lines):
+    def parse():
+        md.parser.parseDocument(lines)
+        md.reset()
+    return min(timeit.repeat(parse, number=1, repeat=2))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmark.bench_blockqueue')
+    parser.add_argument('--max', type=int, default=100000,
+                        help='blocks of the largest document')
+    args = parser.parse_args(argv)
+
+    sizes = []
+    size = args.max
+    while size >= 1000:
+        sizes.insert(0, size)
+        size //= 2
+
+    plain = markdown.Markdown(extensions=extensions())
+    queued = markdown.Markdown(extensions=extensions() +
+                               [blockqueue.makeExtension()])
+    print('%8s %10s %10s %12s %12s' % ('blocks', 'list s', 'queue s',
+                                       'list us/blk', 'queue us/blk'))
+    for size in sizes:
+        lines = document(size).split('\n')
+        on_list = parse_seconds(plain, lines)
+        on_queue = parse_seconds(queued, lines)
+        print('%8d %10.2f %10.2f %12.1f %12.1f' % (
+            size, on_list, on_queue, on_list / size * 1e6,
+            on_queue / size * 1e6))
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Brand icon lookup: linear scan of the brand table vs. `BrandIndex`
+
+    python -m benchmark.bench_brand_icon
+"""
+import timeit
+from collections import OrderedDict
+from amazedown.link_icon_tab import LinkIconMixin, BrandIndex, load_brands
+
+
+def scan_brand_icon(brands, host):
+    """The lookup `LinkIconMixin.get_brand_icon` did before the index."""
+    if host == '':
+        return brands['']
+
+    for k, icon in brands.items():
+        if k == '':
+            continue
+
+        if host == k:
+            return icon
+
+        if host.endswith('.' + k):
+            return icon
+
+    return None
+
+
+def make_brands(size):
+    brands = OrderedDict(LinkIconMixin.brands)
+    index = 0
+    while len(brands) < size:
+        brands['brand%d.example.com' % index] = 'am-icon-brand%d' % index
+        index += 1
+    return load_brands(brands)
+
+
+HOSTS = (
+    'www.google.com',
+    'gist.github.com',
+    'plus.google.com',
+    'blog.somewhere.org',
+    'a.b.c.d.example.net',
+)
+
+
+def main(sizes=(10, 1000, 50000), number=2000):
+    print('%8s %14s %14s %10s' % ('brands', 'scan (us)', 'index (us)', 'speedup'))
+    for size in sizes:
+        brands = make_brands(size)
+        index = BrandIndex(brands)
+        for host in HOSTS + ('brand%d.example.com' % (size - 1),):
+            assert index.lookup(host) == scan_brand_icon(brands, host), host
+
+        scan = timeit.timeit(
+            lambda: [scan_brand_icon(brands, host) for host in HOSTS],
+            number=max(1, number * 10 // size))
+        scan /= max(1, number * 10 // size) * len(HOSTS)
+
+        indexed = timeit.timeit(
+            lambda: [index.lookup(host) for host in HOSTS],
+            number=number)
+        indexed /= number * len(HOSTS)
+
+        print('%8d %14.3f %14.3f %9.0fx' % (
+            size, scan * 1e6, indexed * 1e6, scan / indexed))
+
+
+if __name__ == '__main__':
+    main()
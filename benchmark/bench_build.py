@@ -0,0 +1,52 @@
+"""
+Full rebuild of a generated content tree, one process vs. one per core,
+then a rebuild with nothing changed
+
+    python -m benchmark.bench_build
+"""
+import os
+import io
+import time
+import shutil
+import tempfile
+from amazedown.build import build, load_config
+from amazedown.test.test_incremental import DOCUMENT
+
+
+def write_tree(source, posts=2000):
+    for post in range(posts):
+        directory = os.path.join(source, str(post // 100))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        with io.open(os.path.join(directory, '%d.md' % post), 'w',
+                     encoding='utf-8') as f:
+            f.write(u'Post %d\n======\n\n%s' % (post, DOCUMENT))
+
+
+def timed(source, output, jobs, force=True):
+    start = time.time()
+    build(source, output, load_config(), jobs=jobs, force=force)
+    return time.time() - start
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        source = os.path.join(directory, 'src')
+        output = os.path.join(directory, 'out')
+        write_tree(source)
+
+        cores = os.cpu_count() or 1
+        single = timed(source, output, 1)
+        print('1 process:        %8.2f s' % single)
+        if cores > 1:
+            print('%d processes: %11.2f s' % (
+                cores, timed(source, output, cores)))
+        print('nothing changed:  %8.2f s' % timed(
+            source, output, cores, force=False))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Memory of the parsed items of large galleries, with tracemalloc
+
+    python -m benchmark.bench_gallery_memory
+
+For `list_gallery` and `list_avg_gallery` each, `_formal` parses a gallery
+of `IMAGES` images, and what its result holds on to (from `test` until
+`run`) is measured once the tokens are cached, so only the item records
+count. The peak traced memory of rendering the whole gallery is reported
+too.
+"""
+import tracemalloc
+import markdown
+from amazedown import list_gallery, list_avg_gallery
+
+IMAGES = 10000
+AVG_PREFIXES = ('-   +   *   ', '            ', '        *   ', '            ',
+                '    +   *   ', '            ', '        *   ', '            ')
+
+
+def gallery(images):
+    return '\n'.join('-   [![image %d](small-%d.jpg)](big-%d.jpg "title")' % (
+        index, index, index) for index in range(images))
+
+
+def avg_gallery(images):
+    return '\n'.join('%s[![image %d](small-%d.jpg)](big-%d.jpg "title")' % (
+        AVG_PREFIXES[index % len(AVG_PREFIXES)], index, index, index)
+        for index in range(images))
+
+
+def items_kb(module, text):
+    md = markdown.Markdown(extensions=[module.makeExtension()])
+    processor = md.parser.blockprocessors['list_gallery']
+    processor._formal(text)  # have the tokens cached
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = processor._formal(text)
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    assert len(result) == IMAGES
+    return held / 1e3
+
+
+def render_peak_kb(module, text):
+    md = markdown.Markdown(extensions=[module.makeExtension()])
+    tracemalloc.start()
+    html = md.convert(text)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert html.count('<li>') == IMAGES
+    return peak / 1e3
+
+
+def main():
+    print('%-18s %12s %12s %16s' % ('extension', 'items kB', 'B / item',
+                                     'render peak kB'))
+    for module, text in ((list_gallery, gallery(IMAGES)),
+                         (list_avg_gallery, avg_gallery(IMAGES))):
+        held = items_kb(module, text)
+        print('%-18s %12.1f %12.1f %16.1f' % (
+            module.__name__.split('.')[-1], held, held * 1e3 / IMAGES,
+            render_peak_kb(module, text)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Cold import time of the amazedown modules, as `python -X importtime` sees it
+
+    python -m benchmark.bench_import
+    python -m benchmark.bench_import --repeat 20 --budget 5
+
+Each module is imported by a fresh interpreter that has imported markdown
+already, so what is counted is what amazedown adds: its own modules and
+whatever they pull in. The best of `--repeat` runs is kept, and the run
+fails when a module takes more than `--budget` milliseconds.
+
+The modules are imported from a compiled copy of the package in a
+temporary directory: compiling them is not what is measured, and the
+source tree is left without `__pycache__` directories.
+"""
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import compileall
+import subprocess
+import amazedown
+
+MODULES = ('amazedown', 'amazedown.figure', 'amazedown.link_image',
+           'amazedown.link_icon_tab', 'amazedown.image_block',
+           'amazedown.link_image_block', 'amazedown.list_gallery',
+           'amazedown.list_avg_gallery', 'amazedown.quote_by',
+           'amazedown.all')
+BUDGET_MS = 12.0
+MARK = '-- amazedown --'
+SCRIPT = ('import sys, markdown, markdown.extensions; '
+          'sys.stderr.write(%r + "\\n"); import %%s' % MARK)
+
+
+def import_ms(module, directory=None):
+    """Milliseconds a fresh interpreter, started in `directory`, spends
+    importing `module`."""
+    output = subprocess.check_output(
+        [sys.executable, '-X', 'importtime', '-c', SCRIPT % module],
+        stderr=subprocess.STDOUT, universal_newlines=True, cwd=directory)
+    total = 0
+    for line in output.split(MARK, 1)[1].splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line.split('|')
+        if not name[1:].startswith(' '):  # imported by the statement itself
+            total += int(cumulative)
+    return total / 1e3
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmark.bench_import')
+    parser.add_argument('--repeat', type=int, default=10,
+                        help='fresh interpreters per module, the best counts')
+    parser.add_argument('--budget', type=float, default=BUDGET_MS,
+                        help='milliseconds allowed per module')
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp()
+    try:
+        package = os.path.join(directory, 'amazedown')
+        shutil.copytree(os.path.dirname(amazedown.__file__), package,
+                        ignore=shutil.ignore_patterns('__pycache__', '*.pyc'))
+        compileall.compile_dir(package, quiet=1)
+
+        over = []
+        print('%-28s %9s' % ('module', 'ms'))
+        for module in MODULES:
+            ms = min(import_ms(module, directory) for _ in range(args.repeat))
+            print('%-28s %9.2f%s' % (
+                module, ms, '  over budget' if ms > args.budget else ''))
+            if ms > args.budget:
+                over.append(module)
+    finally:
+        shutil.rmtree(directory)
+
+    print('budget: %.1f ms per module' % args.budget)
+    return 1 if over else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""
+One-character edit in a 5k-line document, incremental vs. full render
+
+    python -m benchmark.bench_incremental
+"""
+import timeit
+import markdown
+from amazedown.incremental import IncrementalRenderer
+from amazedown.test.test_incremental import DOCUMENT, extensions
+
+BODY, REFERENCES = DOCUMENT.split('\n[gh]:')
+REFERENCES = '\n[gh]:' + REFERENCES
+
+
+def document(lines=5000):
+    body = BODY
+    while body.count('\n') < lines:
+        body += '\n' + BODY
+    return body + REFERENCES
+
+
+def main(number=10):
+    text = document()
+    edited = [text.replace('Trailing', 'Trailin%d' % i, 1)
+              for i in range(number)]
+
+    md = markdown.Markdown(extensions=extensions())
+    full = timeit.timeit(
+        lambda: [md.convert(each) for each in edited], number=1) / number
+
+    renderer = IncrementalRenderer(extensions=extensions())
+    renderer.render(text)
+    incremental = timeit.timeit(
+        lambda: [renderer.render(each) for each in edited], number=1) / number
+
+    print('%d lines, %d chunks per render' % (
+        text.count('\n'), renderer.stats['chunks'] // (number + 1)))
+    print('full render:        %8.2f ms' % (full * 1e3))
+    print('incremental render: %8.2f ms' % (incremental * 1e3))
+    print('speedup:            %8.1fx' % (full / incremental))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Paragraphs with many links, with the inline patterns matching by position
+and with the `^(.*?)PATTERN(.*)$` regexes they had before
+
+    python -m benchmark.bench_inline
+"""
+import re
+import timeit
+import markdown
+from amazedown import figure, link_image, link_icon_tab
+from amazedown.inline import PositionalRegex
+
+SIZES = (10, 100, 1000, 5000)
+LEGACY_MAX = 1000  # the legacy regexes take minutes past this
+
+
+def paragraph(links):
+    return ' '.join(
+        'word [link %d](http://github.com/%d) ![i](a.jpg t) '
+        '[![x](s.jpg)](b.jpg)' % (index, index)
+        for index in range(links // 3 or 1))
+
+
+def make_markdown(legacy=False):
+    md = markdown.Markdown(extensions=[
+        figure.makeExtension(), link_image.makeExtension(),
+        link_icon_tab.makeExtension(host='example.com')])
+    if legacy:
+        for pattern in md.inlinePatterns.values():
+            if isinstance(pattern.compiled_re, PositionalRegex):
+                pattern.compiled_re = re.compile(
+                    r'^(.*?)%s(.*)$' % pattern.pattern,
+                    re.DOTALL | re.UNICODE)
+    return md
+
+
+def seconds(md, text):
+    def render():
+        md.convert(text)
+        md.reset()
+    return timeit.timeit(render, number=1)
+
+
+def main():
+    positional = make_markdown()
+    legacy = make_markdown(legacy=True)
+    print('%8s %12s %14s' % ('links', 'legacy (s)', 'positional (s)'))
+    for size in SIZES:
+        text = paragraph(size)
+        before = ('%12.3f' % seconds(legacy, text) if size <= LEGACY_MAX
+                  else '%12s' % '-')
+        print('%8d %s %14.3f' % (size, before, seconds(positional, text)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Per-link cost of resolving the image inside an image link
+
+    python -m benchmark.bench_link_image
+"""
+import timeit
+import markdown
+from markdown.inlinepatterns import \
+    ImagePattern, ImageReferencePattern, LINK_RE, \
+    IMAGE_LINK_RE, IMAGE_REFERENCE_RE
+from amazedown.link_image import LinkImageLinkPattern, makeExtension
+
+
+def rebuild_inside_img(pattern, text):
+    """What `_get_inside_img` did before: a fresh inner pattern per link."""
+    if pattern._COM_IMAGE_LINK_RE.match(text) is None:
+        if pattern._COM_IMAGE_REFERENCE_RE.match(text) is None:
+            return None
+        inner = ImageReferencePattern(IMAGE_REFERENCE_RE, pattern.markdown)
+    else:
+        inner = ImagePattern(IMAGE_LINK_RE, pattern.markdown)
+
+    m = inner.compiled_re.match(text)
+    elem = inner.handleMatch(m)
+    src = elem.get('src')
+    alt = elem.get('alt', None)
+    title = elem.get('title', None)
+    return src, alt, title
+
+
+TEXTS = (
+    '![small picture](img_small.jpg "a title")',
+    '![small picture][ref]',
+    '![alt](<http://example.com/a.png>)',
+)
+
+
+def main(number=20000):
+    md = markdown.Markdown(extensions=[makeExtension()])
+    md.convert('[ref]: http://example.com/ref.jpg "ref title"')
+    pattern = LinkImageLinkPattern(LINK_RE, md)
+
+    for text in TEXTS:
+        assert (pattern._get_inside_img(text) ==
+                rebuild_inside_img(pattern, text)), text
+
+    print('%-45s %12s %12s' % ('inner text', 'before (us)', 'after (us)'))
+    for text in TEXTS:
+        before = timeit.timeit(
+            lambda: rebuild_inside_img(pattern, text), number=number)
+        after = timeit.timeit(
+            lambda: pattern._get_inside_img(text), number=number)
+        print('%-45s %12.2f %12.2f' % (
+            text, before / number * 1e6, after / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+What `amazedown.metrics` costs, and what it tells
+
+    python -m benchmark.bench_metrics
+
+Renders the `mixed` corpus with every extension, without and with the
+metrics extension, and reports the time of both, then the share of each
+extension in the rendering as the metrics saw it; the rest is core
+Markdown.
+"""
+import timeit
+import markdown
+from amazedown import metrics
+from benchmark.corpus import corpus
+from benchmark.suite import extensions
+
+DOCS = 20
+REPEAT = 5
+
+
+def render(md, docs):
+    for text in docs:
+        md.convert(text)
+        md.reset()
+
+
+def main():
+    docs = corpus('mixed', docs=DOCS, seed=0)
+    plain = markdown.Markdown(extensions=extensions('all'))
+    md = markdown.Markdown(extensions=extensions('all') +
+                           [metrics.makeExtension()])
+    # taken in turns, as the machine gets faster or slower for both
+    times = {plain: [], md: []}
+    for _ in range(REPEAT):
+        for each in (plain, md):
+            times[each].append(timeit.timeit(lambda: render(each, docs),
+                                             number=1))
+    off, on = min(times[plain]) * 1e3, min(times[md]) * 1e3
+    print('%d documents: %.1f ms, %.1f ms with metrics (%+.1f%%)' % (
+        DOCS, off, on, (on / off - 1) * 100))
+
+    metrics.reset()
+    render(md, docs)
+    totals = metrics.totals()
+    print('%-18s %8s %8s %8s %9s' % ('extension', 'calls', 'matches',
+                                     'ms', 'share'))
+    spent = 0
+    for name, counts in sorted(totals['extensions'].items()):
+        spent += counts['seconds']
+        print('%-18s %8d %8d %8.1f %8.1f%%' % (
+            name, counts['calls'], counts['matches'], counts['seconds'] * 1e3,
+            counts['seconds'] / totals['seconds'] * 100))
+    print('%-18s %8s %8s %8.1f %8.1f%%' % (
+        'markdown', '', '', (totals['seconds'] - spent) * 1e3,
+        (1 - spent / totals['seconds']) * 100))
+
+
+if __name__ == '__main__':
+    main()
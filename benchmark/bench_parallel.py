@@ -0,0 +1,78 @@
+"""
+Rendering a several MB photo archive serially and on worker processes
+
+    python -m benchmark.bench_parallel
+    python -m benchmark.bench_parallel --size 4 --workers 2 4 8
+
+The archive is made of `list_avg_gallery` galleries whose images are
+references defined at the end of the document, with some prose between
+them. It is rendered by `Markdown.convert` and by `ParallelRenderer` with
+each number of workers (the pool started beforehand), and the outputs are
+checked to be the same. The speedup is bounded by the cores of the
+machine, which are reported too.
+"""
+import time
+import random
+import argparse
+import multiprocessing
+import markdown
+from amazedown.parallel import ParallelRenderer
+from benchmark.corpus import words, list_avg_gallery
+
+CONFIG = {'extensions': ['amazedown.image_block',
+                         'amazedown.list_avg_gallery',
+                         'amazedown.quote_by']}
+
+
+def archive(megabytes, seed=0):
+    rng = random.Random(seed)
+    blocks = []
+    references = []
+    size = 0
+    while size < megabytes * 1e6:
+        for gallery in list_avg_gallery(rng, galleries=1):
+            # the image links as references: `[![a](b)](c)` -> `![a][rN]`
+            lines = []
+            for line in gallery.split('\n'):
+                prefix, image = line.split('[![', 1)
+                ref = 'r%d' % len(references)
+                references.append('[%s]: %s' % (ref, image.split('](')[1]))
+                size += len(references[-1])
+                lines.append('%s![%s][%s]' % (prefix, words(rng, 2), ref))
+            blocks.append('\n'.join(lines))
+        blocks.append(words(rng, 60))
+        size += len(blocks[-1]) + len(blocks[-2])
+    return '\n\n'.join(blocks + ['\n'.join(references)]) + '\n'
+
+
+def timed(render):
+    start = time.time()
+    html = render()
+    return time.time() - start, html
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmark.bench_parallel')
+    parser.add_argument('--size', type=float, default=2,
+                        help='megabytes of the document')
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4])
+    args = parser.parse_args(argv)
+
+    text = archive(args.size)
+    print('%.1f MB, %d cores' % (len(text) / 1e6,
+                                 multiprocessing.cpu_count()))
+    seconds, expected = timed(
+        lambda: markdown.Markdown(**CONFIG).convert(text))
+    print('%-10s %8.2f s' % ('serial', seconds))
+    for workers in args.workers:
+        with ParallelRenderer(workers=workers, configs=[CONFIG]) as renderer:
+            renderer.render(text[:renderer.min_size * 2], CONFIG)  # warm up
+            parallel, html = timed(lambda: renderer.render(text, CONFIG))
+        assert html == expected
+        print('%-10s %8.2f s %7.2fx' % ('%d workers' % workers, parallel,
+                                         seconds / parallel))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+What `amazedown.prescan` saves on documents not using the amazedown syntax
+
+    python -m benchmark.bench_prescan
+
+Renders corpora with every extension loaded, without and with the prescan,
+and reports both times. `text` is prose without any of the gallery, figure
+or attribution syntax, the common case; `prose` and `mixed` use all of it,
+and show what the prescan costs when it cannot switch anything off.
+"""
+import timeit
+import markdown
+from amazedown import prescan
+from benchmark.corpus import corpus
+from benchmark.suite import extensions
+
+DOCS = 20
+REPEAT = 3
+KINDS = ('text', 'prose', 'mixed')
+
+
+def render(md, docs):
+    html = []
+    for text in docs:
+        html.append(md.convert(text))
+        md.reset()
+    return html
+
+
+def main():
+    print('%-8s %-10s %10s %10s %9s  %s' % ('corpus', 'extensions', 'ms',
+                                          'prescan', 'speedup', 'disabled'))
+    for kind in KINDS:
+        docs = corpus(kind, docs=DOCS, seed=0)
+        for name in ('all', 'all_in_one'):
+            plain = markdown.Markdown(extensions=extensions(name))
+            md = markdown.Markdown(extensions=extensions(name) +
+                                   [prescan.makeExtension()])
+            assert render(plain, docs) == render(md, docs)
+            disabled = ', '.join(sorted(md.prescan.disabled)) or '-'
+
+            # taken in turns, as the machine gets faster or slower for both
+            times = {plain: [], md: []}
+            for _ in range(REPEAT):
+                for each in (plain, md):
+                    times[each].append(timeit.timeit(
+                        lambda: render(each, docs), number=1))
+            off, on = min(times[plain]) * 1e3, min(times[md]) * 1e3
+            print('%-8s %-10s %10.1f %10.1f %8.2fx  %s' % (
+                kind, name, off, on, off / on, disabled))
+
+
+if __name__ == '__main__':
+    main()
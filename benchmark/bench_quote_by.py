@@ -0,0 +1,140 @@
+"""
+`quote_by` on a 10k line quote and on a quote 20 levels deep
+
+    python -m benchmark.bench_quote_by
+
+The `-- name` lines at the end of a quote are found by a scan back from its
+end, and the rest of it is left as it is. `legacy` is the run it replaces,
+which split every level of the quote into lines, reversed them twice and
+joined them again; `markdown` is the plain blockquote, for reference.
+
+The time of `run` itself, over the blocks of every level, is reported,
+then the time to parse the blocks of the document with each. Only the
+block parsing is timed: the inline patterns going through the long
+paragraph would take most of a whole render, and the same for all.
+"""
+import timeit
+import markdown
+from markdown.blockprocessors import BlockQuoteProcessor
+from amazedown import quote_by
+from amazedown.quote_by import QuoteByProcessor, QuoteByExtension
+
+LINES = 10000
+DEPTH = 20
+DEEP_LINES = 500
+
+
+class LegacyQuoteByProcessor(QuoteByProcessor):
+
+    def run(self, parent, blocks):
+        block = blocks[0]
+        reversed_line_result = []
+        no_more = False
+        line_count = 0
+        for each_line in block.splitlines()[::-1]:
+            if no_more:
+                reversed_line_result.append(each_line)
+                continue
+
+            match = self.BY_RE.match(each_line)
+            if match:
+                each_line = match.expand('\\g<pre><small>\\g<name></small>')
+                line_count += 1
+            else:
+                no_more = True
+
+            reversed_line_result.append(each_line)
+
+        line_result = reversed_line_result[::-1]
+        sep_at = len(line_result) - line_count
+        blocks[0] = '%s\n%s' % ('\n'.join(line_result[:sep_at]),
+                                '<br/>\n'.join(line_result[sep_at:]))
+        return BlockQuoteProcessor.run(self, parent, blocks)
+
+
+class LegacyExtension(QuoteByExtension):
+
+    def extendMarkdown(self, md, md_globals):
+        md.parser.blockprocessors.add('quote_by',
+                                      LegacyQuoteByProcessor(md.parser),
+                                      '<quote')
+
+
+def long_quote(lines):
+    return '\n'.join(['> line %d of a long quote' % index
+                      for index in range(lines)] +
+                     ['> -- someone', '> -- somewhere'])
+
+
+def deep_quote(depth, lines):
+    quote = ['line %d of a deep quote' % index for index in range(lines)]
+    quote.append('-- someone')
+    for _ in range(depth):
+        quote = ['> %s' % line for line in quote]
+    return '\n'.join(quote)
+
+
+class RecordingQuoteByProcessor(QuoteByProcessor):
+    """Keeps the block of every level it runs on."""
+
+    def __init__(self, parser):
+        super(RecordingQuoteByProcessor, self).__init__(parser)
+        self.blocks = []
+
+    def run(self, parent, blocks):
+        self.blocks.append(blocks[0])
+        return super(RecordingQuoteByProcessor, self).run(parent, blocks)
+
+
+def level_blocks(text):
+    md = markdown.Markdown()
+    processor = RecordingQuoteByProcessor(md.parser)
+    md.parser.blockprocessors.add('quote_by', processor, '<quote')
+    md.convert(text)
+    return processor.blocks
+
+
+def own_ms(processor_class, blocks):
+    """Milliseconds `run` takes on each block, without the blockquote
+    parsing it hands over to."""
+    processor = processor_class(markdown.Markdown().parser)
+    run = BlockQuoteProcessor.run
+    BlockQuoteProcessor.run = lambda self, parent, blocks: None
+    try:
+        return min(timeit.repeat(
+            lambda: [processor.run(None, [block]) for block in blocks],
+            number=1, repeat=20)) * 1e3
+    finally:
+        BlockQuoteProcessor.run = run
+
+
+def parse_ms(extensions, text):
+    md = markdown.Markdown(extensions=extensions)
+    lines = text.split('\n')
+
+    def parse():
+        md.parser.parseDocument(lines)
+        md.reset()
+    return min(timeit.repeat(parse, number=1, repeat=10)) * 1e3
+
+
+def main():
+    print('%-12s %10s %10s %12s %12s %12s' % (
+        '', 'legacy run', 'run', 'markdown', 'legacy', 'quote_by'))
+    for title, text in (('%d lines' % LINES, long_quote(LINES)),
+                        ('%d levels' % DEPTH, deep_quote(DEPTH, DEEP_LINES))):
+        legacy = markdown.markdown(text, extensions=[LegacyExtension()])
+        assert legacy == markdown.markdown(
+            text, extensions=[quote_by.makeExtension()])
+        blocks = level_blocks(text)
+        print('%-12s %10.2f %10.2f %12.1f %12.1f %12.1f' % (
+            title, own_ms(LegacyQuoteByProcessor, blocks),
+            own_ms(QuoteByProcessor, blocks),
+            parse_ms([], text), parse_ms([LegacyExtension()], text),
+            parse_ms([quote_by.makeExtension()], text)))
+    print('run: ms in `run` over the block of every level; '
+          'the others: ms to parse the blocks')
+
+
+if __name__ == '__main__':
+    main()
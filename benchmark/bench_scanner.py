@@ -0,0 +1,47 @@
+"""
+Scanning images with the tokenizer regexes and with `amazedown.scanner`
+
+    python -m benchmark.bench_scanner
+"""
+import re
+import random
+import timeit
+from amazedown.scanner import Scanner
+from amazedown.tokenizer import IMAGE_RE, LINK_IMAGE_RE
+from benchmark.corpus import list_gallery, list_avg_gallery
+
+TOKEN_RE = re.compile('%s|%s' % (LINK_IMAGE_RE, IMAGE_RE))
+
+ADVERSARIAL = ('![a](b c', '[![a](b)](c "d', '![a](b     ', '![a](b(',
+               '[![a](b(')
+
+
+def seconds(func, number=1):
+    return timeit.timeit(func, number=number) / number
+
+
+def main():
+    rng = random.Random(0)
+    print('%-28s %8s %12s %12s' % ('text', 'chars', 'regex (us)',
+                                   'scanner (us)'))
+    for name, text in (('list_gallery', list_gallery(rng, 1)[0]),
+                       ('list_avg_gallery', list_avg_gallery(rng, 1)[0])):
+        print('%-28s %8d %12.1f %12.1f' % (
+            name, len(text),
+            seconds(lambda: list(TOKEN_RE.finditer(text)), 200) * 1e6,
+            seconds(lambda: Scanner(text).scan(), 200) * 1e6))
+
+    for unit in ADVERSARIAL:
+        for count in (25, 50, 100, 10000):
+            text = unit * count
+            # past a few dozen repeats the regexes take minutes
+            regex = ('%12.1f' % (seconds(
+                lambda: list(TOKEN_RE.finditer(text))) * 1e6)
+                if count <= 50 else '%12s' % '-')
+            print('%-28s %8d %s %12.1f' % (
+                '%r x %d' % (unit, count), len(text), regex,
+                seconds(lambda: Scanner(text).scan()) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Peak memory of a large gallery-heavy document, whole vs. streaming render
+
+    python -m benchmark.bench_stream
+"""
+import os
+import io
+import tempfile
+import tracemalloc
+import markdown
+from amazedown import list_avg_gallery
+from amazedown.stream import render_stream
+
+ITEM = '[![img%d](pic%d.jpg "title")](pic%d-big.jpg)'
+
+
+def write_document(f, days=2000):
+    for day in range(days):
+        f.write('Day %d\n======\n\nWe walked *a lot* today.\n\n' % day)
+        f.write('-   *   ' + '\n        '.join(
+            ITEM % (i, i, i) for i in range(8)) + '\n\n')
+
+
+def whole(path, out):
+    with io.open(path, encoding='utf-8') as f:
+        md = markdown.Markdown(extensions=[list_avg_gallery.makeExtension()])
+        out.write(md.convert(f.read()))
+
+
+def streaming(path, out):
+    with io.open(path, encoding='utf-8') as f:
+        for html in render_stream(
+                f, extensions=[list_avg_gallery.makeExtension()]):
+            out.write(html)
+
+
+def peak(render, path):
+    with open(os.devnull, 'w') as out:
+        tracemalloc.start()
+        render(path, out)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return peak
+
+
+def main():
+    fd, path = tempfile.mkstemp(suffix='.md')
+    try:
+        with io.open(fd, 'w', encoding='utf-8') as f:
+            write_document(f)
+
+        print('input:               %8.1f MB' % (
+            os.path.getsize(path) / 1e6))
+        print('whole render peak:   %8.1f MB' % (peak(whole, path) / 1e6))
+        print('streaming peak:      %8.1f MB' % (peak(streaming, path) / 1e6))
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
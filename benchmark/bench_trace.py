@@ -0,0 +1,62 @@
+"""
+Cost of the logging calls in amazedown hot paths, tracing on vs. off
+
+With tracing on but the loggers above DEBUG, every call still builds its
+arguments and checks the logger level: that is what every render paid
+before the tracing switch. The two modes take turns over several rounds,
+so that a slow spell of the machine does not fall on one of them only, and
+the best round of each counts.
+
+    python -m benchmark.bench_trace
+"""
+import timeit
+import logging
+import markdown
+from amazedown import trace, figure, link_image, link_icon_tab, \
+    image_block, link_image_block, list_avg_gallery, quote_by
+
+ITEM = '[![img%d](pic%d.jpg "title")](pic%d-big.jpg)'
+
+TEXT = '\n\n'.join([
+    'Some [link](http://github.com/a) and [another](http://example.com/b) '
+    'and [![img](small.jpg)](big.jpg) in a paragraph.',
+    '![block image](pic.jpg title)',
+    '[![block link image](pic.jpg)](big.jpg "title")',
+    '-   *   ' + '\n        '.join(ITEM % (i, i, i) for i in range(20)) +
+    '\n    *   ' + '\n        '.join(ITEM % (i, i, i) for i in range(20)),
+    '> quoted text\n> -- someone',
+] * 20)
+
+
+def render():
+    return markdown.markdown(TEXT, extensions=[
+        figure.makeExtension(),
+        link_image.makeExtension(),
+        link_icon_tab.makeExtension(host='example.com'),
+        image_block.makeExtension(),
+        link_image_block.makeExtension(),
+        list_avg_gallery.makeExtension(),
+        quote_by.makeExtension(),
+    ])
+
+
+def main(number=5, rounds=7):
+    logging.basicConfig(level=logging.WARNING)
+    render()
+
+    times = {True: [], False: []}
+    for _ in range(rounds):
+        for on in (True, False):
+            trace.enable(on)
+            times[on].append(timeit.timeit(render, number=number) / number)
+    trace.disable()
+    traced, untraced = min(times[True]), min(times[False])
+
+    print('tracing on, loggers at WARNING: %8.2f ms' % (traced * 1e3))
+    print('tracing off:                    %8.2f ms' % (untraced * 1e3))
+    print('logging overhead removed:       %7.1f%%' % (
+        (traced - untraced) / traced * 100))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Building a 10k image gallery with `amazedown.widget` and with the `set()`
+calls the extensions made before
+
+    python -m benchmark.bench_widget
+
+Reports the time to build the items, the calls made per image (Python and
+C functions both, as `sys.setprofile` sees them), and the time to render
+the whole gallery with `list_gallery`.
+"""
+import sys
+import timeit
+import markdown
+from markdown.util import etree
+from amazedown import list_gallery
+from amazedown.widget import gallery, GalleryItem
+
+IMAGES = 10000
+
+
+def items():
+    return [{'preview': 'big-%d.jpg' % index, 'src': 'small-%d.jpg' % index,
+             'alt': 'image %d' % index,
+             'title': 'title %d' % index if index % 2 else None}
+            for index in range(IMAGES)]
+
+
+def legacy(parent, result):
+    root = etree.SubElement(parent, 'ul')
+    root.set('data-am-widget', 'gallery')
+    root.set('class', 'am-gallery am-avg-sm-1 am-gallery-bordered')
+    root.set('data-am-gallery',
+             "{pureview:{target: 'a', weChatImagePreview: false}}")
+    for each in result:
+        item = etree.SubElement(root, 'li')
+        container = etree.SubElement(item, 'div')
+        container.set('class', 'am-gallery-item')
+
+        preview_link = etree.SubElement(container, 'a')
+        preview_link.set('href', each['preview'] or each['src'])
+
+        img = etree.SubElement(preview_link, 'img')
+        img.set('src', each['src'])
+
+        if each['alt']:
+            img.set('alt', each['alt'])
+
+        if each['title']:
+            img.set('title', each['title'])
+            title = etree.SubElement(preview_link, 'h6')
+            title.set('class', "am-gallery-title")
+            title.text = each['title']
+
+
+def widget(parent, result):
+    gallery(parent, 'am-gallery am-avg-sm-1 am-gallery-bordered', result)
+
+
+def calls(build, result):
+    counted = [0]
+
+    def profile(frame, event, arg):
+        if event in ('call', 'c_call'):
+            counted[0] += 1
+
+    parent = etree.Element('div')
+    sys.setprofile(profile)
+    try:
+        build(parent, result)
+    finally:
+        sys.setprofile(None)
+    return counted[0]
+
+
+def document():
+    return '\n'.join('-   [![image %d](small-%d.jpg)](big-%d.jpg)' % (
+        index, index, index) for index in range(IMAGES))
+
+
+def main():
+    # the records each way: the gallery processors make them while parsing
+    records = {legacy: items()}
+    records[widget] = [
+        GalleryItem(each['preview'] or each['src'], each['src'], each['alt'],
+                    each['title'], 1) for each in records[legacy]]
+    print('%-8s %10s %12s' % ('build', 'ms', 'calls/image'))
+    for build in (legacy, widget):
+        result = records[build]
+        seconds = min(timeit.repeat(
+            lambda: build(etree.Element('div'), result), number=1, repeat=5))
+        print('%-8s %10.1f %12.1f' % (build.__name__, seconds * 1e3,
+                                      calls(build, result) / float(IMAGES)))
+
+    md = markdown.Markdown(extensions=[list_gallery.makeExtension()])
+    text = document()
+
+    def render():
+        md.convert(text)
+        md.reset()
+    print('list_gallery render of %d images: %.1f ms' % (
+        IMAGES, min(timeit.repeat(render, number=1, repeat=3)) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""
+Synthetic documents for the benchmarks
+
+    docs = corpus('list_avg_gallery', docs=50, seed=1)
+
+Each kind of document stresses one group of extensions:
+
+    prose             link-dense paragraphs with inline images and image
+                      links (figure, link_image, link_icon_tab)
+    image_refs        block images and image links through references
+                      (image_block, link_image_block)
+    list_gallery      large flat galleries
+    list_avg_gallery  nested three-level galleries
+    quote_by          quotes with long attributions
+    mixed             all of the above in one document
+    text              prose with a few links and none of the amazedown
+                      syntax: headings, emphasis, lists, quotes, code
+
+The same `seed` always gives the same documents.
+
+    python -m benchmark.corpus list_gallery  # print one document
+"""
+import sys
+import random
+
+KINDS = ('prose', 'image_refs', 'list_gallery', 'list_avg_gallery',
+         'quote_by', 'mixed', 'text')
+
+HOSTS = ('github.com', 'example.com', 'www.google.com', 'instagram.com',
+         'blog.example.org', 'gist.github.com', 'plus.google.com')
+
+WORDS = ('lorem ipsum dolor sit amet consectetur adipiscing elit sed do '
+         'eiusmod tempor incididunt ut labore et dolore magna aliqua').split()
+
+
+def words(rng, count):
+    return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+
+def url(rng, suffix=''):
+    return 'http://%s/%s%s' % (rng.choice(HOSTS), rng.choice(WORDS), suffix)
+
+
+def image(rng):
+    return '![%s](%s "%s")' % (words(rng, 2), url(rng, '.jpg'),
+                               words(rng, 3))
+
+
+def link_image(rng):
+    return '[%s](%s "%s")' % (image(rng), url(rng, '-big.jpg'),
+                              words(rng, 2))
+
+
+def prose(rng, paragraphs=20):
+    blocks = []
+    for _ in range(paragraphs):
+        parts = []
+        for _ in range(rng.randint(5, 12)):
+            parts.append(words(rng, rng.randint(3, 8)))
+            choice = rng.random()
+            if choice < 0.6:
+                parts.append('[%s](%s)' % (words(rng, 2), url(rng)))
+            elif choice < 0.8:
+                parts.append(image(rng))
+            else:
+                parts.append(link_image(rng))
+        blocks.append(' '.join(parts) + '.')
+    return blocks
+
+
+def image_refs(rng, images=60):
+    blocks = []
+    references = []
+    for index in range(images):
+        ref = 'img%d' % index
+        references.append('[%s]: %s "%s"' % (ref, url(rng, '.jpg'),
+                                             words(rng, 3)))
+        if rng.random() < 0.5:
+            blocks.append('![%s][%s]' % (words(rng, 2), ref))
+        else:
+            references.append('[%s-big]: %s' % (ref, url(rng, '-big.jpg')))
+            blocks.append('[![%s][%s]][%s-big]' % (words(rng, 2), ref, ref))
+        blocks.append(words(rng, 20))
+    return blocks + ['\n'.join(references)]
+
+
+def list_gallery(rng, galleries=5, items=40):
+    return ['\n'.join('-   ' + rng.choice((image, link_image))(rng)
+                      for _ in range(items))
+            for _ in range(galleries)]
+
+
+def list_avg_gallery(rng, galleries=5, per_group=4):
+    blocks = []
+    for _ in range(galleries):
+        lines = []
+        for large in range(2):
+            for middle in range(3):
+                for small in range(2):
+                    prefix = ''.join((
+                        '-   ' if middle == small == 0 else '    ',
+                        '+   ' if small == 0 else '    ',
+                        '*   '))
+                    for index in range(per_group):
+                        lines.append(
+                            (prefix if index == 0 else ' ' * 12) +
+                            link_image(rng))
+        blocks.append('\n'.join(lines))
+    return blocks
+
+
+def quote_by(rng, quotes=30):
+    blocks = []
+    for _ in range(quotes):
+        lines = ['> ' + words(rng, 12) for _ in range(rng.randint(1, 6))]
+        lines.extend('> -- ' + words(rng, rng.randint(5, 30))
+                     for _ in range(rng.randint(1, 4)))
+        blocks.append('\n'.join(lines))
+    return blocks
+
+
+def mixed(rng):
+    blocks = []
+    for kind in (prose, list_gallery, image_refs, list_avg_gallery,
+                 quote_by):
+        blocks.extend(kind(rng))
+    return blocks
+
+
+def text(rng, sections=8):
+    blocks = []
+    for _ in range(sections):
+        blocks.append('## ' + words(rng, 4).capitalize())
+        for _ in range(rng.randint(2, 4)):
+            parts = []
+            for _ in range(rng.randint(4, 10)):
+                parts.append(words(rng, rng.randint(4, 10)))
+                choice = rng.random()
+                if choice < 0.15:
+                    parts.append('[%s](%s)' % (words(rng, 2), url(rng)))
+                elif choice < 0.4:
+                    parts.append('*%s*' % words(rng, 2))
+                elif choice < 0.5:
+                    parts.append('`%s`' % rng.choice(WORDS))
+            blocks.append(' '.join(parts) + '.')
+        choice = rng.random()
+        if choice < 0.4:
+            blocks.append('\n'.join('%s   %s' % (rng.choice('-*'),
+                                                 words(rng, 6))
+                                     for _ in range(rng.randint(3, 6))))
+        elif choice < 0.7:
+            blocks.append('\n'.join('> ' + words(rng, 10)
+                                     for _ in range(rng.randint(1, 3))))
+        else:
+            blocks.append('\n'.join('    ' + words(rng, 5)
+                                     for _ in range(rng.randint(2, 5))))
+    return blocks
+
+
+def document(kind, rng):
+    return '\n\n'.join(globals()[kind](rng)) + '\n'
+
+
+def corpus(kind, docs=20, seed=0):
+    """Return `docs` documents of `kind`."""
+    rng = random.Random('%s-%s' % (seed, kind))
+    return [document(kind, rng) for _ in range(docs)]
+
+
+if __name__ == '__main__':
+    print(corpus(sys.argv[1] if len(sys.argv) > 1 else 'mixed', 1)[0])
@@ -0,0 +1,208 @@
+"""
+Cost of each amazedown extension over plain Markdown
+
+    python -m benchmark.suite -o results.json
+    python -m benchmark.suite --compare old.json -o new.json
+
+Every extension renders the corpus it targets (see `benchmark.corpus`), and
+so does a `Markdown` without extensions. The report gives, for both,
+throughput, per-document latency percentiles and peak traced memory, and
+the ratio of the extension's figures to the plain ones (the overhead).
+"all" runs every extension on mixed documents, with `list_avg_gallery` as
+the gallery since the two can not be loaded together, "all_in_one" the
+`amazedown.all` extension.
+
+The JSON results also record the seed, the corpus size and the versions
+used, so runs can be compared over time with `--compare`.
+"""
+import sys
+import json
+import time
+import timeit
+import platform
+import argparse
+import tracemalloc
+import markdown
+import amazedown
+from amazedown import figure, link_image, link_icon_tab, image_block, \
+    link_image_block, list_gallery, list_avg_gallery, quote_by
+from amazedown import all as all_in_one
+from benchmark.corpus import corpus
+
+TARGETS = (
+    ('figure', 'prose'),
+    ('link_image', 'prose'),
+    ('link_icon_tab', 'prose'),
+    ('image_block', 'image_refs'),
+    ('link_image_block', 'image_refs'),
+    ('list_gallery', 'list_gallery'),
+    ('list_avg_gallery', 'list_avg_gallery'),
+    ('quote_by', 'quote_by'),
+    ('all', 'mixed'),
+    ('all_in_one', 'mixed'),
+)
+
+MODULES = {
+    'figure': figure,
+    'link_image': link_image,
+    'link_icon_tab': link_icon_tab,
+    'image_block': image_block,
+    'link_image_block': link_image_block,
+    'list_gallery': list_gallery,
+    'list_avg_gallery': list_avg_gallery,
+    'quote_by': quote_by,
+}
+
+
+def extensions(name):
+    if name is None:
+        return []
+    if name == 'all':
+        return [module.makeExtension() for key, module in MODULES.items()
+                if key != 'list_gallery']
+    if name == 'all_in_one':
+        return [all_in_one.makeExtension()]
+    return [MODULES[name].makeExtension()]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def measure(name, docs, repeat):
+    """Render `docs` with the `name` extension (None for plain Markdown)."""
+    md = markdown.Markdown(extensions=extensions(name))
+    timer = timeit.default_timer
+
+    latencies = []
+    for doc in docs:
+        best = None
+        for _ in range(repeat):
+            start = timer()
+            md.convert(doc)
+            elapsed = timer() - start
+            md.reset()
+            best = elapsed if best is None else min(best, elapsed)
+        latencies.append(best)
+
+    peak = 0
+    for doc in docs:
+        tracemalloc.start()
+        md.convert(doc)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        md.reset()
+
+    total = sum(latencies)
+    size = sum(len(doc.encode('utf-8')) for doc in docs)
+    return {
+        'docs_per_s': len(docs) / total,
+        'mb_per_s': size / total / 1e6,
+        'p50_ms': percentile(latencies, 0.5) * 1e3,
+        'p90_ms': percentile(latencies, 0.9) * 1e3,
+        'p99_ms': percentile(latencies, 0.99) * 1e3,
+        'peak_kb': peak / 1e3,
+    }
+
+
+def overhead(result, plain):
+    return {
+        'throughput': plain['docs_per_s'] / result['docs_per_s'],
+        'p50': result['p50_ms'] / plain['p50_ms'],
+        'p99': result['p99_ms'] / plain['p99_ms'],
+        'peak_memory': result['peak_kb'] / plain['peak_kb'],
+    }
+
+
+def run(docs=20, seed=0, repeat=3, only=None):
+    results = {}
+    corpora = {}
+    plains = {}
+    for name, kind in TARGETS:
+        if only and name not in only:
+            continue
+
+        if kind not in corpora:
+            corpora[kind] = corpus(kind, docs, seed)
+            plains[kind] = measure(None, corpora[kind], repeat)
+
+        result = measure(name, corpora[kind], repeat)
+        results[name] = {
+            'corpus': kind,
+            'plain': plains[kind],
+            'extension': result,
+            'overhead': overhead(result, plains[kind]),
+        }
+
+    return {
+        'meta': {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'seed': seed,
+            'docs': docs,
+            'repeat': repeat,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'markdown': markdown.version,
+            'amazedown': amazedown.__version__,
+        },
+        'corpus': dict(
+            (kind, {'docs': len(texts), 'bytes': sum(
+                len(text.encode('utf-8')) for text in texts)})
+            for kind, texts in corpora.items()),
+        'results': results,
+    }
+
+
+def report(results, previous=None, out=sys.stdout):
+    out.write('%-18s %-17s %9s %8s %8s %9s %7s %7s\n' % (
+        'extension', 'corpus', 'docs/s', 'p50 ms', 'p99 ms', 'peak kB',
+        'x time', 'x mem'))
+    for name, _ in TARGETS:
+        result = results['results'].get(name)
+        if result is None:
+            continue
+
+        ext = result['extension']
+        line = '%-18s %-17s %9.1f %8.2f %8.2f %9.1f %7.2f %7.2f' % (
+            name, result['corpus'], ext['docs_per_s'], ext['p50_ms'],
+            ext['p99_ms'], ext['peak_kb'], result['overhead']['throughput'],
+            result['overhead']['peak_memory'])
+
+        old = (previous or {}).get('results', {}).get(name)
+        if old is not None:
+            line += '  (docs/s %+.1f%%)' % (
+                (ext['docs_per_s'] / old['extension']['docs_per_s'] - 1)
+                * 100)
+        out.write(line + '\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmark.suite')
+    parser.add_argument('-o', '--output', help='write the JSON results here')
+    parser.add_argument('--docs', type=int, default=20,
+                        help='documents per corpus')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='renders per document, the fastest counts')
+    parser.add_argument('--only', action='append',
+                        choices=[name for name, _ in TARGETS],
+                        help='only run these extensions (repeatable)')
+    parser.add_argument('--compare', help='JSON results of a previous run')
+    args = parser.parse_args(argv)
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+
+    results = run(args.docs, args.seed, args.repeat, args.only)
+    report(results, previous)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()